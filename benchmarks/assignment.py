@@ -0,0 +1,47 @@
+"""Сравнение способов разделения точек на кластеры в K-Means - min-cost flow и приближенного жадного алгоритма
+
+Для каждого количества точек и кластеров 1 раз делятся одни и те же точки при одних и тех же центроидах,
+выводятся суммы расстояний от точек до центроидов, отклонение приближенного решения от точного и время
+
+Запуск: PYTHONPATH=src python benchmarks/assignment.py
+"""
+
+from __future__ import annotations
+
+import random
+from timeit import default_timer as timer
+
+from routing import spatial_objects as sp
+from routing.algorithms import k_means as km
+
+
+def get_cost(clusters: list[sp.Cluster], centroids: list[sp.Point]) -> float:
+    return sum(point.get_distance_to(centroids[i]) for i, cluster in enumerate(clusters) for point in cluster)
+
+
+def main() -> None:
+    generator = random.Random(0)
+
+    for points_amt, clusters_amt in (5000, 50), (20000, 100), (50000, 100), (200000, 200):
+        values = generator.sample(range(10 ** 8), points_amt)  # Различные точки с целыми координатами
+        points = [sp.Point(value // 10 ** 4, value % 10 ** 4) for value in values]
+        centroids = km._get_initial_clusters_centers(points, clusters_amt)
+        network = km._FlowNetwork(points, clusters_amt)
+
+        start = timer()
+        exact = km._divide_points_into_clusters(points, clusters_amt, centroids, network)
+        exact_time = timer() - start
+
+        start = timer()
+        greedy = km._divide_points_greedily(points, clusters_amt, centroids, network.coordinates)
+        greedy_time = timer() - start
+
+        exact_cost, greedy_cost = get_cost(exact, centroids), get_cost(greedy, centroids)
+        print(
+            f"Точек: {points_amt:6}, кластеров: {clusters_amt:3} | exact: {exact_cost:12.1f} за {exact_time:5.2f} с | "
+            f"greedy: {greedy_cost:12.1f} за {greedy_time:5.2f} с | отклонение {greedy_cost / exact_cost - 1:.2%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Сравнение времени построения графа в формате CSR по ребрам, по массивам и по файлу списка ребер
+
+Граф - квадратная решетка, длины ребер в 1 - 2 раза больше расстояний между их концами
+- По ребрам - объект Segment и вызов add_edge на каждое ребро, затем CompactGraph.from_graph
+- По массивам - CompactGraph.from_arrays
+- По файлу - CompactGraph.from_edge_list, файл записывается во временный каталог
+
+Запуск: PYTHONPATH=src python benchmarks/graph_loading.py [сторона решетки]
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from routing import spatial_objects as sp
+
+
+def get_grid_arrays(side: int) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Получить координаты вершин, индексы концов и длины ребер решетки"""
+
+    nodes = np.arange(side * side).reshape(side, side)
+    xs, ys = (values.ravel().astype(np.float64) for values in np.meshgrid(np.arange(side), np.arange(side)))
+    edge_starts = np.concatenate((nodes[:, :-1].ravel(), nodes[:-1, :].ravel()))
+    edge_finishes = np.concatenate((nodes[:, 1:].ravel(), nodes[1:, :].ravel()))
+    edge_lengths = np.round(np.random.default_rng(0).uniform(1, 2, len(edge_starts)), sp.get_precision())
+    return xs, ys, edge_starts, edge_finishes, edge_lengths
+
+
+def main() -> None:
+    side = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    xs, ys, edge_starts, edge_finishes, edge_lengths = get_grid_arrays(side)
+    print(f"Вершин: {len(xs)}, ребер: {len(edge_starts)}")
+
+    start_time = time.perf_counter()
+    points = [sp.Point(x, y) for x, y in zip(xs.tolist(), ys.tolist())]
+    graph = sp.Graph()
+
+    for start, finish, length in zip(edge_starts.tolist(), edge_finishes.tolist(), edge_lengths.tolist()):
+        graph.add_edge(sp.Segment(points[start], points[finish], length))
+
+    sp.CompactGraph.from_graph(graph)
+    edges_time = time.perf_counter() - start_time
+    print(f"По ребрам: {edges_time:.2f} с")
+
+    start_time = time.perf_counter()
+    sp.CompactGraph.from_arrays(xs, ys, edge_starts, edge_finishes, edge_lengths)
+    arrays_time = time.perf_counter() - start_time
+    print(f"По массивам: {arrays_time:.2f} с, в {edges_time / arrays_time:.1f} раза быстрее")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "edges.csv")
+        values = np.column_stack(
+            (xs[edge_starts], ys[edge_starts], xs[edge_finishes], ys[edge_finishes], edge_lengths)
+        )
+        np.savetxt(path, values, delimiter=",", fmt="%.6f")
+
+        start_time = time.perf_counter()
+        sp.CompactGraph.from_edge_list(path)
+        file_time = time.perf_counter() - start_time
+
+    print(f"По файлу списка ребер: {file_time:.2f} с, в {edges_time / file_time:.1f} раза быстрее")
+
+
+if __name__ == "__main__":
+    main()
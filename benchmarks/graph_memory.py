@@ -0,0 +1,102 @@
+"""Сравнение объема памяти, занимаемого графом в виде списков смежности и в формате CSR, и скорости построения графа
+
+Граф - квадратная решетка, соседние узлы соединены ребрами
+Граф из списков смежности строится с отдельными объектами точек в каждом ребре и с точками из пула
+Экономия памяти графа в формате CSR выводится по сравнению с обоими вариантами, исходный - без пула точек
+Точки и отрезки хранят атрибуты в __slots__, до этого исходный граф решетки 300 x 300 занимал 559 байт на ребро
+
+Запуск: PYTHONPATH=src python benchmarks/graph_memory.py [сторона решетки]
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from array import array
+from typing import Optional
+
+from routing import spatial_objects as sp
+
+
+def get_deep_size(obj: object, seen: set[int]) -> int:
+    """Подсчитать объем памяти объекта вместе со всеми достижимыми из него объектами"""
+
+    if id(obj) in seen:
+        return 0
+
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+
+    if isinstance(obj, dict):
+        size += sum(get_deep_size(key, seen) + get_deep_size(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set)):
+        size += sum(get_deep_size(item, seen) for item in obj)
+    elif isinstance(obj, (str, bytes, int, float, array)):
+        pass
+    elif hasattr(obj, "__dict__"):
+        size += get_deep_size(vars(obj), seen)
+    else:  # Объект с __slots__
+        size += sum(
+            get_deep_size(getattr(obj, name), seen)
+            for cls in type(obj).__mro__ for name in getattr(cls, "__slots__", ()) if hasattr(obj, name)
+        )
+
+    return size
+
+
+def get_points_size(graph: sp.Graph) -> int:
+    """Подсчитать объем памяти всех объектов точек графа - ключей списков смежности и концов ребер"""
+
+    seen = set()
+    edges = {id(edge): edge for adjacency_list in graph.adjacency_lists.values() for edge in adjacency_list}
+    size = sum(get_deep_size(point, seen) for point in graph.adjacency_lists)
+    return size + sum(get_deep_size(edge.start, seen) + get_deep_size(edge.finish, seen) for edge in edges.values())
+
+
+def build_grid_graph(side: int, pool: Optional[sp.PointPool] = None) -> sp.Graph:
+    get_point = pool.get if pool is not None else sp.Point
+    graph = sp.Graph()
+
+    for i in range(side):
+        for j in range(side):
+            if i + 1 < side:
+                graph.add_edge(sp.Segment(get_point(i, j), get_point(i + 1, j)))
+
+            if j + 1 < side:
+                graph.add_edge(sp.Segment(get_point(i, j), get_point(i, j + 1)))
+
+    return graph
+
+
+def main() -> None:
+    side = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    edges_amt = 2 * side * (side - 1)
+    nodes_amt = side * side
+    print(f"Вершин: {nodes_amt}, ребер: {edges_amt}")
+
+    graph_sizes = {}
+
+    for title, pool in ("без пула точек", None), ("с пулом точек", sp.PointPool()):
+        start_time = time.perf_counter()
+        graph = build_grid_graph(side, pool)
+        build_time = time.perf_counter() - start_time
+        graph_size = graph_sizes[title] = get_deep_size(graph, set())
+        print(
+            f"Списки смежности {title}: {graph_size / 2 ** 20:.1f} МиБ, {graph_size / edges_amt:.0f} байт на ребро, "
+            f"{get_points_size(graph) / nodes_amt:.0f} байт точек на вершину, "
+            f"построение {edges_amt / build_time:.0f} ребер/с"
+        )
+
+    compact_graph = sp.CompactGraph.from_graph(graph)
+    compact_graph_size = get_deep_size(compact_graph, set())
+    print(f"CSR: {compact_graph_size / 2 ** 20:.1f} МиБ, {compact_graph_size / edges_amt:.0f} байт на ребро")
+
+    for title, graph_size in graph_sizes.items():
+        print(
+            f"Экономия по сравнению со списками смежности {title}: "
+            f"{(graph_size - compact_graph_size) / 2 ** 20:.1f} МиБ, в {graph_size / compact_graph_size:.1f} раза"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Подсчет объема данных, передаваемых из основного процесса в процессы пула при построении маршрутов
+
+Считаются байты всех объектов, сериализованных основным процессом для передачи в пул
+Время решения TSP уменьшено, тк на объем передаваемых данных оно не влияет
+
+Запуск: PYTHONPATH=src python benchmarks/ipc_bytes.py [сторона решетки]
+"""
+
+from __future__ import annotations
+
+import multiprocessing as mp
+import sys
+from multiprocessing import reduction
+
+from routing import solution as sl
+from routing import spatial_objects as sp
+
+_sent_bytes = 0
+_dumps = reduction.ForkingPickler.dumps
+
+
+def _counting_dumps(obj, protocol=None):
+    """Сериализовать объект и учесть размер результата"""
+
+    global _sent_bytes
+    data = _dumps(obj, protocol)
+    _sent_bytes += len(data)
+    return data
+
+
+def build_grid_graph(side: int) -> sp.Graph:
+    graph = sp.Graph()
+
+    for i in range(side):
+        for j in range(side):
+            if i + 1 < side:
+                graph.add_edge(sp.Segment(sp.Point(i, j), sp.Point(i + 1, j)))
+
+            if j + 1 < side:
+                graph.add_edge(sp.Segment(sp.Point(i, j), sp.Point(i, j + 1)))
+
+    return graph
+
+
+def main() -> None:
+    global _sent_bytes
+
+    side = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    graph = build_grid_graph(side)
+    points = [sp.Point(i, j) for i in range(0, side, 3) for j in range(0, side, 3)]
+    reduction.ForkingPickler.dumps = _counting_dumps
+    sl._TSP_TIMELIMIT = 0.1
+
+    print(f"Метод запуска процессов: {mp.get_start_method()}, ребер в графе: {side * (side - 1) * 2}")
+
+    for clusters_amt in 2, 4, 8, 16, 32:
+        _sent_bytes = 0
+        list(sl.build_routes(points.copy(), clusters_amt, graph, 1))
+        print(f"Кластеров: {clusters_amt:2}, передано в пул: {_sent_bytes / 1024:8.1f} КиБ")
+
+
+if __name__ == "__main__":
+    main()
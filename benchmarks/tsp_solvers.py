@@ -0,0 +1,42 @@
+"""Сравнение алгоритмов решения TSP - генетического алгоритма и управляемого локального поиска OR-Tools
+
+Для каждого размера кластера и лимита времени выводятся длины найденных маршрутов и фактическое время поиска
+
+Запуск: PYTHONPATH=src python benchmarks/tsp_solvers.py
+"""
+
+from __future__ import annotations
+
+import random
+from timeit import default_timer as timer
+
+from routing import spatial_objects as sp
+from routing.algorithms import genetic_algorithm as ga
+from routing.algorithms import or_tools_tsp as ort
+
+_SOLVERS = {"genetic": ga.genetic_algorithm_for_tsp, "or_tools": ort.or_tools_for_tsp}
+
+
+def get_route_length(route: list[sp.Point]) -> float:
+    return sum(route[i - 1].get_distance_to(route[i]) for i in range(len(route)))
+
+
+def main() -> None:
+    generator = random.Random(0)
+
+    for cluster_size in 20, 50, 100, 200:
+        points = [sp.Point(generator.random() * 100, generator.random() * 100) for _ in range(cluster_size)]
+
+        for time_limit in 1, 5:
+            results = []
+
+            for name, solver in _SOLVERS.items():
+                start = timer()
+                route = solver(points, time_limit)
+                results.append(f"{name}: {get_route_length(route):8.1f} за {timer() - start:4.1f} с")
+
+            print(f"Точек: {cluster_size:3}, лимит {time_limit} с | " + " | ".join(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -12,58 +12,499 @@
 Алгоритм
 - Добавить начальную вершину в очередь
 - Цикл
-- - Извлечь вершину из очереди
+- - Извлечь вершину из очереди, пропустив ее, если запись устарела - путь до вершины уже был укорочен
 - - Если вершина является искомой, выйти из цикла
-- - Добавить в очередь все непосещенные вершины, смежные с извлеченной
+- - Для всех смежных вершин, путь до которых через извлеченную вершину короче найденного ранее,
+    обновить длину пути и добавить вершину в очередь
 
-Временная сложность O(|E|), E - множество ребер графа
+Временная сложность O(|E| log |V|), E - множество ребер, V - множество вершин графа
+
+Двунаправленный A* выполняет поиск одновременно от начальной и от искомой вершины и останавливается, когда
+поиски встретились и найденный путь не может быть улучшен, что уменьшает количество рассмотренных вершин
+на длинных путях
+
+Для поиска путей от одной вершины до нескольких используется алгоритм Дейкстры - A* с h(x) = 0,
+который останавливается, когда извлечены из очереди все искомые вершины
+Если нужны только пути до нескольких вершин, выполняется A*, направляемый поочередно к каждой из них
+
+В графе в формате CSR вершины задаются индексами, а их состояние хранится в массивах, которые создаются один раз
+для графа и переиспользуются всеми поисками
 """
 
 from __future__ import annotations
 
-import collections
 import heapq
+import math
+import weakref
+from array import array
+from typing import Callable, Iterable, Optional, Union
 
 from routing import spatial_objects as sp
+from routing.algorithms import landmarks as lm
 
 
-def a_star(start: sp.Point, finish: sp.Point, graph: sp.Graph) -> list[sp.Segment]:
+def a_star(
+        start: sp.Point, finish: sp.Point, graph: Union[sp.Graph, sp.CompactGraph],
+        landmarks: Optional[lm.Landmarks] = None, bidirectional: bool = False
+) -> list[sp.Segment]:
     """Выполнить алгоритм А*
 
     Args:
         start: Вершина, из которой выполняется поиск
         finish: Искомая вершина
-        graph: Граф, представленный списками смежности
+        graph: Граф, представленный списками смежности или в формате CSR
+        landmarks: Ориентиры графа в формате CSR, эвристика - наибольшая из оценок по ориентирам и по прямой
+        bidirectional: Выполнять поиск одновременно от начальной и от искомой вершины, только для графа в формате CSR
 
     Returns:
         Кратчайший путь от начальной вершины к искомой
+
+    Raises:
+        ValueError: Двунаправленный поиск в графе, представленном списками смежности
     """
 
-    a_star_data = collections.namedtuple("AStarData", ["distance", "parent", "edge"])
-    data = {start: a_star_data(0, None, None)}
-    priority_queue = []
-    heapq.heappush(priority_queue, (0, start))
+    if isinstance(graph, sp.CompactGraph):
+        search = _bidirectional_a_star_on_compact_graph if bidirectional else _a_star_on_compact_graph
+        return search(graph.get_node_id(start), graph.get_node_id(finish), graph, landmarks)
+    elif bidirectional:
+        raise ValueError("bidirectional search requires a compact graph")
+
+    distances = {start: 0}
+    parents = {}  # Предыдущие вершины и ребра до них в кратчайших путях
+    priority_queue = [(start.get_distance_to(finish), 0, start)]
     path = []
 
     while priority_queue:
-        current_node = heapq.heappop(priority_queue)[-1]
+        _, distance, current_node = heapq.heappop(priority_queue)
+
+        if distance > distances[current_node]:  # Устаревшая запись в очереди
+            continue
 
         if current_node == finish:
-            while data[current_node].edge is not None:  # Восстановить путь
-                path.append(data[current_node].edge)
-                current_node = data[current_node].parent
+            while current_node in parents:  # Восстановить путь
+                current_node, edge = parents[current_node]
+                path.append(edge)
 
             path.reverse()  # Развернуть путь, чтобы он был от старта к финишу
             break
 
-        for edge in graph.adjacency_lists[current_node]:  # Добавить в очередь все смежные непосещенные вершины
+        for edge in graph.adjacency_lists[current_node]:  # Ослабить ребра до смежных вершин
             adjacent = edge.get_another_border(current_node)
+            adjacent_distance = distance + edge.length
 
-            if adjacent not in data:
-                data[adjacent] = a_star_data(data[current_node].distance + edge.length, current_node, edge)
+            if adjacent_distance < distances.get(adjacent, math.inf):
+                distances[adjacent] = adjacent_distance
+                parents[adjacent] = current_node, edge
                 heapq.heappush(
                     priority_queue,
-                    (data[adjacent].distance + adjacent.get_distance_to(finish), adjacent)
+                    (adjacent_distance + adjacent.get_distance_to(finish), adjacent_distance, adjacent)
+                )
+
+    return path
+
+
+class _SearchSpace:
+    """Буферы состояния вершин при поиске в графе в формате CSR, переиспользуемые между поисками
+
+    Состояние вершины действительно, только если ее метка равна номеру текущего поиска,
+    поэтому перед поиском буферы не очищаются, а номер поиска увеличивается
+
+    Attributes:
+        distances: Длины найденных путей до вершин
+        parents: Индексы предыдущих вершин в найденных путях
+        parent_edges: Индексы ребер, по которым вершины достигнуты
+        stamps: Номера поисков, в которых вершины достигнуты
+        stamp: Номер текущего поиска
+    """
+
+    def __init__(self, nodes_amt: int) -> None:
+        self.distances = array("d", bytes(8 * nodes_amt))
+        self.parents = array("i", [-1]) * nodes_amt
+        self.parent_edges = array("i", [-1]) * nodes_amt
+        self.stamps = array("q", [0]) * nodes_amt
+        self.stamp = 0
+
+    def start_search(self, start: int) -> None:
+        """Начать новый поиск из вершины, сделав недействительными состояния вершин предыдущего поиска"""
+
+        self.stamp += 1
+        self.distances[start] = 0
+        self.parents[start] = self.parent_edges[start] = -1
+        self.stamps[start] = self.stamp
+
+
+_search_spaces = weakref.WeakKeyDictionary()  # Буферы поиска по графам, по 1 на каждое направление поиска
+
+
+def _get_search_space(graph: sp.CompactGraph, direction: int = 0) -> _SearchSpace:
+    """Получить буферы поиска для графа, создав их при первом обращении
+
+    Args:
+        graph: Граф в формате CSR
+        direction: 0 - буферы прямого поиска, 1 - обратного поиска двунаправленного A*
+    """
+
+    search_spaces = _search_spaces.setdefault(graph, [])
+
+    while len(search_spaces) <= direction:
+        search_spaces.append(_SearchSpace(len(graph)))
+
+    return search_spaces[direction]
+
+
+def _a_star_on_compact_graph(
+        start: int, finish: int, graph: sp.CompactGraph, landmarks: Optional[lm.Landmarks] = None
+) -> list[sp.Segment]:
+    """Выполнить алгоритм А* в графе в формате CSR
+
+    Вершины задаются индексами, эвристика вычисляется по массивам координат без создания объектов Point
+    Состояние вершин хранится в переиспользуемых буферах графа, устаревшие записи очереди пропускаются при извлечении
+
+    Args:
+        start: Индекс вершины, из которой выполняется поиск
+        finish: Индекс искомой вершины
+        graph: Граф в формате CSR
+        landmarks: Ориентиры графа
+
+    Returns:
+        Кратчайший путь от начальной вершины к искомой
+    """
+
+    offsets, targets, weights, edges = graph.offsets, graph.targets, graph.weights, graph.edges
+    get_heuristic = _get_heuristic(graph, finish, landmarks)
+    search_space = _get_search_space(graph)
+    search_space.start_search(start)
+    distances, parents, parent_edges = search_space.distances, search_space.parents, search_space.parent_edges
+    stamps, stamp = search_space.stamps, search_space.stamp
+    priority_queue = [(0, 0, start)]
+    path = []
+
+    while priority_queue:
+        _, distance, current_node = heapq.heappop(priority_queue)
+
+        if distance > distances[current_node]:  # Устаревшая запись в очереди
+            continue
+
+        if current_node == finish:
+            while parent_edges[current_node] != -1:  # Восстановить путь
+                path.append(graph.get_segment(parent_edges[current_node]))
+                current_node = parents[current_node]
+
+            path.reverse()
+            break
+
+        for slot in range(offsets[current_node], offsets[current_node + 1]):
+            adjacent = targets[slot]
+            adjacent_distance = distance + weights[slot]
+
+            if stamps[adjacent] != stamp or adjacent_distance < distances[adjacent]:
+                stamps[adjacent] = stamp
+                distances[adjacent] = adjacent_distance
+                parents[adjacent] = current_node
+                parent_edges[adjacent] = edges[slot]
+                heapq.heappush(
+                    priority_queue, (adjacent_distance + get_heuristic(adjacent), adjacent_distance, adjacent)
                 )
 
     return path
+
+
+def _bidirectional_a_star_on_compact_graph(
+        start: int, finish: int, graph: sp.CompactGraph, landmarks: Optional[lm.Landmarks] = None
+) -> list[sp.Segment]:
+    """Выполнить двунаправленный алгоритм А* в графе в формате CSR
+
+    Прямой поиск идет от начальной вершины, обратный - от искомой
+    Ребра графа неориентированные, поэтому обратный поиск идет по тем же спискам смежности, что и прямой
+
+    Потенциал вершины p(v) = (h(v, finish) - h(v, start)) / 2, приоритет в прямом поиске g(v) + p(v),
+    в обратном g'(v) - p(v), где h - эвристика, g' - длина пути от искомой вершины
+    С такими потенциалами приведенные длины ребер одинаковы и неотрицательны в обоих направлениях, поэтому поиск
+    корректно останавливается, когда сумма наименьших приоритетов в очередях не меньше длины найденного пути
+    Следующей раскрывается вершина из очереди с меньшим наименьшим приоритетом
+
+    Args:
+        start: Индекс вершины, из которой выполняется поиск
+        finish: Индекс искомой вершины
+        graph: Граф в формате CSR
+        landmarks: Ориентиры графа
+
+    Returns:
+        Кратчайший путь от начальной вершины к искомой
+    """
+
+    offsets, targets, weights, edges = graph.offsets, graph.targets, graph.weights, graph.edges
+    get_start_heuristic = _get_heuristic(graph, start, landmarks)
+    get_finish_heuristic = _get_heuristic(graph, finish, landmarks)
+    bound = get_finish_heuristic(start)  # Оценка длины пути
+
+    search_spaces = _get_search_space(graph, 0), _get_search_space(graph, 1)
+    search_spaces[0].start_search(start)
+    search_spaces[1].start_search(finish)
+    priority_queues = [(bound / 2, 0, start)], [(bound / 2, 0, finish)]  # p(start) = -p(finish) = bound / 2
+    directions = [  # Состояние поиска в каждом направлении и знак потенциала в приоритете
+        (
+            priority_queues[direction], search_spaces[direction].distances, search_spaces[direction].stamps,
+            search_spaces[direction].stamp, search_spaces[direction].parents, search_spaces[direction].parent_edges,
+            search_spaces[1 - direction].distances, search_spaces[1 - direction].stamps,
+            search_spaces[1 - direction].stamp, 1 - 2 * direction
+        )
+        for direction in (0, 1)
+    ]
+    best_distance, meeting_node = (0, start) if start == finish else (math.inf, -1)
+
+    while priority_queues[0] and priority_queues[1] and (
+            priority_queues[0][0][0] + priority_queues[1][0][0] < best_distance
+    ):
+        (
+            priority_queue, distances, stamps, stamp, parents, parent_edges, other_distances, other_stamps,
+            other_stamp, sign
+        ) = directions[priority_queues[0][0][0] > priority_queues[1][0][0]]
+        _, distance, current_node = heapq.heappop(priority_queue)
+
+        if distance > distances[current_node]:  # Устаревшая запись в очереди
+            continue
+
+        for slot in range(offsets[current_node], offsets[current_node + 1]):
+            adjacent = targets[slot]
+            adjacent_distance = distance + weights[slot]
+
+            if stamps[adjacent] != stamp or adjacent_distance < distances[adjacent]:
+                stamps[adjacent] = stamp
+                distances[adjacent] = adjacent_distance
+                parents[adjacent] = current_node
+                parent_edges[adjacent] = edges[slot]
+                potential = (get_finish_heuristic(adjacent) - get_start_heuristic(adjacent)) / 2
+                heapq.heappush(priority_queue, (adjacent_distance + sign * potential, adjacent_distance, adjacent))
+
+                if other_stamps[adjacent] == other_stamp:  # Вершина достигнута обоими поисками
+                    path_distance = adjacent_distance + other_distances[adjacent]
+
+                    if path_distance < best_distance:
+                        best_distance, meeting_node = path_distance, adjacent
+
+    if meeting_node == -1:
+        return []
+
+    paths = [], []  # Пути от вершины встречи до начальной и до искомой вершин
+
+    for search_space, path in zip(search_spaces, paths):
+        node = meeting_node
+
+        while search_space.parent_edges[node] != -1:
+            path.append(graph.get_segment(search_space.parent_edges[node]))
+            node = search_space.parents[node]
+
+    paths[0].reverse()
+    return paths[0] + paths[1]
+
+
+def find_paths(
+        start: sp.Point, finishes: Iterable[sp.Point], graph: sp.CompactGraph, landmarks: Optional[lm.Landmarks] = None
+) -> dict[sp.Point, list[sp.Segment]]:
+    """Найти кратчайшие пути от вершины до нескольких вершин одним поиском А*
+
+    Поиск направляется к ближайшей по прямой из искомых вершин, еще не извлеченных из очереди
+    Эвристика согласованная, поэтому длины путей до извлеченных вершин окончательные, и после извлечения цели
+    поиск продолжается к следующей: приоритеты записей в очереди пересчитываются, а извлеченные вершины
+    не раскрываются заново
+
+    Args:
+        start: Вершина, из которой выполняется поиск
+        finishes: Искомые вершины
+        graph: Граф в формате CSR
+        landmarks: Ориентиры графа, эвристика - наибольшая из оценок по ориентирам и по прямой
+
+    Returns:
+        Кратчайшие пути до достижимых искомых вершин
+    """
+
+    offsets, targets, weights, edges = graph.offsets, graph.targets, graph.weights, graph.edges
+    xs, ys = graph.xs, graph.ys
+    start = graph.get_node_id(start)
+    remaining_finishes = {graph.get_node_id(finish) for finish in finishes}
+    search_space = _get_search_space(graph)
+    search_space.start_search(start)
+    distances, parents, parent_edges = search_space.distances, search_space.parents, search_space.parent_edges
+    stamps, stamp = search_space.stamps, search_space.stamp
+    priority_queue = [(0, 0, start)]
+    paths = {}
+
+    def get_nearest_finish() -> Callable[[int], float]:
+        """Выбрать следующую цель поиска и пересчитать для нее приоритеты записей в очереди
+
+        Returns:
+            Эвристика до цели
+        """
+
+        finish = min(remaining_finishes, key=lambda node: (xs[node] - xs[start]) ** 2 + (ys[node] - ys[start]) ** 2)
+        get_heuristic = _get_heuristic(graph, finish, landmarks)
+        priority_queue[:] = [  # Устаревшие записи отбрасываются
+            (node_distance + get_heuristic(node), node_distance, node)
+            for _, node_distance, node in priority_queue if node_distance <= distances[node]
+        ]
+        heapq.heapify(priority_queue)
+        return get_heuristic
+
+    if remaining_finishes:
+        get_heuristic = get_nearest_finish()
+    else:
+        priority_queue.clear()
+
+    while priority_queue:
+        _, distance, current_node = heapq.heappop(priority_queue)
+
+        if distance > distances[current_node]:  # Устаревшая запись в очереди
+            continue
+
+        if current_node in remaining_finishes:
+            remaining_finishes.remove(current_node)
+            path = []
+            node = current_node
+
+            while parent_edges[node] != -1:  # Восстановить путь
+                path.append(graph.get_segment(parent_edges[node]))
+                node = parents[node]
+
+            path.reverse()
+            paths[graph.get_point(current_node)] = path
+
+            if not remaining_finishes:
+                break
+
+            heapq.heappush(priority_queue, (distance, distance, current_node))  # Вершина еще не раскрыта
+            get_heuristic = get_nearest_finish()
+            continue
+
+        for slot in range(offsets[current_node], offsets[current_node + 1]):
+            adjacent = targets[slot]
+            adjacent_distance = distance + weights[slot]
+
+            if stamps[adjacent] != stamp or adjacent_distance < distances[adjacent]:
+                stamps[adjacent] = stamp
+                distances[adjacent] = adjacent_distance
+                parents[adjacent] = current_node
+                parent_edges[adjacent] = edges[slot]
+                heapq.heappush(
+                    priority_queue, (adjacent_distance + get_heuristic(adjacent), adjacent_distance, adjacent)
+                )
+
+    return paths
+
+
+def _get_heuristic(
+        graph: sp.CompactGraph, finish: int, landmarks: Optional[lm.Landmarks] = None
+) -> Callable[[int], float]:
+    """Получить эвристику A* до вершины: наибольшую из оценок по ориентирам и по прямой или только по прямой"""
+
+    if landmarks is not None:
+        return landmarks.get_heuristic(graph, finish)
+
+    xs, ys = graph.xs, graph.ys
+    finish_x, finish_y = xs[finish], ys[finish]
+
+    def get_heuristic(node: int) -> float:
+        return math.hypot(xs[node] - finish_x, ys[node] - finish_y)
+
+    return get_heuristic
+
+
+class ShortestPathTree:
+    """Дерево кратчайших путей из одной вершины графа в формате CSR
+
+    Хранит только вершины, извлеченные из очереди до остановки поиска, пути восстанавливаются по запросу
+
+    Attributes:
+        _graph: Граф, в котором выполнялся поиск
+        _distances: Длины кратчайших путей до вершин по их индексам
+        _parents: Индексы предыдущих вершин и ребер до них в кратчайших путях
+    """
+
+    def __init__(
+            self, graph: sp.CompactGraph, distances: dict[int, float], parents: dict[int, tuple[int, int]]
+    ) -> None:
+        self._graph = graph
+        self._distances = distances
+        self._parents = parents
+
+    def __contains__(self, item) -> bool:
+        return item in self._graph and self._graph.get_node_id(item) in self._distances
+
+    def get_distance(self, finish: sp.Point) -> float:
+        """Получить длину кратчайшего пути до вершины
+
+        Raises:
+            KeyError: Вершина не достигнута при поиске
+        """
+
+        return self._distances[self._graph.get_node_id(finish)]
+
+    def get_path(self, finish: sp.Point) -> list[sp.Segment]:
+        """Восстановить кратчайший путь до вершины
+
+        Raises:
+            KeyError: Вершина не достигнута при поиске
+        """
+
+        node = self._graph.get_node_id(finish)
+
+        if node not in self._distances:
+            raise KeyError(finish)
+
+        path = []
+
+        while node in self._parents:
+            node, edge = self._parents[node]
+            path.append(self._graph.get_segment(edge))
+
+        path.reverse()
+        return path
+
+
+def dijkstra(start: sp.Point, finishes: Iterable[sp.Point], graph: sp.CompactGraph) -> ShortestPathTree:
+    """Найти кратчайшие пути от вершины до нескольких вершин одним поиском
+
+    Args:
+        start: Вершина, из которой выполняется поиск
+        finishes: Искомые вершины
+        graph: Граф в формате CSR
+
+    Returns:
+        Дерево кратчайших путей, содержащее все достижимые искомые вершины
+    """
+
+    offsets, targets, weights, edges = graph.offsets, graph.targets, graph.weights, graph.edges
+    start = graph.get_node_id(start)
+    remaining_finishes = {graph.get_node_id(finish) for finish in finishes}
+    search_space = _get_search_space(graph)
+    search_space.start_search(start)
+    distances, parents, parent_edges = search_space.distances, search_space.parents, search_space.parent_edges
+    stamps, stamp = search_space.stamps, search_space.stamp
+    settled_nodes = []  # Вершины, извлеченные из очереди
+    priority_queue = [(0, start)]
+
+    while priority_queue and remaining_finishes:
+        distance, current_node = heapq.heappop(priority_queue)
+
+        if distance > distances[current_node]:  # Устаревшая запись в очереди
+            continue
+
+        settled_nodes.append(current_node)
+        remaining_finishes.discard(current_node)
+
+        for slot in range(offsets[current_node], offsets[current_node + 1]):
+            adjacent = targets[slot]
+            adjacent_distance = distance + weights[slot]
+
+            if stamps[adjacent] != stamp or adjacent_distance < distances[adjacent]:
+                stamps[adjacent] = stamp
+                distances[adjacent] = adjacent_distance
+                parents[adjacent] = current_node
+                parent_edges[adjacent] = edges[slot]
+                heapq.heappush(priority_queue, (adjacent_distance, adjacent))
+
+    return ShortestPathTree(  # Буферы переиспользуются следующим поиском, поэтому состояние копируется
+        graph,
+        {node: distances[node] for node in settled_nodes},
+        {node: (parents[node], parent_edges[node]) for node in settled_nodes if parent_edges[node] != -1}
+    )
@@ -0,0 +1,377 @@
+"""Иерархии сжатия - Contraction Hierarchies
+
+Ускорение поиска кратчайших путей в графе, который долго не меняется, за счет предварительной обработки
+
+Предварительная обработка
+- Вершины по очереди удаляются из графа - сжимаются, порядок сжатия задает ранг вершины
+- - Следующей сжимается вершина с наименьшим приоритетом
+    = количество добавляемых коротких путей - количество удаляемых ребер + количество сжатых соседей
+- - Приоритеты пересчитываются лениво: если после пересчета приоритет извлеченной вершины больше следующего
+    в очереди, вершина возвращается в очередь
+- При сжатии вершины v для каждой пары ее несжатых соседей u, w
+- - Если поиск свидетеля - кратчайшего пути от u до w без v - не находит путь не длиннее u -> v -> w,
+    в граф добавляется короткий путь (shortcut) u -> w через v
+- - Поиск свидетеля ограничен количеством извлеченных из очереди вершин, поэтому иногда добавляются лишние короткие
+    пути, что не нарушает корректность
+- Ребра и короткие пути от вершины к вершинам большего ранга образуют восходящий граф
+
+Запрос
+- Двунаправленный алгоритм Дейкстры, оба поиска идут только вверх по рангу
+- - Ребра графа неориентированные, поэтому прямой и обратный поиски используют один и тот же восходящий граф
+- - Поиск в одном направлении останавливается, когда наименьшая длина в его очереди не меньше лучшего пути
+- Короткие пути в найденном пути заменяются на пары путей, из которых они составлены, пока не останутся ребра графа
+
+Поиск в восходящем графе рассматривает на порядки меньше вершин, чем A*
+
+Длины восходящих дуг и выбор коротких путей зависят от длин ребер, поэтому после их изменения иерархия устаревает
+и должна быть построена заново
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+import os
+import pickle
+from array import array
+from typing import Union
+
+from routing import spatial_objects as sp
+
+_WITNESS_SEARCH_LIMIT = 50  # Наибольшее количество вершин, извлекаемых из очереди при поиске свидетеля
+
+
+class ContractionHierarchy:
+    """Иерархия сжатия графа в формате CSR
+
+    Восходящий граф хранится в формате CSR, как и исходный
+    Переход по восходящей дуге - ребро графа с индексом via, если via >= 0,
+    иначе короткий путь через вершину с индексом -via - 1
+
+    Attributes:
+        _graph: Граф, для которого построена иерархия
+        _ranks: Ранги вершин - порядковые номера сжатия
+        _offsets: Смещения списков восходящих дуг вершин, n + 1 элемент
+        _targets: Индексы вершин, в которые ведут восходящие дуги
+        _weights: Длины восходящих дуг
+        _vias: Ребра или промежуточные вершины восходящих дуг
+        _version: Версия графа, для которой построена иерархия
+    """
+
+    def __init__(
+            self, graph: sp.CompactGraph, ranks: array, offsets: array, targets: array, weights: array, vias: array
+    ) -> None:
+        self._graph = graph
+        self._ranks = ranks
+        self._offsets = offsets
+        self._targets = targets
+        self._weights = weights
+        self._vias = vias
+        self._version = graph.version
+
+    @classmethod
+    def from_graph(cls, graph: sp.CompactGraph) -> ContractionHierarchy:
+        """Построить иерархию сжатия графа
+
+        Args:
+            graph: Граф в формате CSR
+
+        Returns:
+            Иерархия сжатия
+        """
+
+        nodes_amt = len(graph)
+        adjacency = [{} for _ in range(nodes_amt)]  # Несжатые соседи вершин и длины дуг до них
+        vias = {}  # Ребра или промежуточные вершины дуг между несжатыми вершинами
+
+        for node in range(nodes_amt):
+            for slot in range(graph.offsets[node], graph.offsets[node + 1]):
+                adjacent, weight = graph.targets[slot], graph.weights[slot]
+
+                if adjacent != node and weight < adjacency[node].get(adjacent, math.inf):  # Оставить кратчайшее
+                    adjacency[node][adjacent] = weight
+                    vias[node, adjacent] = graph.edges[slot]
+
+        contracted_neighbours = [0] * nodes_amt
+        priority_queue = [
+            (_get_priority(adjacency, node, contracted_neighbours), node) for node in range(nodes_amt)
+        ]
+        heapq.heapify(priority_queue)
+        ranks = array("i", [0]) * nodes_amt
+        upward_arcs = [[] for _ in range(nodes_amt)]
+        rank = 0
+
+        while priority_queue:
+            _, node = heapq.heappop(priority_queue)
+            priority = _get_priority(adjacency, node, contracted_neighbours)
+
+            if priority_queue and priority > priority_queue[0][0]:  # Приоритет устарел
+                heapq.heappush(priority_queue, (priority, node))
+                continue
+
+            ranks[node] = rank
+            rank += 1
+
+            for adjacent, weight in adjacency[node].items():  # Дуги к несжатым вершинам имеют больший ранг
+                upward_arcs[node].append((adjacent, weight, vias.pop((node, adjacent))))
+                del adjacency[adjacent][node]
+                del vias[adjacent, node]
+                contracted_neighbours[adjacent] += 1
+
+            for first, second, length in _find_shortcuts(adjacency, node, adjacency[node]):
+                if length < adjacency[first].get(second, math.inf):
+                    adjacency[first][second] = adjacency[second][first] = length
+                    vias[first, second] = vias[second, first] = -node - 1
+
+            adjacency[node] = {}
+
+        offsets = array("q", [0])
+        targets, hierarchy_vias = array("i"), array("i")
+        weights = array("d")
+
+        for arcs in upward_arcs:
+            for adjacent, weight, via in arcs:
+                targets.append(adjacent)
+                weights.append(weight)
+                hierarchy_vias.append(via)
+
+            offsets.append(len(targets))
+
+        return cls(graph, ranks, offsets, targets, weights, hierarchy_vias)
+
+    @classmethod
+    def load(cls, path: Union[str, os.PathLike]) -> ContractionHierarchy:
+        """Загрузить иерархию, сохраненную методом save
+
+        Raises:
+            ValueError: Файл не содержит иерархию сжатия
+        """
+
+        with open(path, "rb") as file:
+            hierarchy = pickle.load(file)
+
+        if not isinstance(hierarchy, cls):
+            raise ValueError(f"file does not contain a contraction hierarchy: {path}")
+
+        hierarchy.__dict__.setdefault("_version", hierarchy.graph.version)  # Иерархия сохранена до появления версий
+        return hierarchy
+
+    @property
+    def graph(self) -> sp.CompactGraph:
+        return self._graph
+
+    @property
+    def is_current(self) -> bool:
+        """Длины ребер графа не менялись после построения иерархии"""
+
+        return self._version == self._graph.version
+
+    @property
+    def shortcuts_amt(self) -> int:
+        return sum(1 for via in self._vias if via < 0)
+
+    def save(self, path: Union[str, os.PathLike]) -> None:
+        """Сохранить иерархию вместе с графом в файл, чтобы не выполнять предварительную обработку повторно"""
+
+        with open(path, "wb") as file:
+            pickle.dump(self, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def get_distance(self, start: sp.Point, finish: sp.Point) -> float:
+        """Получить длину кратчайшего пути, math.inf, если путь не существует"""
+
+        return self._search(self._graph.get_node_id(start), self._graph.get_node_id(finish))[0]
+
+    def find_path(self, start: sp.Point, finish: sp.Point) -> list[sp.Segment]:
+        """Найти кратчайший путь в графе
+
+        Args:
+            start: Вершина, из которой выполняется поиск
+            finish: Искомая вершина
+
+        Returns:
+            Кратчайший путь из ребер графа, пустой, если путь не существует
+        """
+
+        _, forward_arcs, backward_arcs = self._search(self._graph.get_node_id(start), self._graph.get_node_id(finish))
+        path = []
+
+        for first, second, via in forward_arcs:
+            path.extend(self._unpack(first, second, via))
+
+        for first, second, via in backward_arcs:  # Дуги обратного поиска проходятся от верхней вершины к нижней
+            path.extend(self._unpack(second, first, via))
+
+        return [self._graph.get_segment(edge) for edge in path]
+
+    def _search(self, start: int, finish: int) -> tuple[float, list[tuple], list[tuple]]:
+        """Выполнить двунаправленный поиск в восходящем графе
+
+        Returns:
+            Длина кратчайшего пути, восходящие дуги прямого поиска от начальной вершины до вершины встречи,
+            восходящие дуги обратного поиска от вершины встречи до искомой вершины
+            Дуга - кортеж из нижней вершины, верхней вершины и via
+
+        Raises:
+            ValueError: Длины ребер графа изменились после построения иерархии
+        """
+
+        if not self.is_current:
+            raise ValueError("contraction hierarchy is outdated: edge lengths have changed")
+
+        offsets, targets, weights, vias = self._offsets, self._targets, self._weights, self._vias
+        distances = {start: 0}, {finish: 0}
+        parents = {}, {}  # Нижняя вершина и via дуги, по которой достигнута вершина
+        priority_queues = [(0, start)], [(0, finish)]
+        best_distance, meeting_node = (0, start) if start == finish else (math.inf, -1)
+
+        while priority_queues[0] or priority_queues[1]:
+            for direction in 0, 1:
+                priority_queue = priority_queues[direction]
+
+                if not priority_queue:
+                    continue
+
+                distance, current_node = heapq.heappop(priority_queue)
+
+                if distance >= best_distance:  # Пути через оставшиеся в очереди вершины не короче найденного
+                    priority_queue.clear()
+                    continue
+
+                if distance > distances[direction][current_node]:  # Устаревшая запись в очереди
+                    continue
+
+                other_distance = distances[1 - direction].get(current_node)
+
+                if other_distance is not None and distance + other_distance < best_distance:
+                    best_distance, meeting_node = distance + other_distance, current_node
+
+                for slot in range(offsets[current_node], offsets[current_node + 1]):
+                    adjacent = targets[slot]
+                    adjacent_distance = distance + weights[slot]
+
+                    if adjacent_distance < distances[direction].get(adjacent, math.inf):
+                        distances[direction][adjacent] = adjacent_distance
+                        parents[direction][adjacent] = current_node, vias[slot]
+                        heapq.heappush(priority_queue, (adjacent_distance, adjacent))
+
+        if meeting_node == -1:
+            return math.inf, [], []
+
+        arcs = [], []
+
+        for direction in 0, 1:
+            node = meeting_node
+
+            while node in parents[direction]:
+                lower_node, via = parents[direction][node]
+                arcs[direction].append((lower_node, node, via))
+                node = lower_node
+
+        arcs[0].reverse()  # Прямой поиск восстанавливается от вершины встречи к начальной вершине
+        return best_distance, arcs[0], arcs[1]
+
+    def _unpack(self, first: int, second: int, via: int) -> list[int]:
+        """Заменить дугу на ребра графа в порядке прохождения от first к second
+
+        Returns:
+            Индексы ребер графа
+        """
+
+        edges = []
+        stack = [(first, second, via)]
+
+        while stack:
+            first, second, via = stack.pop()
+
+            if via >= 0:
+                edges.append(via)
+                continue
+
+            middle = -via - 1  # Промежуточная вершина сжата раньше концов дуги, поэтому обе половины - ее дуги
+            stack.append((middle, second, self._get_via(middle, second)))
+            stack.append((first, middle, self._get_via(middle, first)))
+
+        return edges
+
+    def _get_via(self, lower_node: int, upper_node: int) -> int:
+        """Найти via восходящей дуги между вершинами"""
+
+        for slot in range(self._offsets[lower_node], self._offsets[lower_node + 1]):
+            if self._targets[slot] == upper_node:
+                return self._vias[slot]
+
+        raise KeyError((lower_node, upper_node))
+
+
+def _get_priority(adjacency: list[dict[int, float]], node: int, contracted_neighbours: list[int]) -> int:
+    """Вычислить приоритет сжатия вершины"""
+
+    shortcuts_amt = len(_find_shortcuts(adjacency, node, adjacency[node]))
+    return shortcuts_amt - len(adjacency[node]) + contracted_neighbours[node]
+
+
+def _find_shortcuts(
+        adjacency: list[dict[int, float]], node: int, neighbours: dict[int, float]
+) -> list[tuple[int, int, float]]:
+    """Найти короткие пути, которые нужно добавить при сжатии вершины
+
+    Args:
+        adjacency: Несжатые соседи вершин и длины дуг до них
+        node: Сжимаемая вершина
+        neighbours: Несжатые соседи сжимаемой вершины
+
+    Returns:
+        Короткие пути - кортежи из концов и длины
+    """
+
+    neighbours = list(neighbours.items())
+    shortcuts = []
+
+    for i, (first, first_weight) in enumerate(neighbours[:-1]):
+        lengths = {second: first_weight + second_weight for second, second_weight in neighbours[i + 1:]}
+        witness_distances = _find_witnesses(adjacency, first, node, lengths)
+
+        for second, length in lengths.items():
+            if witness_distances.get(second, math.inf) > length:
+                shortcuts.append((first, second, length))
+
+    return shortcuts
+
+
+def _find_witnesses(
+        adjacency: list[dict[int, float]], start: int, excluded_node: int, lengths: dict[int, float]
+) -> dict[int, float]:
+    """Найти длины путей от вершины до соседей сжимаемой вершины в обход нее
+
+    Поиск ограничен длиной самого длинного пути через сжимаемую вершину и количеством извлеченных вершин
+
+    Returns:
+        Длины найденных путей, не обязательно кратчайших
+    """
+
+    limit = max(lengths.values())
+    distances = {start: 0}
+    priority_queue = [(0, start)]
+    remaining = len(lengths)
+    settled_amt = 0
+
+    while priority_queue and remaining and settled_amt < _WITNESS_SEARCH_LIMIT:
+        distance, current_node = heapq.heappop(priority_queue)
+
+        if distance > distances[current_node]:
+            continue
+
+        if distance > limit:
+            break
+
+        settled_amt += 1
+        remaining -= current_node in lengths
+
+        for adjacent, weight in adjacency[current_node].items():
+            adjacent_distance = distance + weight
+
+            if adjacent != excluded_node and adjacent_distance < distances.get(adjacent, math.inf):
+                distances[adjacent] = adjacent_distance
+                heapq.heappush(priority_queue, (adjacent_distance, adjacent))
+
+    return distances
@@ -0,0 +1,150 @@
+"""Выпуклая оболочка монотонной цепью Эндрю и диаметр множества точек вращающимися калиперами
+
+Монотонная цепь - Andrew's monotone chain
+- Отбросить точки строго внутри выпуклой оболочки не более 8 крайних точек по направлениям x, y, x + y, x - y
+  (эвристика Акла - Туссена), из 200000 точек, равномерно распределенных в квадрате, остается около 850
+- Отсортировать оставшиеся точки по x, затем по y
+- Построить нижнюю цепь проходом слева направо и верхнюю - справа налево
+- - Пока последние 2 точки цепи и новая точка не образуют поворот против часовой стрелки, снять точку с цепи
+- Повороты проверяются знаком векторного произведения по исходным координатам без тригонометрии и новых объектов
+
+Вращающиеся калиперы - rotating calipers
+- Для каждой стороны оболочки найти наиболее удаленную от нее вершину, она сдвигается по оболочке только вперед
+- Пары концов стороны и этой вершины - антиподальные, среди них есть пара с наибольшим расстоянием
+
+Временная сложность O(n + h*log(h)) после отбрасывания точек, O(n*log(n)) в худшем случае, диаметр O(h)
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from routing import spatial_objects as sp
+
+
+def monotone_chain(points: list[sp.Point]) -> list[sp.Point]:
+    """Построить выпуклую оболочку точек
+
+    Args:
+        points: Точки, для которых нужно построить оболочку
+
+    Returns:
+        Вершины оболочки против часовой стрелки, начиная с точки с наименьшим x, при равенстве - y,
+        без точек на сторонах
+    """
+
+    indexes = get_hull_indexes(np.array([(point.x, point.y) for point in points]))
+    return [points[i] for i in indexes.tolist()]
+
+
+def get_hull_indexes(coordinates: np.ndarray) -> np.ndarray:
+    """Найти индексы вершин выпуклой оболочки точек
+
+    Args:
+        coordinates: Координаты точек, массив размера n x 2
+
+    Returns:
+        Индексы вершин оболочки против часовой стрелки, начиная с точки с наименьшим x, при равенстве - y
+    """
+
+    coordinates = np.asarray(coordinates, dtype=np.float64).reshape(-1, 2)
+
+    if not len(coordinates):
+        raise ValueError("creating a convex hull of 0 points")
+
+    xs, ys = coordinates[:, 0], coordinates[:, 1]
+    extremes = np.unique([
+        np.argmin(xs), np.argmax(xs), np.argmin(ys), np.argmax(ys),
+        np.argmin(xs + ys), np.argmax(xs + ys), np.argmin(xs - ys), np.argmax(xs - ys)
+    ])
+    candidates = np.arange(len(coordinates))
+    polygon = _build_chain(extremes[np.lexsort((ys[extremes], xs[extremes]))], xs, ys)
+
+    if len(polygon) > 2:  # Отбросить точки строго внутри многоугольника из крайних точек
+        inside = np.ones(len(coordinates), dtype=bool)
+
+        for start, finish in zip(polygon, polygon[1:] + polygon[:1]):
+            inside &= (xs[finish] - xs[start]) * (ys - ys[start]) - (ys[finish] - ys[start]) * (xs - xs[start]) > 0
+
+        candidates = candidates[~inside]
+
+    return np.array(_build_chain(candidates[np.lexsort((ys[candidates], xs[candidates]))], xs, ys))
+
+
+def get_diameter(coordinates: np.ndarray) -> tuple[int, int]:
+    """Найти пару наиболее удаленных друг от друга точек
+
+    Args:
+        coordinates: Координаты точек, массив размера n x 2
+
+    Returns:
+        Индексы 2 точек, расстояние между которыми наибольшее, в порядке обхода оболочки,
+        для 1 различной точки индексы совпадают
+    """
+
+    hull = get_hull_indexes(coordinates).tolist()
+    xs, ys = np.asarray(coordinates, dtype=np.float64).reshape(-1, 2)[hull].T.tolist()
+    hull_size = len(hull)
+
+    if hull_size < 3:
+        return hull[0], hull[-1]
+
+    def get_area(first: int, second: int, third: int) -> float:  # Удвоенная площадь треугольника
+        return (xs[second] - xs[first]) * (ys[third] - ys[first]) - (ys[second] - ys[first]) * (xs[third] - xs[first])
+
+    def get_squared_distance(first: int, second: int) -> float:
+        return (xs[first] - xs[second]) ** 2 + (ys[first] - ys[second]) ** 2
+
+    best_pair, best_distance = (0, 1), -1.0
+    opposite = 1  # Вершина, наиболее удаленная от текущей стороны
+
+    for start in range(hull_size):
+        finish = (start + 1) % hull_size
+
+        while get_area(start, finish, (opposite + 1) % hull_size) > get_area(start, finish, opposite):
+            opposite = (opposite + 1) % hull_size
+
+        for vertex in start, finish:
+            distance = get_squared_distance(vertex, opposite)
+
+            if distance > best_distance:
+                best_pair, best_distance = (vertex, opposite), distance
+
+    first, second = sorted(best_pair)
+    return hull[first], hull[second]
+
+
+def _build_chain(order: np.ndarray, xs: np.ndarray, ys: np.ndarray) -> list[int]:
+    """Построить выпуклую оболочку точек, отсортированных по x, затем по y
+
+    Args:
+        order: Индексы точек в порядке сортировки
+        xs, ys: Координаты всех точек
+
+    Returns:
+        Индексы вершин оболочки против часовой стрелки
+    """
+
+    order = order.tolist()
+    xs, ys = xs[order].tolist(), ys[order].tolist()
+
+    def build_half(positions: range) -> list[int]:
+        chain = []
+
+        for i in positions:
+            while len(chain) > 1 and (xs[chain[-1]] - xs[chain[-2]]) * (ys[i] - ys[chain[-2]]) - \
+                    (ys[chain[-1]] - ys[chain[-2]]) * (xs[i] - xs[chain[-2]]) <= 0:
+                chain.pop()
+
+            chain.append(i)
+
+        return chain
+
+    lower = build_half(range(len(xs)))
+    upper = build_half(range(len(xs) - 1, -1, -1))
+    hull = lower[:-1] + upper[:-1]
+
+    if len(hull) < 2 or (xs[hull[0]], ys[hull[0]]) == (xs[hull[-1]], ys[hull[-1]]):  # Все точки совпадают
+        hull = [0]
+
+    return [order[i] for i in hull]
@@ -13,28 +13,51 @@
 - - Скрещивание - создание 0.6 * K хромосом из 2 случайных
 - - Мутация - создание 0.3 * K хромосом из 1 случайной
 - - Вливание - создание 0.1 * K полностью случайных хромосом
+- - Улучшение нескольких лучших созданных хромосом локальным поиском 2-opt и Or-opt - меметический алгоритм
 - - Отбор K наиболее приспособленных хромосом из 2K == K хромосом с предыдущей итерации + K созданных на текущей
+- - Остановка, если исчерпан лимит времени, лучшая хромосома не улучшалась заданное число поколений
+    или достигнута заданная относительная разница с нижней оценкой длины маршрута
 """
 
 from __future__ import annotations
 
-import random
 import time
+from typing import Optional
+
+import numpy as np
 
 from routing import spatial_objects as sp
+from routing.algorithms import local_search as ls
 
 _POPULATION_SIZE = 50
 _CROSSOVER_SIZE = 30
 _MUTATION_SIZE = 15
 _INFUSED_SIZE = 5
+_LOCAL_SEARCH_SIZE = 2  # Количество лучших созданных хромосом, улучшаемых локальным поиском
+# Количество поколений без улучшения, после которого поиск останавливается, - не меньше минимального
+# и растет с количеством генов, тк маршрут из большего количества генов улучшается реже
+_MIN_STALE_GENERATIONS = 100
+_STALE_GENERATIONS_PER_GENE = 20
 
 
-def genetic_algorithm_for_tsp(genes: list[sp.Point], time_limit: int = 30) -> list[sp.Point]:
+def genetic_algorithm_for_tsp(
+        genes: list[sp.Point], time_limit: float = 30, stale_generations_limit: Optional[int] = None,
+        target_gap: Optional[float] = None, local_search: bool = True, distances: Optional[np.ndarray] = None
+) -> list[sp.Point]:
     """Генетический алгоритм для решения TSP
 
+    Хромосомы кодируются индексами генов и хранятся строками матрицы популяции
+    Длины маршрутов всей популяции вычисляются одной операцией по предварительно рассчитанной матрице расстояний
+
     Args:
         genes: Гены - точки, из которых строится маршрут
         time_limit: Лимит времени в секундах для поиска решения
+        stale_generations_limit: Количество поколений без улучшения лучшей хромосомы, после которого поиск
+            останавливается, по умолчанию - 20 на ген, но не меньше 100
+        target_gap: Относительная разница между длиной лучшего маршрута и нижней оценкой длины, при достижении
+            которой поиск останавливается, по умолчанию не используется
+        local_search: Улучшать ли созданные хромосомы локальным поиском
+        distances: Симметричная матрица расстояний между генами, по умолчанию - матрица Евклидовых расстояний
 
     Returns:
         Лучшая хромосома - маршрут, являющийся лучшим решением из найденных алгоритмом
@@ -43,55 +66,117 @@ def genetic_algorithm_for_tsp(genes: list[sp.Point], time_limit: int = 30) -> li
     if len(genes) <= 3:
         return genes.copy()
 
-    answer = []
-    population = [random.sample(genes, len(genes)) for _ in range(_POPULATION_SIZE)]
+    generator = np.random.default_rng()
+    distances = get_distance_matrix(genes) if distances is None else distances
+    distance_lists, neighbours = distances.tolist(), ls.get_neighbour_lists(distances)
+    population = _get_random_chromosomes(generator, _POPULATION_SIZE, len(genes))
+    answer, answer_estimation = population[0], float("inf")
+    target_estimation = _get_lower_bound(distances) * (1 + target_gap) if target_gap is not None else 0
+    stale_generations = 0  # Количество поколений без улучшения лучшей хромосомы
+
+    if stale_generations_limit is None:
+        stale_generations_limit = max(_MIN_STALE_GENERATIONS, _STALE_GENERATIONS_PER_GENE * len(genes))
+
     end_timing = time.time() + time_limit
 
-    while time.time() <= end_timing:
-        created_population = []
+    while time.time() <= end_timing and stale_generations < stale_generations_limit:
+        created_population = (
+            _crossover(*population[generator.integers(0, _POPULATION_SIZE, (2, _CROSSOVER_SIZE))]),  # Скрещивание
+            _mutation(generator, population[generator.choice(_POPULATION_SIZE, _MUTATION_SIZE, False)]),  # Мутация
+            # Добавление случайных хромосом, чтобы не застрять на локальном минимуме
+            _get_random_chromosomes(generator, _INFUSED_SIZE, len(genes)),
+        )
+
+        created_population = np.concatenate(created_population)
+
+        if local_search:
+            created_estimations = _estimation(created_population, distances)
+
+            for i in np.argsort(created_estimations)[:_LOCAL_SEARCH_SIZE]:
+                created_population[i] = ls.improve_tour(created_population[i].tolist(), distance_lists, neighbours)
+
+        population = np.concatenate((population, created_population))
+        estimations = _estimation(population, distances)  # Оценка
+        order = np.argsort(estimations, kind="stable")
+
+        if estimations[order[0]] < answer_estimation:
+            answer, answer_estimation = population[order[0]], estimations[order[0]]
+            stale_generations = 0
+        else:
+            stale_generations += 1
+
+        population = population[order[:_POPULATION_SIZE]]  # Отбор
+
+        if answer_estimation <= target_estimation:
+            break
 
-        for j in range(_CROSSOVER_SIZE):
-            created_population.append(_crossover(*random.sample(population, 2)))  # Скрещивание
+    return [genes[i] for i in answer]
 
-        for chromosome in random.sample(population, _MUTATION_SIZE):
-            created_population.append(_mutation(chromosome))  # Мутация
 
-        created_population += [  # Добавление случайных хромосом, чтобы не застрять на локальном минимуме
-            random.sample(genes, len(genes)) for _ in range(_INFUSED_SIZE)
-        ]
+def get_distance_matrix(genes: list[sp.Point]) -> np.ndarray:
+    """Вычислить матрицу Евклидовых расстояний между генами"""
 
-        population += created_population
-        population.sort(key=_estimation)  # Оценка
+    xs = np.array([gene.x for gene in genes])
+    ys = np.array([gene.y for gene in genes])
+    return np.round(np.hypot(xs[:, None] - xs[None, :], ys[:, None] - ys[None, :]), sp.get_precision())
 
-        if not answer or _estimation(answer) > _estimation(population[0]):
-            answer = population[0]
 
-        population = population[:_POPULATION_SIZE]  # Отбор
+def _get_lower_bound(distances: np.ndarray) -> float:
+    """Получить нижнюю оценку длины маршрута
+
+    В маршруте каждый ген соединен с 2 другими, поэтому длина маршрута не меньше половины суммы
+    2 наименьших расстояний от каждого гена до остальных
+    """
+
+    nearest_distances = np.sort(distances + np.diag(np.full(len(distances), np.inf)), axis=1)[:, :2]
+    return nearest_distances.sum() / 2
+
+
+def _get_random_chromosomes(generator: np.random.Generator, chromosomes_amt: int, genes_amt: int) -> np.ndarray:
+    """Создать матрицу из случайных хромосом - случайных перестановок индексов генов"""
+
+    return np.argsort(generator.random((chromosomes_amt, genes_amt)), axis=1)
 
-    return answer
 
+def _crossover(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """Скрестить пары хромосом
 
-def _crossover(first: list[sp.Point], second: list[sp.Point]) -> list[sp.Point]:
-    """Скрестить 2 хромосомы"""
+    Вторая половина хромосомы из first переносится в конец новой хромосомы,
+    оставшиеся гены берутся из хромосомы second в порядке следования
+
+    Args:
+        first: Матрица первых хромосом пар
+        second: Матрица вторых хромосом пар
+
+    Returns:
+        Матрица новых хромосом
+    """
 
-    crossover_point = len(second) // 2
-    crossover_part = first[crossover_point:]
-    crossover_part_hashed = set(crossover_part)
-    new_chromosome = [gene for gene in second if gene not in crossover_part_hashed]
-    new_chromosome.extend(crossover_part)
-    return new_chromosome
+    chromosomes_amt, genes_amt = first.shape
+    crossover_point = genes_amt // 2
+    rows = np.arange(chromosomes_amt)[:, None]
+    in_crossover_part = np.zeros(first.shape, dtype=bool)  # Входит ли ген в перенесенную часть хромосомы first
+    in_crossover_part[rows, first[:, crossover_point:]] = True
+    remaining_genes = second[~in_crossover_part[rows, second]].reshape(chromosomes_amt, crossover_point)
+    return np.concatenate((remaining_genes, first[:, crossover_point:]), axis=1)
 
 
-def _mutation(chromosome: list[sp.Point]) -> list[sp.Point]:
-    """Провести мутацию в хромосоме"""
+def _mutation(generator: np.random.Generator, chromosomes: np.ndarray) -> np.ndarray:
+    """Провести мутацию в хромосомах - перенести случайный участок каждой хромосомы в ее начало"""
 
-    mutation_part_length = random.randint(1, len(chromosome) - 1)
-    start = random.randint(0, len(chromosome) - mutation_part_length)
-    end = start + mutation_part_length
-    return chromosome[start:end] + chromosome[:start] + chromosome[end:]
+    chromosomes_amt, genes_amt = chromosomes.shape
+    mutation_part_length = generator.integers(1, genes_amt, (chromosomes_amt, 1))
+    start = generator.integers(0, genes_amt - mutation_part_length + 1)
+    positions = np.arange(genes_amt)[None, :]
+    source_positions = np.where(  # Позиции генов исходной хромосомы, переносимых на каждую позицию новой
+        positions < mutation_part_length,
+        positions + start,
+        np.where(positions < mutation_part_length + start, positions - mutation_part_length, positions)
+    )
+    return np.take_along_axis(chromosomes, source_positions, axis=1)
 
 
-def _estimation(chromosome: list[sp.Point]) -> float:
-    """Получить оценку хромосомы - подсчитать длину маршрута"""
+def _estimation(population: np.ndarray, distances: np.ndarray) -> np.ndarray:
+    """Получить оценки хромосом - подсчитать длины маршрутов"""
 
-    return sum([chromosome[i - 1].get_distance_to(chromosome[i]) for i in range(len(chromosome))])
+    return distances[population, np.roll(population, 1, axis=1)].sum(axis=1)
@@ -49,8 +49,9 @@ def graham_scan(data: list[sp.Point]) -> list[sp.Point]:
             origin = point
 
     points = data.copy()
-    points.sort(  # Сортировка по полярному углу
-        key=lambda k: math.acos((k.x - origin.x) / k.get_distance_to(origin)) if k is not origin else float("inf")
+    points.sort(  # Сортировка по полярному углу, косинус ограничен [-1, 1], тк расстояние округлено
+        key=lambda k: math.acos(max(min((k.x - origin.x) / k.get_distance_to(origin), 1), -1))
+        if k is not origin else float("inf")
     )  # origin должна быть в points, чтобы проверить предпоследний отрезок контура
     stack = [origin]
 
@@ -80,7 +81,5 @@ def _is_turn_counterclockwise(stack: list[sp.Point], current: sp.Point) -> bool:
     top = stack[-1]
     second_top = stack[-2]
 
-    first_vector = sp.Point(top.x - second_top.x, top.y - second_top.y)
-    second_vector = sp.Point(current.x - second_top.x, current.y - second_top.y)
-
-    return (first_vector.x*second_vector.y - first_vector.y*second_vector.x) > 0
+    # Координаты векторов не округляются и не создаются объекты Point
+    return (top.x - second_top.x) * (current.y - second_top.y) - (top.y - second_top.y) * (current.x - second_top.x) > 0
@@ -0,0 +1,85 @@
+"""Алгоритм Хелда - Карпа - Held-Karp
+
+Точное решение TSP методом динамического программирования по подмножествам
+
+Гены, кроме первого, нумеруются от 0 до n - 2, подмножество генов кодируется битовой маской
+dp[mask, j] - длина кратчайшего пути, который начинается в первом гене, проходит через все гены из mask
+и заканчивается в гене j ∈ mask
+
+Алгоритм
+- dp[{j}, j] = расстоянию от первого гена до j
+- Для подмножеств в порядке возрастания их размера
+- - dp[mask, j] = min(dp[mask \\ {j}, k] + расстояние от k до j), k ∈ mask \\ {j}
+- Длина маршрута = min(dp[все гены, j] + расстояние от j до первого гена)
+- Маршрут восстанавливается по сохраненным для каждого состояния предыдущим генам
+
+Все подмножества одного размера обрабатываются одной операцией над массивами
+
+Временная сложность O(2^n * n^2), пространственная O(2^n * n)
+"""
+
+from __future__ import annotations
+
+import itertools
+from typing import Optional
+
+import numpy as np
+
+from routing import spatial_objects as sp
+from routing.algorithms import genetic_algorithm as ga
+
+MAX_GENES_AMT = 16  # Наибольшее количество генов: для 16 генов таблицы занимают около 4 МиБ, для 30 - десятки ГиБ
+
+
+def held_karp_for_tsp(genes: list[sp.Point], distances: Optional[np.ndarray] = None) -> list[sp.Point]:
+    """Найти кратчайший маршрут, проходящий через все гены
+
+    Из-за экспоненциальной сложности применяется только для небольшого количества генов
+
+    Args:
+        genes: Гены - точки, из которых строится маршрут
+        distances: Матрица расстояний между генами, по умолчанию - матрица Евклидовых расстояний
+
+    Returns:
+        Кратчайший маршрут, начинающийся с первого гена
+
+    Raises:
+        ValueError: Генов больше MAX_GENES_AMT
+    """
+
+    if len(genes) > MAX_GENES_AMT:
+        raise ValueError(f"Held-Karp algorithm supports at most {MAX_GENES_AMT} genes")
+    elif len(genes) <= 3:
+        return genes.copy()
+
+    distances = ga.get_distance_matrix(genes) if distances is None else distances
+    subset_genes_amt = len(genes) - 1  # Количество генов, из которых составляются подмножества
+    bits = 1 << np.arange(subset_genes_amt)
+    path_lengths = np.full((1 << subset_genes_amt, subset_genes_amt), np.inf)  # dp
+    previous_genes = np.zeros(  # Предыдущий ген - индекс от 0 до MAX_GENES_AMT - 2
+        (1 << subset_genes_amt, subset_genes_amt), dtype=np.min_scalar_type(MAX_GENES_AMT - 2)
+    )
+    path_lengths[bits, np.arange(subset_genes_amt)] = distances[0, 1:]
+    transitions = distances[1:, 1:].T  # transitions[j, k] - расстояние от гена k до гена j
+
+    for subset_size in range(2, subset_genes_amt + 1):
+        masks = np.array([
+            sum(1 << gene for gene in subset) for subset in itertools.combinations(range(subset_genes_amt), subset_size)
+        ])
+        # candidates[i, j, k] - длина пути через masks[i] с последним геном j и предпоследним k
+        candidates = path_lengths[masks[:, None] ^ bits[None, :]] + transitions[None, :, :]
+        candidates[(masks[:, None] & bits[None, :]) == 0] = np.inf  # Последний ген должен входить в подмножество
+        previous_genes[masks] = np.argmin(candidates, axis=2)
+        path_lengths[masks] = np.min(candidates, axis=2)
+
+    mask = (1 << subset_genes_amt) - 1
+    gene = int(np.argmin(path_lengths[mask] + distances[1:, 0]))
+    route = []
+
+    while mask:  # Восстановить маршрут с конца
+        route.append(genes[gene + 1])
+        mask, gene = mask ^ (1 << gene), int(previous_genes[mask, gene])
+
+    route.append(genes[0])
+    route.reverse()
+    return route
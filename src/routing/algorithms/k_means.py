@@ -2,15 +2,29 @@
 
 from __future__ import annotations
 
-import itertools
 import random
+from multiprocessing import pool as mp_pool
+from typing import Optional
 
-from ortools.graph import pywrapgraph
+import numpy as np
+
+try:  # OR-Tools >= 9.4 - дуги добавляются и потоки читаются 1 вызовом из массивов
+    from ortools.graph.python import min_cost_flow
+except ImportError:  # В старых версиях есть только решатель, принимающий дуги по одной
+    min_cost_flow = None
+    from ortools.graph import pywrapgraph
 
 from routing import spatial_objects as sp
-from routing.algorithms import graham_scan as gs
+from routing.algorithms import convex_hull as cvh
+from routing.algorithms import spatial_index as si
 
 _MAX_ITERATIONS = 10  # Предельное количество итераций в K-Means
+_CANDIDATE_CENTROIDS_AMT = 16  # Количество ближайших центроидов, с которыми соединяется вершина в сети
+_REPAIR_PASSES = 5  # Предельное количество проходов улучшения обменами в приближенном распределении
+_EPSILON = 1e-9  # Наименьшее учитываемое уменьшение суммы расстояний при обмене
+_ASSIGNMENTS = "exact", "greedy"  # Способы распределения точек по кластерам
+_STRATEGIES = "flat", "bisection"  # Способы кластеризации - сразу на k кластеров или рекурсивным делением
+_BISECTION_FAN_OUT = 2  # Количество частей, на которые делятся точки на каждом уровне рекурсивного деления
 
 
 class KMeansError(Exception):
@@ -19,38 +33,174 @@ class KMeansError(Exception):
     pass
 
 
-def k_means(points: list[sp.Point], clusters_amt: int) -> list[sp.Cluster]:
+def k_means(
+        points: list[sp.Point], clusters_amt: int, assignment: str = "exact", restarts: int = 1,
+        pool: Optional[mp_pool.Pool] = None, processes_num: int = 1, seed: Optional[int] = None,
+        strategy: str = "flat"
+) -> list[sp.Cluster]:
     """Алгоритм K-Means с ограничением максимального размера кластера
 
     Если точки не делятся на равные кластеры, то остаток от деления распределяется по кластерам по 1 точке
 
     Алгоритм K-Means
     - Выбрать начальные центры кластеров
-    - - Построить выпуклую оболочку алгоритмом Грэхема  # O(n*logn)
-    - - Выбрать 2 наиболее удаленные точки из выпуклой оболочки - 2 первых центра  # O(n^2)
-    - - Выбрать оставшиеся центры, как наиболее удаленные от текущих выбранных центров  # O(k*n)
+    - - Построить выпуклую оболочку монотонной цепью  # O(n*logn)
+    - - Выбрать 2 наиболее удаленные точки из выпуклой оболочки вращающимися калиперами - 2 первых центра  # O(h)
+    - - Выбрать оставшиеся центры, как наиболее удаленные от текущих выбранных центров, по пространственному индексу
     - Цикл, пока меняются центроиды и пока не достигнут лимит итераций
     - - Разделить точки на кластеры
     - - Обновить центроиды
 
+    При нескольких запусках первый начинается с центров, выбранных по выпуклой оболочке, остальные - с центров,
+    наиболее удаленных от случайной точки, и возвращается разбиение с наименьшей суммой расстояний от точек до
+    центроидов, к которым они отнесены
+    Запуск прерывается, если даже при сохранении уменьшения суммы расстояний на последней итерации до конца он не
+    станет лучше найденного разбиения
+    Запуски выполняются в пуле процессов волнами по processes_num, каждой волне передается лучшая сумма предыдущих
+
+    При большом количестве кластеров точки можно делить рекурсивно, см. _k_means_by_bisection
+
     Args:
         points: Список точек, который нужно кластеризовать
         clusters_amt: Количество кластеров, на которые нужно разбить точки
+        assignment: Способ разделения точек на кластеры на каждой итерации
+            exact - min-cost flow, greedy - приближенно жадным алгоритмом по сожалению с улучшением обменами
+        restarts: Количество запусков с разными начальными центрами
+        pool: Пул процессов для параллельных запусков, по умолчанию запуски выполняются в текущем процессе
+        processes_num: Количество процессов в пуле
+        seed: Начальное значение генератора случайных чисел для выбора начальных центров запусков
+        strategy: Способ кластеризации
+            flat - сразу на k кластеров, bisection - рекурсивным делением точек на небольшое количество частей
 
     Returns:
         Стабилизированные кластеры, полученные при разделении переданного списка точек
+
+    Raises:
+        ValueError: Неизвестный способ разделения точек на кластеры или кластеризации, неверное количество запусков
     """
 
+    if assignment not in _ASSIGNMENTS:
+        raise ValueError(f"unknown assignment method: {assignment}")
+    elif strategy not in _STRATEGIES:
+        raise ValueError(f"unknown clustering strategy: {strategy}")
+    elif restarts < 1:
+        raise ValueError("wrong amount of restarts")
+
     if clusters_amt == 1:
         return [sp.Cluster(points)]
     elif clusters_amt >= len(points):
         return [sp.Cluster([point]) for point in points]
+    elif strategy == "bisection":
+        return _k_means_by_bisection(points, clusters_amt, assignment, restarts, pool, seed)
+
+    sizes = _get_cluster_sizes(len(points), clusters_amt)
+    return _k_means_with_restarts(points, sizes, assignment, restarts, pool, processes_num, seed)
+
+
+def _k_means_with_restarts(
+        points: list[sp.Point], sizes: list[int], assignment: str, restarts: int = 1,
+        pool: Optional[mp_pool.Pool] = None, processes_num: int = 1, seed: Optional[int] = None
+) -> list[sp.Cluster]:
+    """Выполнить K-Means 1 или несколько раз и выбрать разбиение с наименьшей суммой расстояний
+
+    Args:
+        points: Кластеризуемые точки
+        sizes: Размеры кластеров, 1 < k < n
+        assignment: Способ разделения точек на кластеры
+        restarts: Количество запусков с разными начальными центрами
+        pool: Пул процессов для параллельных запусков
+        processes_num: Количество процессов в пуле
+        seed: Начальное значение генератора случайных чисел для выбора начальных центров запусков
+
+    Returns:
+        Кластеры заданных размеров
+    """
+
+    if restarts == 1:
+        return _run_k_means(points, sizes, assignment)[0]
+
+    generator = random.Random(seed)
+    first_centers = [None] + [generator.randrange(len(points)) for _ in range(restarts - 1)]
+    wave_size = max(processes_num, 1) if pool is not None else 1
+    best_clusters, best_cost = None, float("inf")
+
+    for i in range(0, restarts, wave_size):
+        wave = first_centers[i:i + wave_size]
+        tasks = [(points, sizes, assignment, first_center, best_cost) for first_center in wave]
+        results = pool.imap_unordered(_run_restart, tasks) if pool is not None else map(_run_restart, tasks)
+
+        for clusters, cost in results:
+            if cost < best_cost:
+                best_clusters, best_cost = clusters, cost
+
+    return best_clusters
+
+
+def _run_restart(
+        task: tuple[list[sp.Point], list[int], str, Optional[int], float]
+) -> tuple[Optional[list[sp.Cluster]], float]:
+    """Выполнить 1 запуск K-Means из нескольких, аргументы передаются кортежем для выполнения в пуле процессов
+
+    Args:
+        task: Кластеризуемые точки, размеры кластеров, способ разделения точек на кластеры,
+            индекс точки, от которой выбираются начальные центры, или None для выбора по выпуклой оболочке,
+            наименьшая сумма расстояний в предыдущих запусках
+
+    Returns:
+        Кластеры и сумма расстояний от точек до центроидов или None и бесконечность, если запуск прерван
+    """
+
+    points, sizes, assignment, first_center, best_cost = task
+    return _run_k_means(points, sizes, assignment, first_center, best_cost)
+
+
+def _run_k_means(
+        points: list[sp.Point], sizes: list[int], assignment: str, first_center: Optional[int] = None,
+        best_cost: Optional[float] = None
+) -> tuple[Optional[list[sp.Cluster]], float]:
+    """Выполнить итерации K-Means от начальных центров
+
+    Args:
+        points: Кластеризуемые точки
+        sizes: Размеры кластеров, 1 < k < n
+        assignment: Способ разделения точек на кластеры
+        first_center: Индекс точки, от которой выбираются наиболее удаленные начальные центры,
+            None - первые 2 центра выбираются по выпуклой оболочке
+        best_cost: Наименьшая сумма расстояний, найденная ранее, None - сумма не вычисляется и запуск не прерывается
+
+    Returns:
+        Кластеры и сумма расстояний от точек до центроидов или None и бесконечность, если запуск прерван
+    """
 
     clusters: list[sp.Cluster] = []
-    centroids: list[sp.Point] = _get_initial_clusters_centers(points, clusters_amt)  # O(n^2)
+    clusters_amt = len(sizes)
+    network = _FlowNetwork(points, clusters_amt, sizes)
+    index = si.GridIndex(network.coordinates)
+
+    if first_center is None:
+        centroids: list[sp.Point] = _get_initial_clusters_centers(points, clusters_amt, index, network.coordinates)
+    else:
+        centroids = [points[i] for i in index.get_farthest_sequence([first_center], clusters_amt)]
+
+    cost = previous_cost = float("inf")
 
     for j in range(_MAX_ITERATIONS):
-        clusters = _divide_points_into_clusters(points, clusters_amt, centroids)  # O(n^3*log(n*C))
+        if clusters_amt == 2:
+            clusters = _divide_points_in_two(points, centroids, network.coordinates, sizes)  # O(n*log(n))
+        elif assignment == "exact":
+            clusters = _divide_points_into_clusters(points, clusters_amt, centroids, network)  # O(n^3*log(n*C))
+        else:
+            clusters = _divide_points_greedily(  # O(n^2/k)
+                points, clusters_amt, centroids, network.coordinates, sizes
+            )
+
+        if best_cost is not None:
+            previous_cost, cost = cost, _get_cost(clusters, centroids)
+            remaining = _MAX_ITERATIONS - j - 1  # Оставшиеся итерации
+
+            if cost - max(previous_cost - cost, 0) * remaining > best_cost:  # Не станет лучше найденного разбиения
+                return None, float("inf")
+
         centroids_buffer = centroids
         centroids = []
 
@@ -61,64 +211,141 @@ def k_means(points: list[sp.Point], clusters_amt: int) -> list[sp.Cluster]:
         if centroids == centroids_buffer:
             break
 
-    return clusters
+    return clusters, cost
 
 
-def _get_initial_clusters_centers(points: list[sp.Point], clusters_amt: int) -> list[sp.Point]:
-    """Выбрать центры кластеров из списка кластеризуемых точек
+def _k_means_by_bisection(
+        points: list[sp.Point], clusters_amt: int, assignment: str, restarts: int = 1,
+        pool: Optional[mp_pool.Pool] = None, seed: Optional[int] = None
+) -> list[sp.Cluster]:
+    """Кластеризовать точки рекурсивным делением на небольшое количество частей
 
-    Алгоритм
-    - Построить выпуклую оболочку алгоритмом Грэхема
-    - Выбрать 2 наиболее удаленные точки из выпуклой оболочки == 2 первых центра
-    - Цикл пока не найдено достаточное количество центров
-    - - Добавить в список центров точку, наиболее удаленную от уже выбранных
+    Часть, из которой нужно получить k кластеров, делится K-Means с ограничением на min(_BISECTION_FAN_OUT, k) частей,
+    каждой из которых достается k_i кластеров, k_i отличаются не более чем на 1
+    - Размер части = k_i * ⌊n / k⌋ + количество кластеров размера ⌈n / k⌉ в ней, они распределяются по частям поровну
+    - Поэтому при дальнейшем делении размеры всех кластеров по-прежнему ⌊n / k⌋ или ⌈n / k⌉
+    Части 1 уровня рекурсии не зависят друг от друга и делятся параллельно в пуле процессов
 
-    Временная сложность O(n^2)
+    При делении на 2 части min-cost flow не нужен: точки распределяются точно сортировкой, см. _divide_points_in_two
+    Глубина рекурсии O(log(k)), на каждом уровне делятся все n точек
 
-    Источник - исходный код QGIS
+    Args:
+        points: Кластеризуемые точки
+        clusters_amt: Количество кластеров, 1 < k < n
+        assignment: Способ разделения точек на части
+        restarts: Количество запусков K-Means с разными начальными центрами при каждом делении
+        pool: Пул процессов для параллельного деления частей 1 уровня
+        seed: Начальное значение генератора случайных чисел для выбора начальных центров запусков
 
     Returns:
-        Список с вершинами, выбранными в качестве центров кластеров
+        Кластеры размера ⌊n / k⌋ или ⌈n / k⌉
     """
 
-    convex_hull: list[sp.Point] = gs.graham_scan(points)
-    max_distance = -1  # Максимальное расстояние между парой вершин в оболочке
-    first_center = second_center = None
+    generator = random.Random(seed)
+    cluster_size, large_amt = divmod(len(points), clusters_amt)  # large_amt - количество кластеров размера ⌈n / k⌉
+    parts = [(points, clusters_amt, large_amt)]  # Части текущего уровня - точки, количество кластеров и больших из них
+    clusters: list[sp.Cluster] = []
 
-    for i, j in itertools.combinations(convex_hull, r=2):  # Найти максимальное расстояние между парой точек O(n^2)
-        distance_in_pair = i.get_distance_to(j)
+    while parts:
+        tasks = []
 
-        if distance_in_pair > max_distance:
-            first_center, second_center = i, j
-            max_distance = distance_in_pair
+        for part_points, part_clusters_amt, part_large_amt in parts:
+            if part_clusters_amt == 1:
+                clusters.append(sp.Cluster(part_points))
+                continue
 
-    centers_indexes = [points.index(first_center), points.index(second_center)]
-    distances = [float("inf")] * len(points)  # Минимальные расстояния от вершин до любого из центров
-    distances[centers_indexes[0]] = distances[centers_indexes[1]] = 0  # Расстояния до центров кластеров == 0
+            children_clusters_amts = _get_cluster_sizes(part_clusters_amt, min(_BISECTION_FAN_OUT, part_clusters_amt))
+            # Остатки от деления достаются первым частям, поэтому больших кластеров в части не больше, чем кластеров
+            children_large_amts = _get_cluster_sizes(part_large_amt, len(children_clusters_amts))
+            tasks.append((
+                part_points, children_clusters_amts, children_large_amts,
+                [amt * cluster_size + large for amt, large in zip(children_clusters_amts, children_large_amts)],
+                assignment, restarts, generator.randrange(2 ** 32)
+            ))
 
-    for i in range(2, clusters_amt):  # Выбрать вершины в качестве центров O(kn)
-        last_added_center = points[centers_indexes[-1]]
-        distance_to_candidate = float("-inf")  # Наибольшее расстояние до точки, не являющейся центром кластера
-        candidate_index = -1
+        results = pool.map(_split_part, tasks) if pool is not None else map(_split_part, tasks)
+        parts = [part for result in results for part in result]
 
-        for j, current_distance in enumerate(distances):
-            if not current_distance:  # Пропустить центры кластеров
-                continue
+    return clusters
+
+
+def _split_part(
+        task: tuple[list[sp.Point], list[int], list[int], list[int], str, int, int]
+) -> list[tuple[list[sp.Point], int, int]]:
+    """Разделить часть точек на части заданных размеров, аргументы передаются кортежем для выполнения в пуле процессов
+
+    Args:
+        task: Точки части, количества кластеров в новых частях, количества больших кластеров в них,
+            размеры новых частей, способ разделения точек, количество запусков K-Means, начальное значение генератора
+
+    Returns:
+        Новые части - точки, количество кластеров и больших кластеров
+    """
+
+    points, clusters_amts, large_amts, sizes, assignment, restarts, seed = task
+
+    if len(points) == len(sizes):
+        clusters = [sp.Cluster([point]) for point in points]
+    else:
+        clusters = _k_means_with_restarts(points, sizes, assignment, restarts, seed=seed)
+
+    return list(zip(clusters, clusters_amts, large_amts))
+
+
+def _get_cluster_sizes(points_amt: int, clusters_amt: int) -> list[int]:
+    """Получить размеры кластеров ⌊n / k⌋ или ⌈n / k⌉, остаток от деления распределяется по 1 точке"""
+
+    return [points_amt // clusters_amt + bool(i < points_amt % clusters_amt) for i in range(clusters_amt)]
+
+
+def _get_cost(clusters: list[sp.Cluster], centroids: list[sp.Point]) -> float:
+    """Вычислить сумму расстояний от точек до центроидов их кластеров"""
+
+    coordinates = np.array([(point.x, point.y) for cluster in clusters for point in cluster])
+    centroids_coordinates = np.repeat(
+        np.array([(centroid.x, centroid.y) for centroid in centroids]), [len(cluster) for cluster in clusters], axis=0
+    )
+    return float(_get_distances(coordinates, centroids_coordinates).sum())
+
+
+def _get_initial_clusters_centers(
+        points: list[sp.Point], clusters_amt: int, index: Optional[si.GridIndex] = None,
+        coordinates: Optional[np.ndarray] = None
+) -> list[sp.Point]:
+    """Выбрать центры кластеров из списка кластеризуемых точек
+
+    Алгоритм
+    - Построить выпуклую оболочку монотонной цепью
+    - Выбрать 2 наиболее удаленные точки из выпуклой оболочки вращающимися калиперами == 2 первых центра
+    - Цикл пока не найдено достаточное количество центров
+    - - Добавить в список центров точку, наиболее удаленную от уже выбранных
+
+    Расстояния до новых центров обновляются по пространственному индексу,
+    поэтому выбор каждого следующего центра затрагивает только точки, которые могут стать ближе к нему
 
-            distances[j] = min(current_distance, points[j].get_distance_to(last_added_center))
+    Временная сложность O(n*log(n)) на построение оболочки и индекса, O(h) на поиск 2 первых центров,
+    h - количество точек в оболочке
 
-            if distances[j] > distance_to_candidate:
-                candidate_index = j
-                distance_to_candidate = distances[j]
+    Источник - исходный код QGIS
+
+    Args:
+        points: Кластеризуемые точки
+        clusters_amt: Количество кластеров
+        index: Пространственный индекс кластеризуемых точек
+        coordinates: Координаты кластеризуемых точек
 
-        centers_indexes.append(candidate_index)  # Добавить новый центр кластера
-        distances[candidate_index] = 0  # Обнулить расстояние до центра кластера из него самого
+    Returns:
+        Список с вершинами, выбранными в качестве центров кластеров
+    """
 
-    return [points[i] for i in centers_indexes]
+    coordinates = np.array([(point.x, point.y) for point in points]) if coordinates is None else coordinates
+    index = si.GridIndex(coordinates) if index is None else index
+    return [points[i] for i in index.get_farthest_sequence(list(cvh.get_diameter(coordinates)), clusters_amt)]
 
 
 def _divide_points_into_clusters(
-        points: list[sp.Point], clusters_amt: int, centroids: list[sp.Point]
+        points: list[sp.Point], clusters_amt: int, centroids: list[sp.Point],
+        network: Optional[_FlowNetwork] = None
 ) -> list[sp.Cluster]:
     """Разделить точки на кластеры одинаково размера
 
@@ -128,7 +355,7 @@ def _divide_points_into_clusters(
     - - - Пропускная способность ребра = 1
     - - - Стоимость транспортировки одного юнита = 0
     - Кластеризуемые вершины - вершины с 0 юнитов потока
-    - - Вершины соединены со всеми центроидами
+    - - Вершины соединены с c ближайшими центроидами
     - - - Пропускная способность ребра = 1
     - - - Стоимость транспортировки юнита = расстоянию от вершины до центроида
     - Центроиды - вершины с 0 юнитов потока
@@ -137,12 +364,22 @@ def _divide_points_into_clusters(
     - - - Стоимость транспортировки одного юнита = 0
     - Сток - фиктивная точка с количеством юнитов потока == количеству кластеризуемых вершин * -1
 
+    Если поток в сети с c ближайшими центроидами не существует, c удваивается, пока не станет равно k,
+    то есть пока вершины не будут соединены со всеми центроидами
+    Ближайшие центроиды находятся по пространственному индексу центроидов без матрицы расстояний n x k
+
     Min-cost max flow решается с помощью Google OR-Tools
 
     Источник - Constrained K-Means Clustering - Microsoft Research
 
     Временная сложность O(n^2*m*log(nC)), где n - количество вершин, m - количество ребер, C - наибольшая стоимость дуги
 
+    Args:
+        points: Кластеризуемые точки
+        clusters_amt: Количество кластеров
+        centroids: Центроиды кластеров
+        network: Неизменяемая часть сети, построенная для тех же точек и количества кластеров
+
     Returns:
         Кластеры, полученные при разделении переданного списка точек
 
@@ -150,50 +387,287 @@ def _divide_points_into_clusters(
         KMeansError: Не найдено решение min-cost max flow для сети
     """
 
-    min_cost_flow = pywrapgraph.SimpleMinCostFlow()
+    network = _FlowNetwork(points, clusters_amt) if network is None else network
+    index = si.GridIndex.from_points(centroids)
+    candidates_amt = min(_CANDIDATE_CENTROIDS_AMT, clusters_amt)
 
-    for i in range(1, len(points) + 1):  # Добавить ребра от истока до вершин, индексы вершин от 1 до n включительно
-        point = points[i - 1]
-        min_cost_flow.AddArcWithCapacityAndUnitCost(0, i, 1, 0)  # Start, end, capacity, cost
+    while True:
+        distances, nearest = index.query(network.coordinates, candidates_amt)
+        clusters = network.solve(nearest, distances)
 
-        for j in range(len(points) + 1, len(points) + clusters_amt + 1):  # Добавить ребра от вершины до центроидов
-            centroid = centroids[j - len(points) - 1]
-            min_cost_flow.AddArcWithCapacityAndUnitCost(
-                i, j, 1, int(point.get_distance_to(centroid) * (10 ** sp.get_precision()))
-            )  # Индексы центроидов от n+1 до n+k включительно
+        if clusters is not None:
+            return clusters
+        elif candidates_amt == clusters_amt:
+            raise KMeansError("the optimal solution was not found in the network")
 
-        min_cost_flow.SetNodeSupply(i, 0)  # Задать 0 количество юнитов для вершины
+        candidates_amt = min(candidates_amt * 2, clusters_amt)
 
-    # Индекс истока всегда = 0
-    sink_idx = len(points) + clusters_amt + 1  # Сток с индексом n+k+1
-    edge_capacity = len(points) // clusters_amt
-    remainder = len(points) % clusters_amt
 
-    for i in range(clusters_amt):  # Добавить ребра от центроидов до стока
-        centroid_idx = i + len(points) + 1
-        min_cost_flow.SetNodeSupply(centroid_idx, 0)  # Задать 0 количество юнитов для центроида
+def _divide_points_in_two(
+        points: list[sp.Point], centroids: list[sp.Point], coordinates: np.ndarray, sizes: list[int]
+) -> list[sp.Cluster]:
+    """Разделить точки на 2 кластера заданных размеров с наименьшей суммой расстояний до центроидов
 
-        # Увеличить пропускную способность на 1 у remained ребер для распределения остатка
-        min_cost_flow.AddArcWithCapacityAndUnitCost(centroid_idx, sink_idx, edge_capacity + bool(i < remainder), 0)
+    Сумма расстояний = сумма d2 по всем точкам + сумма (d1 - d2) по точкам 1 кластера, поэтому в 1 кластер
+    попадают s1 точек с наименьшей разностью d1 - d2, решение точное, как у min-cost flow
 
-    # Задать количество юнитов у истока и стока
-    min_cost_flow.SetNodeSupply(0, len(points))
-    min_cost_flow.SetNodeSupply(sink_idx, -len(points))
+    Args:
+        points: Кластеризуемые точки
+        centroids: Центроиды 2 кластеров
+        coordinates: Координаты кластеризуемых точек
+        sizes: Размеры 2 кластеров
 
-    status = min_cost_flow.Solve()
+    Returns:
+        Кластеры, полученные при разделении переданного списка точек
+    """
 
-    if status != min_cost_flow.OPTIMAL:
-        raise KMeansError("the optimal solution was not found in the network")
+    centroids_coordinates = np.array([(centroid.x, centroid.y) for centroid in centroids])
+    differences = _get_distances(coordinates, centroids_coordinates[0]) - \
+        _get_distances(coordinates, centroids_coordinates[1])
+    order = np.argsort(differences, kind="stable").tolist()
+    return [sp.Cluster([points[i] for i in order[:sizes[0]]]), sp.Cluster([points[i] for i in order[sizes[0]:]])]
 
-    clusters: list[sp.Cluster[sp.Point]] = [sp.Cluster() for _ in range(clusters_amt)]
 
-    for arc in range(min_cost_flow.NumArcs()):
-        arc_between_node_and_centroid = min_cost_flow.Tail(arc) != 0 and min_cost_flow.Head(arc) != sink_idx
+def _divide_points_greedily(
+        points: list[sp.Point], clusters_amt: int, centroids: list[sp.Point], coordinates: np.ndarray,
+        sizes: Optional[list[int]] = None
+) -> list[sp.Cluster]:
+    """Приближенно разделить точки на кластеры одинакового размера
+
+    Размеры кластеров такие же, как пропускные способности дуг до стока в сети min-cost flow
+
+    Алгоритм
+    - Упорядочить точки по убыванию сожаления - разности расстояний до второго и первого ближайших центроидов
+    - В этом порядке отнести каждую точку к ближайшему центроиду, в кластере которого есть место
+    - Цикл, пока находятся улучшения и пока не достигнут лимит проходов
+    - - Для пар соседних кластеров обменять точки, если это уменьшает сумму расстояний
+
+    Точки сначала сравниваются только с c ближайшими центроидами, как в сети min-cost flow,
+    ближайшие центроиды находятся по пространственному индексу, расстояния до остальных считаются по необходимости
+
+    Временная сложность O(n*c + n*log(n)) для жадного распределения, O(c*n*log(n / k)) для 1 прохода обменов
+
+    Args:
+        points: Кластеризуемые точки
+        clusters_amt: Количество кластеров
+        centroids: Центроиды кластеров
+        coordinates: Координаты кластеризуемых точек
+        sizes: Размеры кластеров, по умолчанию ⌊n / k⌋ или ⌈n / k⌉
+
+    Returns:
+        Кластеры, полученные при разделении переданного списка точек
+    """
+
+    points_amt = len(points)
+    centroids_coordinates = np.array([(centroid.x, centroid.y) for centroid in centroids])
+    candidates_amt = min(_CANDIDATE_CENTROIDS_AMT, clusters_amt)
+    nearest_distances, nearest = si.GridIndex(centroids_coordinates).query(coordinates, candidates_amt)
+    regrets = nearest_distances[:, 1] - nearest_distances[:, 0]
+    remaining = list(sizes) if sizes is not None else _get_cluster_sizes(points_amt, clusters_amt)
+    labels = np.empty(points_amt, dtype=np.int64)  # Индексы кластеров точек
+    nearest_lists = nearest.tolist()
+
+    for point_idx in np.argsort(-regrets, kind="stable").tolist():
+        for centroid_idx in nearest_lists[point_idx]:
+            if remaining[centroid_idx]:
+                break
+        else:  # Кластеры всех ближайших центроидов заполнены
+            free = np.flatnonzero(remaining)
+            centroid_idx = int(free[np.argmin(_get_distances(coordinates[point_idx], centroids_coordinates[free]))])
+
+        remaining[centroid_idx] -= 1
+        labels[point_idx] = centroid_idx
+
+    _repair_assignment(labels, coordinates, centroids_coordinates, nearest, nearest_distances)
+    clusters: list[sp.Cluster[sp.Point]] = [sp.Cluster() for _ in range(clusters_amt)]
 
-        if arc_between_node_and_centroid and min_cost_flow.Flow(arc):  # У использованных ребер не нулевой поток
-            point_idx = min_cost_flow.Tail(arc) - 1
-            centroid_idx = min_cost_flow.Head(arc) - len(points) - 1
-            cluster: sp.Cluster = clusters[centroid_idx]
-            cluster.append(points[point_idx])
+    for point, centroid_idx in zip(points, labels.tolist()):
+        clusters[centroid_idx].append(point)
 
     return clusters
+
+
+def _repair_assignment(
+        labels: np.ndarray, coordinates: np.ndarray, centroids_coordinates: np.ndarray, nearest: np.ndarray,
+        nearest_distances: np.ndarray
+) -> None:
+    """Улучшить распределение точек по кластерам обменами пар точек, не меняя размеры кластеров
+
+    Рассматриваются пары кластеров i, j, где хотя бы 1 точка из i ближе к центроиду j, чем к своему
+    - Выигрыш от переноса точки из i в j - разность расстояний до центроидов i и j, аналогично для точек из j
+    - Выигрыши в обоих кластерах сортируются по убыванию
+    - Обмениваются первые m пар точек, сумма выигрышей которых положительна, что дает наибольшее уменьшение
+      суммы расстояний для пары кластеров
+
+    Args:
+        labels: Индексы кластеров точек, изменяются на месте
+        coordinates: Координаты точек
+        centroids_coordinates: Координаты центроидов
+        nearest: Индексы ближайших центроидов каждой точки
+        nearest_distances: Расстояния от точек до ближайших центроидов
+    """
+
+    clusters_amt = len(centroids_coordinates)
+    order = np.argsort(labels, kind="stable")
+    members = np.split(order, np.cumsum(np.bincount(labels, minlength=clusters_amt))[:-1])  # Точки кластеров
+    changed = np.ones(clusters_amt, dtype=bool)  # Кластеры, измененные на предыдущем проходе
+
+    for _ in range(_REPAIR_PASSES):
+        own_distances = _get_distances(coordinates, centroids_coordinates[labels])
+        better = nearest_distances < own_distances[:, None] - _EPSILON
+        first, second = labels[np.nonzero(better)[0]], nearest[better]
+        touched = changed[first] | changed[second]  # Пары неизмененных кластеров уже улучшены
+        first, second = first[touched], second[touched]
+        pairs = np.unique(np.minimum(first, second) * clusters_amt + np.maximum(first, second))
+        changed[:] = False
+
+        for first, second in zip((pairs // clusters_amt).tolist(), (pairs % clusters_amt).tolist()):
+            first_members, second_members = members[first], members[second]
+            first_coordinates, second_coordinates = coordinates[first_members], coordinates[second_members]
+            first_gains = _get_distances(first_coordinates, centroids_coordinates[first]) - \
+                _get_distances(first_coordinates, centroids_coordinates[second])
+            second_gains = _get_distances(second_coordinates, centroids_coordinates[second]) - \
+                _get_distances(second_coordinates, centroids_coordinates[first])
+            # Точка участвует в выгодном обмене, только если ее выигрыш больше наибольшего проигрыша другого кластера
+            first_order = np.flatnonzero(first_gains > -second_gains.max())
+            second_order = np.flatnonzero(second_gains > -first_gains.max())
+            first_order = first_order[np.argsort(-first_gains[first_order], kind="stable")]
+            second_order = second_order[np.argsort(-second_gains[second_order], kind="stable")]
+            swaps_amt = min(len(first_order), len(second_order))
+            swaps_amt = int(np.count_nonzero(
+                first_gains[first_order[:swaps_amt]] + second_gains[second_order[:swaps_amt]] > _EPSILON
+            ))
+
+            if not swaps_amt:
+                continue
+
+            first_positions, second_positions = first_order[:swaps_amt], second_order[:swaps_amt]
+            moved_to_second = first_members[first_positions]
+            moved_to_first = second_members[second_positions]
+            first_members[first_positions], second_members[second_positions] = moved_to_first, moved_to_second
+            labels[moved_to_first], labels[moved_to_second] = first, second
+            changed[first] = changed[second] = True
+
+        if not changed.any():
+            return
+
+
+def _get_distances(coordinates: np.ndarray, centroids_coordinates: np.ndarray) -> np.ndarray:
+    """Вычислить расстояния от точек до центроидов, координаты которых попарно совпадают или переданы для 1 из них"""
+
+    return np.hypot(
+        coordinates[..., 0] - centroids_coordinates[..., 0], coordinates[..., 1] - centroids_coordinates[..., 1]
+    )
+
+
+class _FlowNetwork:
+    """Часть сети для разделения точек на кластеры, не зависящая от центроидов
+
+    Массивы дуг от истока до вершин и от центроидов до стока одинаковы на всех итерациях K-Means, поэтому строятся 1 раз
+    Топология сети в решателе не переиспользуется: OR-Tools не позволяет изменить стоимость дуги, поэтому решатель
+    создается заново на каждой итерации, и все дуги добавляются в него 1 вызовом из массивов
+
+    Индекс истока = 0, индексы вершин от 1 до n, индексы центроидов от n + 1 до n + k, индекс стока = n + k + 1
+
+    Attributes:
+        coordinates: Координаты кластеризуемых точек
+        _points: Кластеризуемые точки
+        _clusters_amt: Количество кластеров
+        _tails, _heads, _capacities: Начала, концы и пропускные способности неизменяемых дуг
+    """
+
+    def __init__(self, points: list[sp.Point], clusters_amt: int, sizes: Optional[list[int]] = None) -> None:
+        """Построить дуги от истока до вершин и от центроидов до стока
+
+        Args:
+            points: Кластеризуемые точки
+            clusters_amt: Количество кластеров
+            sizes: Размеры кластеров == пропускные способности дуг до стока, по умолчанию ⌊n / k⌋ или ⌈n / k⌉
+        """
+
+        points_amt = len(points)
+        self.coordinates = np.array([(point.x, point.y) for point in points])
+        self._points = points
+        self._clusters_amt = clusters_amt
+        centroids = np.arange(points_amt + 1, points_amt + clusters_amt + 1)
+        sink_capacities = np.array(sizes if sizes is not None else _get_cluster_sizes(points_amt, clusters_amt))
+
+        self._tails = np.concatenate((np.zeros(points_amt, dtype=np.int64), centroids))
+        self._heads = np.concatenate((
+            np.arange(1, points_amt + 1), np.full(clusters_amt, points_amt + clusters_amt + 1)
+        ))
+        self._capacities = np.concatenate((np.ones(points_amt, dtype=np.int64), sink_capacities))
+
+    def solve(self, nearest: np.ndarray, distances: np.ndarray) -> Optional[list[sp.Cluster]]:
+        """Найти min-cost max flow, соединив каждую вершину с центроидами-кандидатами
+
+        Args:
+            nearest: Индексы центроидов-кандидатов для каждой вершины
+            distances: Расстояния от вершин до центроидов-кандидатов
+
+        Returns:
+            Кластеры или None, если поток в сети не существует
+        """
+
+        points_amt = len(self._points)
+        tails = np.repeat(np.arange(1, points_amt + 1), nearest.shape[1])
+        heads = nearest.ravel() + points_amt + 1
+        costs = (distances.ravel() * (10 ** sp.get_precision())).astype(np.int64)
+
+        flows = _solve_min_cost_flow(  # Сначала дуги вершина-центроид, их потоки - первые в ответе
+            np.concatenate((tails, self._tails)), np.concatenate((heads, self._heads)),
+            np.concatenate((np.ones(len(tails), dtype=np.int64), self._capacities)),
+            np.concatenate((costs, np.zeros(len(self._tails), dtype=np.int64))),
+            0, points_amt + self._clusters_amt + 1, points_amt
+        )
+
+        if flows is None:
+            return None
+
+        used = flows[:len(tails)] > 0  # У использованных дуг не нулевой поток
+        clusters: list[sp.Cluster[sp.Point]] = [sp.Cluster() for _ in range(self._clusters_amt)]
+
+        for point_idx, centroid_idx in zip((tails[used] - 1).tolist(), (heads[used] - points_amt - 1).tolist()):
+            clusters[centroid_idx].append(self._points[point_idx])
+
+        return clusters
+
+
+def _solve_min_cost_flow(
+        tails: np.ndarray, heads: np.ndarray, capacities: np.ndarray, costs: np.ndarray, source: int, sink: int,
+        supply: int
+) -> Optional[np.ndarray]:
+    """Найти min-cost flow из истока в сток
+
+    Args:
+        tails, heads, capacities, costs: Начала, концы, пропускные способности и стоимости дуг
+        source, sink: Индексы истока и стока
+        supply: Величина потока
+
+    Returns:
+        Потоки по дугам в порядке их передачи или None, если поток не существует
+    """
+
+    if min_cost_flow is not None:
+        solver = min_cost_flow.SimpleMinCostFlow()
+        solver.add_arcs_with_capacity_and_unit_cost(tails, heads, capacities, costs)
+        solver.set_node_supply(source, supply)
+        solver.set_node_supply(sink, -supply)
+
+        if solver.solve() != solver.OPTIMAL:
+            return None
+
+        return np.asarray(solver.flows(np.arange(len(tails))))
+
+    solver = pywrapgraph.SimpleMinCostFlow()
+
+    for arc in zip(tails.tolist(), heads.tolist(), capacities.tolist(), costs.tolist()):
+        solver.AddArcWithCapacityAndUnitCost(*arc)  # Start, end, capacity, cost
+
+    solver.SetNodeSupply(source, supply)
+    solver.SetNodeSupply(sink, -supply)
+
+    if solver.Solve() != solver.OPTIMAL:
+        return None
+
+    return np.array([solver.Flow(arc) for arc in range(len(tails))])
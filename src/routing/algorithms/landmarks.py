@@ -0,0 +1,188 @@
+"""Ориентиры для эвристики ALT - A*, Landmarks, Triangle inequality
+
+Для ориентира l и любых вершин v, t по неравенству треугольника d(v, t) >= |d(l, t) - d(l, v)|,
+поэтому max по ориентирам |d(l, t) - d(l, v)| - оптимистическая и согласованная оценка длины пути от v до t
+В отличие от расстояния по прямой, оценка учитывает длины ребер, поэтому остается точной, даже если длины ребер
+намного больше расстояний между их концами
+
+Выбор ориентиров - самые удаленные вершины
+- Первый ориентир - вершина, самая далекая от случайной вершины
+- Каждый следующий - вершина, самая далекая от уже выбранных ориентиров
+- Расстояния от ориентира до всех вершин находятся алгоритмом Дейкстры
+
+После изменения длин ребер ориентиры не выбираются заново, пересчитываются только расстояния от них
+Если длины ребер только увеличились, пересчет не обязателен: длины путей не уменьшились, поэтому старые оценки
+остаются оптимистическими и согласованными
+
+Временная сложность построения O(L * |E| log |V|), L - количество ориентиров, пространственная O(L * |V|)
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+import operator
+import random
+from array import array
+from typing import Callable, Optional
+
+import numpy as np
+
+from routing import spatial_objects as sp
+
+_LANDMARKS_AMT = 8  # Количество ориентиров
+
+
+class Landmarks:
+    """Ориентиры графа в формате CSR и расстояния от них до всех вершин
+
+    Расстояния хранятся по вершинам: для вершины v расстояния от всех ориентиров - элементы _distances с индексами
+    от v * L до (v + 1) * L не включительно
+    Расстояние до вершин, недостижимых из ориентира, равно 0, тк для вершин одной компоненты связности оно
+    одинаково и не влияет на оценку
+
+    Attributes:
+        _nodes: Индексы вершин-ориентиров
+        _distances: Расстояния от ориентиров до вершин
+        _version: Версия графа, для которой вычислены расстояния
+    """
+
+    def __init__(self, nodes: list[int], distances: array, version: int = 0) -> None:
+        self._nodes = nodes
+        self._distances = distances
+        self._version = version
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    @classmethod
+    def from_graph(
+            cls, graph: sp.CompactGraph, landmarks_amt: int = _LANDMARKS_AMT, seed: Optional[int] = None
+    ) -> Landmarks:
+        """Выбрать ориентиры и вычислить расстояния от них
+
+        Args:
+            graph: Граф в формате CSR
+            landmarks_amt: Количество ориентиров, не больше количества вершин
+            seed: Начальное значение генератора случайных чисел для выбора первой вершины
+
+        Returns:
+            Ориентиры графа
+
+        Raises:
+            ValueError: Неверное количество ориентиров
+        """
+
+        if not 0 < landmarks_amt <= len(graph):
+            raise ValueError("wrong amount of landmarks")
+
+        distances = _get_distances(random.Random(seed).randrange(len(graph)), graph)
+        nodes, tables = [], []
+        min_distances = np.full(len(graph), np.inf)
+
+        for _ in range(landmarks_amt):
+            # Расстояние до недостижимых вершин бесконечно, и вершина другой компоненты связности выбирается намеренно:
+            # пока не во всех компонентах есть ориентир, следующий выбирается в компоненте без ориентиров
+            node = int(np.argmax(distances))
+            nodes.append(node)
+            tables.append(_get_distances(node, graph))
+            min_distances = np.minimum(min_distances, tables[-1])
+            distances = min_distances
+
+        return cls(nodes, _to_node_major(tables), graph.version)
+
+    @property
+    def distances(self) -> array:
+        return self._distances
+
+    def get_nodes(self, graph: sp.CompactGraph) -> list[sp.Point]:
+        """Получить вершины-ориентиры"""
+
+        return [graph.get_point(node) for node in self._nodes]
+
+    def update(self, graph: sp.CompactGraph) -> None:
+        """Пересчитать расстояния от ориентиров после изменения длин ребер, не выбирая ориентиры заново"""
+
+        self._distances = _to_node_major([_get_distances(node, graph) for node in self._nodes])
+        self._version = graph.version
+
+    def is_admissible(self, graph: sp.CompactGraph) -> bool:
+        """Проверить, что оценки по ориентирам не превышают длин путей в текущей версии графа
+
+        Оценки остаются допустимыми, пока ни одно ребро не стало короче, чем при вычислении расстояний
+        """
+
+        return graph.shortened_version <= self._version
+
+    def get_heuristic(self, graph: sp.CompactGraph, finish: int) -> Callable[[int], float]:
+        """Получить эвристику A* до вершины - наибольшую из оценок по ориентирам и по прямой
+
+        Координаты искомой вершины и расстояния до нее от ориентиров извлекаются 1 раз, а не при каждой оценке
+
+        Args:
+            graph: Граф в формате CSR
+            finish: Индекс искомой вершины
+
+        Returns:
+            Функция оценки длины пути от вершины до искомой по индексу вершины
+        """
+
+        xs, ys, distances, landmarks_amt = graph.xs, graph.ys, self._distances, len(self._nodes)
+        finish_x, finish_y = xs[finish], ys[finish]
+        finish_distances = distances[finish * landmarks_amt:(finish + 1) * landmarks_amt]
+
+        def get_heuristic(node: int) -> float:
+            return max(math.hypot(xs[node] - finish_x, ys[node] - finish_y), max(map(
+                abs, map(operator.sub, finish_distances, distances[node * landmarks_amt:(node + 1) * landmarks_amt])
+            )))
+
+        return get_heuristic
+
+    def get_lower_bound(self, start: int, finish: int) -> float:
+        """Получить оптимистическую оценку длины пути между вершинами по их индексам"""
+
+        landmarks_amt = len(self._nodes)
+        return max(map(
+            abs, map(
+                operator.sub,
+                self._distances[start * landmarks_amt:(start + 1) * landmarks_amt],
+                self._distances[finish * landmarks_amt:(finish + 1) * landmarks_amt]
+            )
+        ))
+
+
+def _get_distances(start: int, graph: sp.CompactGraph) -> np.ndarray:
+    """Найти длины кратчайших путей от вершины до всех вершин графа алгоритмом Дейкстры
+
+    Returns:
+        Длины путей по индексам вершин, np.inf для недостижимых вершин
+    """
+
+    offsets, targets, weights = graph.offsets, graph.targets, graph.weights
+    distances = [math.inf] * len(graph)
+    distances[start] = 0
+    priority_queue = [(0, start)]
+
+    while priority_queue:
+        distance, current_node = heapq.heappop(priority_queue)
+
+        if distance > distances[current_node]:  # Устаревшая запись в очереди
+            continue
+
+        for slot in range(offsets[current_node], offsets[current_node + 1]):
+            adjacent = targets[slot]
+            adjacent_distance = distance + weights[slot]
+
+            if adjacent_distance < distances[adjacent]:
+                distances[adjacent] = adjacent_distance
+                heapq.heappush(priority_queue, (adjacent_distance, adjacent))
+
+    return np.array(distances)
+
+
+def _to_node_major(tables: list[np.ndarray]) -> array:
+    """Объединить расстояния от ориентиров в массив, в котором расстояния до каждой вершины идут подряд"""
+
+    distances = np.stack(tables, axis=1)
+    distances[np.isinf(distances)] = 0
+    return array("d", distances.ravel().tobytes())
@@ -0,0 +1,251 @@
+"""Локальный поиск для улучшения решения TSP
+
+Маршрут - список индексов генов, замкнутый цикл
+
+Ходы
+- 2-opt - удалить 2 ребра маршрута и соединить концы по-другому, что равносильно развороту участка маршрута
+- Or-opt - перенести участок из 1, 2 или 3 генов между двумя другими соседними генами, возможно, развернув его
+
+Изменение длины маршрута при ходе вычисляется за O(1) по 3-4 ребрам, которые удаляются и добавляются
+Рассматриваются только ходы, добавляющие ребро от гена к одному из его ближайших соседей - списки соседей
+
+Алгоритм
+- Цикл, пока ходы улучшают маршрут
+- - Применять улучшающие ходы 2-opt, пока они находятся
+- - Применять улучшающие ходы Or-opt, пока они находятся
+
+Результат - локальный минимум относительно обоих видов ходов
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+_NEIGHBOURS_AMT = 8  # Размер списка ближайших соседей гена
+_MAX_SEGMENT_LENGTH = 3  # Наибольшая длина участка, переносимого ходом Or-opt
+_EPSILON = 1e-9  # Наименьшее учитываемое улучшение длины маршрута
+
+
+def get_neighbour_lists(distances: np.ndarray, neighbours_amt: int = _NEIGHBOURS_AMT) -> list[list[int]]:
+    """Составить списки ближайших соседей генов в порядке возрастания расстояния
+
+    Args:
+        distances: Матрица расстояний между генами
+        neighbours_amt: Размер списка соседей
+
+    Returns:
+        Списки индексов ближайших соседей каждого гена
+    """
+
+    neighbours_amt = min(neighbours_amt, len(distances) - 1)
+    order = np.argsort(distances + np.diag(np.full(len(distances), np.inf)), axis=1, kind="stable")
+    return order[:, :neighbours_amt].tolist()
+
+
+def improve_tour(tour: list[int], distances: list[list[float]], neighbours: list[list[int]]) -> list[int]:
+    """Улучшить маршрут ходами 2-opt и Or-opt до локального минимума
+
+    Args:
+        tour: Маршрут - список индексов генов
+        distances: Матрица расстояний между генами в виде вложенных списков
+        neighbours: Списки ближайших соседей генов
+
+    Returns:
+        Улучшенный маршрут
+    """
+
+    tour = list(tour)
+
+    if len(tour) < 5:
+        return tour
+
+    improved = True
+
+    while improved:
+        improved = _two_opt(tour, distances, neighbours)
+        improved = _or_opt(tour, distances, neighbours) or improved
+
+    return tour
+
+
+def _two_opt(tour: list[int], distances: list[list[float]], neighbours: list[list[int]]) -> bool:
+    """Применять улучшающие ходы 2-opt, пока они находятся
+
+    Для гена a и его соседа c ребра (a, следующий за a) и (c, следующий за c) заменяются на (a, c) и
+    (следующий за a, следующий за c), аналогично для предыдущих генов
+
+    Returns:
+        Был ли улучшен маршрут
+    """
+
+    genes_amt = len(tour)
+    positions = _get_positions(tour)
+    improved_at_all = improved = False
+
+    while True:
+        for a in range(genes_amt):
+            for step in 1, -1:  # Ребро до следующего и до предыдущего гена
+                i = positions[a]
+                b = tour[(i + step) % genes_amt]
+                distance_ab = distances[a][b]
+
+                for c in neighbours[a]:
+                    distance_ac = distances[a][c]
+
+                    if distance_ac >= distance_ab:  # Такой ход, если он улучшающий, найдется со стороны c или b
+                        break
+
+                    j = positions[c]
+                    d = tour[(j + step) % genes_amt]
+
+                    if c == b or d == a:
+                        continue
+
+                    if distance_ac + distances[b][d] - distance_ab - distances[c][d] < -_EPSILON:
+                        if step == 1:
+                            _reverse(tour, positions, (i + 1) % genes_amt, j)
+                        else:
+                            _reverse(tour, positions, j, (i - 1) % genes_amt)
+
+                        improved_at_all = improved = True
+                        break
+
+        if not improved:
+            return improved_at_all
+
+        improved = False
+
+
+def _or_opt(tour: list[int], distances: list[list[float]], neighbours: list[list[int]]) -> bool:
+    """Применять улучшающие ходы Or-opt, пока они находятся
+
+    Участок first..last удаляется, его соседи prev и next соединяются ребром,
+    участок вставляется между геном c из списков соседей концов участка и соседним с c геном
+
+    Returns:
+        Был ли улучшен маршрут
+    """
+
+    genes_amt = len(tour)
+    improved_at_all = False
+    move = True
+
+    while move:
+        move = None
+        positions = _get_positions(tour)
+
+        for segment_length in range(1, min(_MAX_SEGMENT_LENGTH, genes_amt - 3) + 1):
+            for i in range(genes_amt):
+                first, last = tour[i], tour[(i + segment_length - 1) % genes_amt]
+                prev, next_ = tour[i - 1], tour[(i + segment_length) % genes_amt]
+                removal_gain = distances[prev][first] + distances[last][next_] - distances[prev][next_]
+
+                if removal_gain <= _EPSILON:
+                    continue
+
+                move = _find_insertion(
+                    tour, positions, distances, neighbours, i, segment_length, first, last, removal_gain
+                )
+
+                if move:
+                    break
+
+            if move:
+                break
+
+        if move:
+            _move_segment(tour, *move)
+            improved_at_all = True
+
+    return improved_at_all
+
+
+def _find_insertion(
+        tour: list[int], positions: list[int], distances: list[list[float]], neighbours: list[list[int]],
+        start: int, segment_length: int, first: int, last: int, removal_gain: float
+) -> tuple:
+    """Найти место вставки участка, уменьшающее длину маршрута
+
+    Returns:
+        Аргументы _move_segment или пустой кортеж, если место не найдено
+    """
+
+    genes_amt = len(tour)
+
+    for endpoint, other_endpoint in (first, last), (last, first):
+        for c in neighbours[endpoint]:
+            distance_to_c = distances[endpoint][c]
+
+            if distance_to_c >= removal_gain:  # Более далекие соседи не рассматриваются
+                break
+
+            j = positions[c]
+
+            if (j - start) % genes_amt < segment_length:  # c входит в участок
+                continue
+
+            for step in 1, -1:
+                c_adjacent = tour[(j + step) % genes_amt]
+
+                if (positions[c_adjacent] - start) % genes_amt < segment_length:
+                    continue
+
+                insertion_cost = distance_to_c + distances[other_endpoint][c_adjacent] - distances[c][c_adjacent]
+
+                if insertion_cost - removal_gain < -_EPSILON:
+                    return start, segment_length, c, step, endpoint == first
+
+    return ()
+
+
+def _move_segment(tour: list[int], start: int, segment_length: int, c: int, step: int, first_to_c: bool) -> None:
+    """Перенести участок маршрута
+
+    Args:
+        tour: Маршрут
+        start: Позиция начала участка
+        segment_length: Длина участка
+        c: Ген, рядом с которым вставляется участок
+        step: 1, если участок вставляется после c, -1, если перед c
+        first_to_c: Соединяется ли с c первый ген участка
+    """
+
+    rotated = tour[start:] + tour[:start]  # Маршрут, начинающийся с участка
+    segment, rest = rotated[:segment_length], rotated[segment_length:]
+
+    if first_to_c == (step == -1):  # Развернуть участок, чтобы с c соединялся нужный конец
+        segment.reverse()
+
+    c_idx = rest.index(c)
+    insertion_idx = c_idx + 1 if step == 1 else c_idx
+    tour[:] = rest[:insertion_idx] + segment + rest[insertion_idx:]
+
+
+def _reverse(tour: list[int], positions: list[int], start: int, end: int) -> None:
+    """Развернуть участок замкнутого маршрута с позиции start по позицию end включительно
+
+    Вместо длинного участка разворачивается дополняющий его, что дает тот же замкнутый маршрут
+    """
+
+    genes_amt = len(tour)
+    length = (end - start) % genes_amt + 1
+
+    if length * 2 > genes_amt:
+        start, end = (end + 1) % genes_amt, (start - 1) % genes_amt
+        length = genes_amt - length
+
+    for _ in range(length // 2):
+        tour[start], tour[end] = tour[end], tour[start]
+        positions[tour[start]], positions[tour[end]] = start, end
+        start, end = (start + 1) % genes_amt, (end - 1) % genes_amt
+
+
+def _get_positions(tour: list[int]) -> list[int]:
+    """Получить позиции генов в маршруте"""
+
+    positions = [0] * len(tour)
+
+    for i, gene in enumerate(tour):
+        positions[gene] = i
+
+    return positions
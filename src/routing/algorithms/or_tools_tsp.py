@@ -0,0 +1,71 @@
+"""Решение TSP библиотекой маршрутизации Google OR-Tools
+
+Задача формулируется как Vehicle Routing Problem с 1 транспортным средством, начинающим и заканчивающим маршрут
+в первом гене
+
+Алгоритм
+- Построить начальное решение жадно, каждый раз переходя по самой дешевой дуге - PATH_CHEAPEST_ARC
+- Улучшать решение управляемым локальным поиском - GUIDED_LOCAL_SEARCH, пока не исчерпан лимит времени
+- - Локальный минимум покидается за счет штрафов, которые накладываются на ребра, часто входящие в найденные решения
+
+OR-Tools работает с целочисленными стоимостями, поэтому расстояния умножаются на 10 ^ (точность координат)
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+from ortools.constraint_solver import pywrapcp
+from ortools.constraint_solver import routing_enums_pb2
+
+from routing import spatial_objects as sp
+from routing.algorithms import genetic_algorithm as ga
+
+
+def or_tools_for_tsp(
+        genes: list[sp.Point], time_limit: float = 30, distances: Optional[np.ndarray] = None
+) -> list[sp.Point]:
+    """Решить TSP управляемым локальным поиском OR-Tools
+
+    Args:
+        genes: Гены - точки, из которых строится маршрут
+        time_limit: Лимит времени в секундах для поиска решения
+        distances: Матрица расстояний между генами, по умолчанию - матрица Евклидовых расстояний
+
+    Returns:
+        Лучший маршрут из найденных за отведенное время, начинающийся с первого гена
+    """
+
+    if len(genes) <= 3:
+        return genes.copy()
+
+    distances = ga.get_distance_matrix(genes) if distances is None else distances
+    costs = np.rint(distances * (10 ** sp.get_precision())).astype(np.int64).tolist()
+
+    manager = pywrapcp.RoutingIndexManager(len(genes), 1, 0)  # Количество генов, транспортных средств, начальный ген
+    routing = pywrapcp.RoutingModel(manager)
+
+    def get_cost(from_index: int, to_index: int) -> int:
+        return costs[manager.IndexToNode(from_index)][manager.IndexToNode(to_index)]
+
+    routing.SetArcCostEvaluatorOfAllVehicles(routing.RegisterTransitCallback(get_cost))
+
+    search_parameters = pywrapcp.DefaultRoutingSearchParameters()
+    search_parameters.first_solution_strategy = routing_enums_pb2.FirstSolutionStrategy.PATH_CHEAPEST_ARC
+    search_parameters.local_search_metaheuristic = routing_enums_pb2.LocalSearchMetaheuristic.GUIDED_LOCAL_SEARCH
+    search_parameters.time_limit.FromMilliseconds(int(time_limit * 1000))
+
+    solution = routing.SolveWithParameters(search_parameters)
+
+    if solution is None:  # Решение не найдено за отведенное время
+        return genes.copy()
+
+    route = []
+    index = routing.Start(0)
+
+    while not routing.IsEnd(index):
+        route.append(genes[manager.IndexToNode(index)])
+        index = solution.Value(routing.NextVar(index))
+
+    return route
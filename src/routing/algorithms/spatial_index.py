@@ -0,0 +1,236 @@
+"""Пространственный индекс точек - равномерная сетка
+
+Плоскость, ограниченная прямоугольником вокруг точек, делится на одинаковые квадратные ячейки так,
+чтобы в 1 ячейке в среднем было около _POINTS_PER_CELL точек
+Точки упорядочены по индексам ячеек, поэтому точки 1 ячейки и точки подряд идущих ячеек 1 строки сетки
+лежат в массивах координат непрерывным отрезком
+
+Запросы
+- k ближайших точек для множества точек - запросы группируются по ячейкам, для каждой ячейки расстояния считаются
+  до точек квадрата из (2r + 1)^2 ячеек вокруг нее
+  - Точка вне квадрата удалена от точки запроса не менее чем на r * s, s - сторона ячейки,
+    поэтому если k-я ближайшая точка квадрата ближе r * s, то ответ точный, иначе r увеличивается
+- Точки в круге - расстояния считаются только до точек ячеек, пересекающих описанный вокруг круга квадрат
+- Последовательность наиболее удаленных точек - при добавлении точки расстояния до выбранных обновляются только
+  в круге с радиусом, равным текущему наибольшему расстоянию, для ячеек хранятся наибольшие расстояния их точек
+
+При равномерном распределении построение O(n*log(n)), запрос k ближайших O(k) на точку
+"""
+
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+from routing import spatial_objects as sp
+
+_POINTS_PER_CELL = 8  # Среднее количество точек в ячейке сетки
+
+
+class GridIndex:
+    """Равномерная сетка над координатами точек
+
+    Индекс ячейки с номером столбца i и номером строки j равен j * _columns + i
+
+    Attributes:
+        _order: Исходные индексы точек, упорядоченных по ячейкам
+        _xs, _ys: Координаты точек, упорядоченных по ячейкам
+        _offsets: Смещения ячеек в упорядоченных массивах, количество ячеек + 1 элемент
+        _min_x, _min_y: Координаты левого нижнего угла сетки
+        _cell_size: Сторона ячейки
+        _columns, _rows: Количество столбцов и строк сетки
+    """
+
+    def __init__(self, coordinates: np.ndarray, points_per_cell: int = _POINTS_PER_CELL) -> None:
+        """Построить сетку
+
+        Args:
+            coordinates: Координаты точек, массив размера n x 2
+            points_per_cell: Среднее количество точек в ячейке
+
+        Raises:
+            ValueError: Нет точек
+        """
+
+        coordinates = np.asarray(coordinates, dtype=np.float64).reshape(-1, 2)
+        points_amt = len(coordinates)
+
+        if not points_amt:
+            raise ValueError("creating a spatial index of 0 points")
+
+        self._min_x, self._min_y = coordinates.min(axis=0).tolist()
+        width, height = (coordinates.max(axis=0) - coordinates.min(axis=0)).tolist()
+        cells_amt = max(points_amt / points_per_cell, 1)
+        # Для вытянутого облака точек ячейки выбираются по большей стороне, чтобы их количество было O(n)
+        self._cell_size = max(math.sqrt(width * height / cells_amt), max(width, height) / cells_amt) or 1.0
+        self._columns = int(width / self._cell_size) + 1
+        self._rows = int(height / self._cell_size) + 1
+
+        cells = self._get_cells(coordinates)
+        self._order = np.argsort(cells, kind="stable")
+        self._xs = coordinates[self._order, 0]
+        self._ys = coordinates[self._order, 1]
+        self._offsets = np.zeros(self._columns * self._rows + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cells, minlength=self._columns * self._rows), out=self._offsets[1:])
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    @classmethod
+    def from_points(cls, points: list[sp.Point], points_per_cell: int = _POINTS_PER_CELL) -> GridIndex:
+        """Построить сетку по точкам, индексы в ответах запросов - позиции точек в переданном списке"""
+
+        return cls(np.array([(point.x, point.y) for point in points]), points_per_cell)
+
+    def query(self, coordinates: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        """Найти k ближайших точек индекса для каждой переданной точки
+
+        Args:
+            coordinates: Координаты точек запроса, массив размера m x 2
+            k: Количество ближайших точек, не больше количества точек в индексе
+
+        Returns:
+            Расстояния до ближайших точек и их индексы, массивы размера m x k, упорядоченные по возрастанию расстояний
+
+        Raises:
+            ValueError: Неверное количество ближайших точек
+        """
+
+        if not 0 < k <= len(self):
+            raise ValueError("wrong amount of nearest points")
+
+        coordinates = np.asarray(coordinates, dtype=np.float64).reshape(-1, 2)
+        distances = np.empty((len(coordinates), k))
+        indexes = np.empty((len(coordinates), k), dtype=np.int64)
+        cells = self._get_cells(coordinates)
+        order = np.argsort(cells, kind="stable")
+        starts = np.flatnonzero(np.diff(cells[order], prepend=-1))  # Начала групп запросов из 1 ячейки
+        radius = max(int(math.ceil(math.sqrt(k * len(self._offsets) / len(self)) / 2)), 1)  # Квадрат из ~k точек
+
+        for queries, cell in zip(np.split(order, starts[1:]), cells[order[starts]].tolist()):
+            column, row = cell % self._columns, cell // self._columns
+            current_radius = radius
+
+            while len(queries):
+                positions = self._get_positions(
+                    column - current_radius, column + current_radius, row - current_radius, row + current_radius
+                )
+                covers_grid = current_radius >= max(self._columns, self._rows)
+
+                if len(positions) < k and not covers_grid:
+                    current_radius *= 2
+                    continue
+
+                query_distances = np.hypot(
+                    coordinates[queries, 0, None] - self._xs[None, positions],
+                    coordinates[queries, 1, None] - self._ys[None, positions]
+                )
+
+                if len(positions) > k:
+                    nearest = np.argpartition(query_distances, k - 1, axis=1)[:, :k]
+                    query_distances = np.take_along_axis(query_distances, nearest, axis=1)
+                else:
+                    nearest = np.broadcast_to(np.arange(k), query_distances.shape)
+
+                sorting = np.argsort(query_distances, axis=1, kind="stable")
+                query_distances = np.take_along_axis(query_distances, sorting, axis=1)
+                # Точки вне квадрата удалены от запроса не менее чем на current_radius сторон ячейки
+                exact = query_distances[:, -1] <= current_radius * self._cell_size if not covers_grid else \
+                    np.ones(len(queries), dtype=bool)
+                distances[queries[exact]] = query_distances[exact]
+                indexes[queries[exact]] = self._order[positions[np.take_along_axis(nearest, sorting, axis=1)[exact]]]
+                queries = queries[~exact]
+                current_radius *= 2
+
+        return distances, indexes
+
+    def query_radius(self, x: float, y: float, radius: float) -> np.ndarray:
+        """Найти индексы точек, удаленных от точки (x, y) не более чем на radius"""
+
+        positions = self._get_positions(*self._get_cell_range(x, y, radius))
+        inside = np.hypot(self._xs[positions] - x, self._ys[positions] - y) <= radius
+        return self._order[positions[inside]]
+
+    def get_farthest_sequence(self, initial: list[int], amount: int) -> list[int]:
+        """Выбрать последовательность точек, каждая из которых наиболее удалена от выбранных до нее
+
+        Args:
+            initial: Индексы первых выбранных точек
+            amount: Общее количество выбираемых точек
+
+        Returns:
+            Индексы выбранных точек, начинающиеся с initial
+        """
+
+        positions_by_index = np.empty(len(self), dtype=np.int64)
+        positions_by_index[self._order] = np.arange(len(self))
+        distances = np.full(len(self), np.inf)  # Расстояния от точек до ближайшей выбранной
+        counts = np.diff(self._offsets)
+        cell_maximums = np.where(counts > 0, np.inf, -np.inf)  # Наибольшие расстояния в ячейках
+        selected = list(initial)
+
+        for i in range(amount):
+            radius = float(cell_maximums.max())  # Наибольшее расстояние до выбранных точек
+
+            if i < len(selected):
+                position = positions_by_index[selected[i]]
+            else:
+                cell = int(np.argmax(cell_maximums))
+                start = self._offsets[cell]
+                position = start + int(np.argmax(distances[start:self._offsets[cell + 1]]))
+                selected.append(int(self._order[position]))
+
+            x, y = self._xs[position], self._ys[position]
+            # Ближе к новой точке могут быть только точки, удаленные от нее не более чем на radius
+            min_column, max_column, min_row, max_row = self._get_cell_range(x, y, radius)
+
+            for row in range(min_row, max_row + 1):
+                first_cell, last_cell = row * self._columns + min_column, row * self._columns + max_column
+                start, end = self._offsets[first_cell], self._offsets[last_cell + 1]
+
+                if start == end:
+                    continue
+
+                np.minimum(
+                    distances[start:end], np.hypot(self._xs[start:end] - x, self._ys[start:end] - y),
+                    out=distances[start:end]
+                )
+                cells = np.arange(first_cell, last_cell + 1)
+                cells = cells[counts[cells] > 0]
+                cell_maximums[cells] = np.maximum.reduceat(distances[start:end], self._offsets[cells] - start)
+
+        return selected
+
+    def _get_cells(self, coordinates: np.ndarray) -> np.ndarray:
+        """Получить индексы ячеек точек, точки вне сетки относятся к ближайшим крайним ячейкам"""
+
+        columns = np.clip((coordinates[:, 0] - self._min_x) // self._cell_size, 0, self._columns - 1).astype(np.int64)
+        rows = np.clip((coordinates[:, 1] - self._min_y) // self._cell_size, 0, self._rows - 1).astype(np.int64)
+        return rows * self._columns + columns
+
+    def _get_cell_range(self, x: float, y: float, radius: float) -> tuple[int, int, int, int]:
+        """Получить номера крайних столбцов и строк ячеек, пересекающих квадрат со стороной 2 * radius вокруг точки
+
+        Номера вычисляются по полному радиусу и обрезаются по сетке, поэтому точка может быть вне сетки
+        """
+
+        def clip(value: float, limit: int) -> int:
+            cell = value // self._cell_size if math.isfinite(value) else value  # Бесконечный радиус - вся сетка
+            return int(min(max(cell, 0), limit - 1))
+
+        return (
+            clip(x - radius - self._min_x, self._columns), clip(x + radius - self._min_x, self._columns),
+            clip(y - radius - self._min_y, self._rows), clip(y + radius - self._min_y, self._rows)
+        )
+
+    def _get_positions(self, min_column: int, max_column: int, min_row: int, max_row: int) -> np.ndarray:
+        """Получить позиции в упорядоченных массивах точек из ячеек прямоугольника, границы обрезаются по сетке"""
+
+        min_column, max_column = max(min_column, 0), min(max_column, self._columns - 1)
+        rows = np.arange(max(min_row, 0), min(max_row, self._rows - 1) + 1)
+        starts = self._offsets[rows * self._columns + min_column]
+        ends = self._offsets[rows * self._columns + max_column + 1]
+        lengths = ends - starts
+        # Позиции отрезков строк подряд: к началу отрезка прибавляется номер элемента внутри него
+        return np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
@@ -0,0 +1,135 @@
+"""Компоненты сильной связности графа - алгоритм Тарьяна
+
+Вершины одной компоненты сильной связности достижимы друг из друга, поэтому маршрут через точки существует,
+только если все они в одной компоненте
+
+Алгоритм Тарьяна
+- Обход в глубину, каждой вершине присваивается порядковый номер посещения и наименьший номер low,
+  достижимый из ее поддерева по 1 обратной дуге в вершину, которая еще в стеке
+- Посещенные вершины кладутся в стек
+- Если после обхода поддерева вершины low == ее номеру, вершина - корень компоненты,
+  все вершины стека до нее включительно - компонента
+- Обход выполняется без рекурсии: для каждой вершины в стеке обхода хранится следующая рассматриваемая дуга
+
+Метки компонент вычисляются 1 раз для графа и хранятся вместе с версией множества его вершин и ребер,
+пока оно не изменится, поэтому изменение длин ребер не сбрасывает метки, проверка точек - O(1) на точку
+
+Временная сложность O(|V| + |E|)
+"""
+
+from __future__ import annotations
+
+import weakref
+from array import array
+from typing import Union
+
+from routing import spatial_objects as sp
+
+_labels = weakref.WeakKeyDictionary()  # Версии множеств вершин и ребер графов и метки компонент их вершин
+
+
+def get_point_labels(points: list[sp.Point], graph: Union[sp.Graph, sp.CompactGraph]) -> list[int]:
+    """Получить метки компонент сильной связности точек
+
+    Args:
+        points: Точки
+        graph: Граф, представленный списками смежности или в формате CSR
+
+    Returns:
+        Метки компонент точек, -1 для точек, которых нет в графе
+    """
+
+    version, labels = _labels.get(graph, (None, None))
+
+    if version != graph.topology_version:
+        labels = _get_labels(graph)
+        _labels[graph] = graph.topology_version, labels
+
+    if isinstance(graph, sp.CompactGraph):
+        return [labels[graph.get_node_id(point)] if point in graph else -1 for point in points]
+
+    return [labels.get(point, -1) for point in points]
+
+
+def _get_labels(graph: Union[sp.Graph, sp.CompactGraph]) -> Union[array, dict[sp.Point, int]]:
+    """Вычислить метки компонент сильной связности вершин графа
+
+    Returns:
+        Метки по индексам вершин для графа в формате CSR, иначе метки по вершинам
+    """
+
+    if isinstance(graph, sp.CompactGraph):
+        return _find_components(graph.offsets, graph.targets)
+
+    points = list(graph.adjacency_lists)
+    ids = {point: i for i, point in enumerate(points)}
+    offsets, targets = array("q", [0]), array("i")
+
+    for point in points:  # Списки смежности в формате CSR, как при обходе графа в A*
+        targets.extend(ids[edge.get_another_border(point)] for edge in graph.adjacency_lists[point])
+        offsets.append(len(targets))
+
+    return dict(zip(points, _find_components(offsets, targets)))
+
+
+def _find_components(offsets: array, targets: array) -> array:
+    """Найти компоненты сильной связности графа в формате CSR итеративным алгоритмом Тарьяна
+
+    Args:
+        offsets: Смещения списков смежности вершин, n + 1 элемент
+        targets: Индексы смежных вершин
+
+    Returns:
+        Метки компонент по индексам вершин, компоненты нумеруются с 0 в порядке завершения обхода
+    """
+
+    nodes_amt = len(offsets) - 1
+    orders = array("q", [-1]) * nodes_amt  # Порядковые номера посещения вершин
+    lows = array("q", [0]) * nodes_amt
+    labels = array("i", [-1]) * nodes_amt
+    stack = []  # Вершины, компоненты которых еще не найдены
+    counter = components_amt = 0
+
+    for root in range(nodes_amt):
+        if orders[root] >= 0:
+            continue
+
+        orders[root] = lows[root] = counter
+        counter += 1
+        stack.append(root)
+        path = [[root, offsets[root]]]  # Стек обхода - вершины и следующие рассматриваемые дуги
+
+        while path:
+            frame = path[-1]
+            node, slot = frame
+
+            if slot < offsets[node + 1]:
+                frame[1] += 1
+                adjacent = targets[slot]
+
+                if orders[adjacent] < 0:  # Спуститься в непосещенную вершину
+                    orders[adjacent] = lows[adjacent] = counter
+                    counter += 1
+                    stack.append(adjacent)
+                    path.append([adjacent, offsets[adjacent]])
+                elif labels[adjacent] < 0 and orders[adjacent] < lows[node]:  # Вершина в стеке
+                    lows[node] = orders[adjacent]
+
+                continue
+
+            path.pop()
+
+            if path and lows[node] < lows[path[-1][0]]:
+                lows[path[-1][0]] = lows[node]
+
+            if lows[node] == orders[node]:  # Вершина - корень компоненты
+                while True:
+                    member = stack.pop()
+                    labels[member] = components_amt
+
+                    if member == node:
+                        break
+
+                components_amt += 1
+
+    return labels
@@ -2,138 +2,558 @@
 
 from __future__ import annotations
 
+import collections
+import copy
+import functools
 import multiprocessing as mp
 import os
-import random
-from typing import Iterator
+import tempfile
+import weakref
+from typing import Iterable, Iterator, Optional, Union
+
+import numpy as np
 
 from routing import spatial_objects as sp
 from routing.algorithms import a_star
+from routing.algorithms import contraction_hierarchies as ch
 from routing.algorithms import genetic_algorithm as ga
+from routing.algorithms import held_karp as hk
 from routing.algorithms import k_means
+from routing.algorithms import landmarks as lm
+from routing.algorithms import or_tools_tsp as ort
+from routing.algorithms import strong_components as sc
 
 
-_TSP_TIMELIMIT = 30  # Время решения TSP в 1 кластере
+_TSP_TIMELIMIT = 30  # Предельное время решения TSP в 1 кластере
+_TSP_TIMELIMIT_PER_POINT = 0.1  # Время решения TSP в 1 кластере, приходящееся на 1 точку
+_EXACT_TSP_THRESHOLD = 12  # Наибольший размер кластера, в котором TSP решается точно
 _ROUTING_TIMELIMIT = 10  # Время построения 1 маршрута в графе
+_MAX_PENDING_UPDATES = 64  # Наибольшее количество изменений длин ребер, передаваемых процессам пула без их пересоздания
+_MAX_PENDING_UPDATE_SHARE = 0.1  # Наибольшая доля измененных ребер графа, передаваемых без пересоздания процессов
+
+_TSP_SOLVERS = {  # Алгоритмы решения TSP в кластерах, размер которых больше порога точного решения
+    "genetic": ga.genetic_algorithm_for_tsp,
+    "or_tools": ort.or_tools_for_tsp,
+}
+
+_worker_graph = None  # Граф, загруженный в процесс пула инициализатором, чтобы не передавать его с каждой задачей
+_worker_hierarchy = None  # Иерархия сжатия графа, загруженная в процесс пула
+_worker_landmarks = None  # Ориентиры графа, загруженные в процесс пула
+
+# Графы в формате CSR, построенные по графам, представленным списками смежности, с версиями обоих графов
+_compact_graphs = weakref.WeakKeyDictionary()
+_landmarks = weakref.WeakKeyDictionary()  # Ориентиры графов в формате CSR по их количеству с версиями графов
 
 
 def build_routes(
-        points: list[sp.Point], clusters_amt: int, graph: sp.Graph, processes_num: int = 0
+        points: list[sp.Point], clusters_amt: int, graph: Union[sp.Graph, sp.CompactGraph], processes_num: int = 0,
+        ordered: bool = True, exact_tsp_threshold: int = _EXACT_TSP_THRESHOLD, road_distances: bool = False,
+        tsp_solver: str = "genetic", hierarchy: Optional[ch.ContractionHierarchy] = None, landmarks_amt: int = 0,
+        assignment: str = "exact", restarts: int = 1, strategy: str = "flat"
 ) -> Iterator[tuple[list[sp.Point], list[sp.Segment]]]:
     """Проложить указанное число маршрутов
 
     Этапы решения
     - Разделить список точек на k списков
-    - Определить порядок обхода точек в кластере == решить TSP в каждом кластере
-    - - Выполнять параллельно в нескольких кластерах
-    - Проложить маршрут в графе
-    - - Выполнять параллельно в нескольких кластерах
+    - Для каждого кластера в отдельном процессе
+    - - Определить порядок обхода точек в кластере == решить TSP
+    - - - Точно алгоритмом Хелда - Карпа в небольших кластерах, иначе генетическим алгоритмом или OR-Tools
+    - - Сразу после этого проложить маршрут в графе
+
+    Для многократного построения маршрутов в одном графе используйте Router, чтобы не создавать процессы каждый раз
+    Граф в формате CSR и ориентиры хранятся между вызовами, пока граф не изменится, поэтому при повторных вызовах
+    граф, представленный списками смежности, не преобразуется заново
 
     Args:
         points: Список точек, который нужно кластеризовать
         clusters_amt: Количество кластеров, на которые нужно разбить точки
-        graph: Граф для прокладывания маршрутов, представленный списками смежности
+        graph: Граф для прокладывания маршрутов, представленный списками смежности или в формате CSR
         processes_num: Количество процессов, создаваемых для параллельного решения TSP, построения маршрутов в кластерах
             По умолчанию используется половина логических процессоров
             Максимальное количество == количество логических процессоров
+        ordered: Возвращать маршруты в порядке кластеров или по мере их построения
+        exact_tsp_threshold: Наибольший размер кластера, в котором TSP решается точно алгоритмом Хелда - Карпа,
+            не больше 16
+        road_distances: Решать TSP по длинам кратчайших путей в графе, а не по Евклидовым расстояниям
+        tsp_solver: Алгоритм решения TSP в кластерах больше порога точного решения
+            genetic - генетический алгоритм, or_tools - управляемый локальный поиск OR-Tools
+        hierarchy: Иерархия сжатия графа, по которой ищутся пути между точками маршрута вместо A*
+        landmarks_amt: Количество ориентиров для эвристики A*, 0 - эвристика только по расстоянию по прямой
+        assignment: Способ разделения точек на кластеры на итерациях K-Means
+            exact - min-cost flow, greedy - приближенно, быстрее для очень большого количества точек
+        restarts: Количество запусков K-Means с разными начальными центрами в процессах пула,
+            выбирается разбиение с наименьшей суммой расстояний от точек до центроидов
+        strategy: Способ кластеризации
+            flat - сразу на k кластеров, bisection - рекурсивным делением, быстрее для очень большого числа кластеров
 
     Returns:
-        Кортеж из списка кластеров и списка соответствующих им маршрутов
+        Итератор, возвращающий кортежи из кластера и соответствующего ему маршрута по мере построения маршрутов
+        Пул процессов завершается после получения последнего маршрута или при удалении итератора
     """
 
-    if not points:
-        raise ValueError("empty list of clustering points")
-    elif clusters_amt <= 0:
-        raise ValueError("wrong amount of clusters")
+    router = Router(graph, processes_num, hierarchy, landmarks_amt)
 
-    unreachable_points = _find_unreachable_points(points, graph)
+    try:
+        results = router.build_routes(
+            points, clusters_amt, ordered, exact_tsp_threshold, road_distances, tsp_solver, assignment, restarts,
+            strategy
+        )
+    except Exception:
+        router.close()
+        raise
 
-    if unreachable_points:
-        raise ValueError(f"unreachable points found: {unreachable_points}")
+    iterator = _close_after_iteration(router, results)
+    weakref.finalize(iterator, router.terminate)  # Итератор удален, не начав перебор
+    return iterator
 
-    if processes_num < 0:
-        raise ValueError("number of processes cannot be negative")
-    elif processes_num > os.cpu_count():
-        raise ValueError("number of processes cannot exceed the number of processors")
-    elif not processes_num:
-        processes_num = os.cpu_count() // 2
 
-    unordered_clusters = k_means.k_means(points, clusters_amt)  # Кластеризовать точки
-    ordered_clusters = []
+def _close_after_iteration(
+        router: Router, results: Iterator[tuple[list[sp.Point], list[sp.Segment]]]
+) -> Iterator[tuple[list[sp.Point], list[sp.Segment]]]:
+    """Вернуть маршруты и завершить пул процессов после получения последнего из них
 
-    with mp.Pool(processes_num) as pool:  # Решить TSP в каждом кластере
-        tsp_jobs = []
+    Если перебор остановлен раньше, пул завершается, не дожидаясь построения оставшихся маршрутов
+    """
 
-        for cluster in unordered_clusters:
-            tsp_jobs.append(pool.apply_async(ga.genetic_algorithm_for_tsp, (cluster, _TSP_TIMELIMIT)))
+    completed = False
+
+    try:
+        yield from results
+        completed = True
+    finally:
+        if completed:
+            router.close()
+        else:
+            router.terminate()
+
+
+class Router:
+    """Маршрутизатор с постоянным пулом процессов
+
+    Граф преобразуется в формат CSR и загружается в процессы пула 1 раз при их создании,
+    процессы переиспользуются между вызовами build_routes
+    Пул завершается методом close или при выходе из блока with
+
+    Изменения длин ребер сохраняются во временные файлы, пути к ним передаются с задачами,
+    и процесс применяет к своей копии графа изменения, которых в ней еще нет
+    Когда изменений накапливается много, процессы пересоздаются с текущим графом
+
+    Attributes:
+        _graph: Граф для прокладывания маршрутов в формате CSR
+        _hierarchy: Иерархия сжатия графа
+        _landmarks: Ориентиры графа для эвристики A*
+        _shared_graph: Граф и ориентиры взяты из кэша построенных по Graph и копируются перед изменением длин ребер
+        _processes_num: Количество процессов в пуле
+        _pool: Пул процессов для параллельного решения TSP, построения маршрутов в кластерах
+        _updates_directory: Временный каталог с файлами изменений длин ребер
+        _updates: Версии графа и пути к файлам изменений, еще не загруженных в процессы при их создании
+        _updated_edges_amt: Суммарное количество ребер в этих изменениях
+    """
 
-        for job in tsp_jobs:
-            ordered_clusters.append(job.get(_TSP_TIMELIMIT + 1))
+    def __init__(
+            self, graph: Union[sp.Graph, sp.CompactGraph], processes_num: int = 0,
+            hierarchy: Optional[ch.ContractionHierarchy] = None, landmarks_amt: int = 0
+    ) -> None:
+        """Создать пул процессов и загрузить в них граф
+
+        Args:
+            graph: Граф для прокладывания маршрутов, представленный списками смежности или в формате CSR
+            processes_num: Количество процессов в пуле
+                По умолчанию используется половина логических процессоров, но не менее 1
+                Максимальное количество == количество логических процессоров
+            hierarchy: Иерархия сжатия графа, построенная заранее, по которой ищутся пути между точками маршрута
+                Процессы используют граф, для которого построена иерархия
+                После изменения длин ребер иерархия не используется, пути ищутся A*
+            landmarks_amt: Количество ориентиров графа для эвристики A*, ориентиры выбираются 1 раз при создании пула
+                0 - эвристика только по расстоянию по прямой
+
+        Raises:
+            ValueError: Иерархия построена для другого графа или устарела, неверное количество ориентиров
+        """
+
+        if processes_num < 0:
+            raise ValueError("number of processes cannot be negative")
+        elif landmarks_amt < 0:
+            raise ValueError("wrong amount of landmarks")
+        elif processes_num > os.cpu_count():
+            raise ValueError("number of processes cannot exceed the number of processors")
+        elif not processes_num:
+            processes_num = max(os.cpu_count() // 2, 1)
+
+        shared_graph = isinstance(graph, sp.Graph) and hierarchy is None
+
+        if hierarchy is None or graph is not hierarchy.graph:
+            graph = _get_compact_graph(graph)
+
+        if hierarchy is not None:
+            if len(graph) != len(hierarchy.graph) or graph.edges_amt != hierarchy.graph.edges_amt:
+                raise ValueError("contraction hierarchy was built for another graph")
+            elif not hierarchy.is_current:
+                raise ValueError("contraction hierarchy is outdated: edge lengths have changed")
+
+            graph = hierarchy.graph
+
+        self._graph = graph
+        self._hierarchy = hierarchy
+        self._landmarks = _get_landmarks(graph, landmarks_amt) if landmarks_amt else None
+        self._shared_graph = shared_graph
+        self._processes_num = processes_num
+        self._updates_directory = None
+        self._start_pool()
+
+    def __enter__(self) -> Router:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    @property
+    def graph(self) -> sp.CompactGraph:
+        return self._graph
+
+    def close(self) -> None:
+        """Завершить процессы пула после выполнения переданных им задач"""
+
+        self._pool.close()
+        self._pool.join()
+        self._remove_updates()
+
+    def terminate(self) -> None:
+        """Завершить процессы пула, не дожидаясь выполнения переданных им задач, повторный вызов ничего не делает"""
+
+        self._pool.terminate()
+        self._pool.join()
+        self._remove_updates()
+
+    def update_edge_lengths(self, edge_ids: Iterable[int], lengths: Iterable[float]) -> None:
+        """Изменить длины ребер графа, не загружая граф в процессы пула заново
+
+        Изменение сохраняется в файл, процессы применяют его перед решением следующей задачи
+        Граф, построенный по Graph, перед первым изменением копируется, тк он общий для всех Router этого Graph
+        Метки компонент связности остаются действительными, ориентиры используются, пока ни одно ребро не стало короче,
+        иерархия сжатия перестает использоваться
+        Если изменений больше _MAX_PENDING_UPDATES или в них больше _MAX_PENDING_UPDATE_SHARE ребер графа,
+        процессы пересоздаются с текущим графом после выполнения переданных им задач,
+        устаревшие ориентиры пересчитываются
+
+        Args:
+            edge_ids: Индексы ребер графа в формате CSR
+            lengths: Новые длины ребер, не меньше Евклидовых расстояний между их концами,
+                0 - Евклидово расстояние
+
+        Raises:
+            IndexError: Неверный индекс ребра
+            ValueError: Количество длин не совпадает с количеством ребер, длина меньше Евклидова расстояния
+        """
+
+        if self._shared_graph:  # Граф из кэша используется другими Router и вызовами build_routes
+            self._graph, self._landmarks = self._graph.copy(), copy.copy(self._landmarks)
+            self._shared_graph = False
+
+        edge_ids = list(edge_ids)
+        self._graph.update_edge_lengths(edge_ids, lengths)
+        self._updated_edges_amt += len(edge_ids)
+
+        if len(self._updates) >= _MAX_PENDING_UPDATES or \
+                self._updated_edges_amt > _MAX_PENDING_UPDATE_SHARE * self._graph.edges_amt:
+            self._pool.close()
+            self._pool.join()
+            self._remove_updates()
+            self._start_pool()
+            return
+
+        if self._updates_directory is None:
+            self._updates_directory = tempfile.TemporaryDirectory(prefix="routing-updates-")
+
+        path = os.path.join(self._updates_directory.name, f"{self._graph.version}.npz")
+        np.savez(
+            path, edge_ids=np.array(edge_ids, dtype=np.int64),
+            lengths=np.array([self._graph.edge_lengths[edge_id] for edge_id in edge_ids], dtype=np.float64)
+        )
+        self._updates = self._updates + ((self._graph.version, path),)
+
+    def _start_pool(self) -> None:
+        """Создать пул процессов и загрузить в них текущий граф
+
+        Устаревшая иерархия сжатия больше не передается процессам, ориентиры с недопустимыми оценками пересчитываются
+        """
+
+        if self._hierarchy is not None and not self._hierarchy.is_current:
+            self._hierarchy = None
+
+        if self._landmarks is not None and not self._landmarks.is_admissible(self._graph):
+            self._landmarks.update(self._graph)
+
+        self._updates = ()
+        self._updated_edges_amt = 0
+        self._pool = mp.Pool(
+            self._processes_num, initializer=_init_worker, initargs=(self._graph, self._hierarchy, self._landmarks)
+        )
+
+    def _remove_updates(self) -> None:
+        """Удалить файлы изменений длин ребер, загруженных в процессы при их создании или больше не нужных"""
+
+        if self._updates_directory is not None:
+            self._updates_directory.cleanup()
+            self._updates_directory = None
+
+    def build_routes(
+            self, points: list[sp.Point], clusters_amt: int, ordered: bool = True,
+            exact_tsp_threshold: int = _EXACT_TSP_THRESHOLD, road_distances: bool = False,
+            tsp_solver: str = "genetic", assignment: str = "exact", restarts: int = 1, strategy: str = "flat"
+    ) -> Iterator[tuple[list[sp.Point], list[sp.Segment]]]:
+        """Проложить указанное число маршрутов, аналог функции build_routes
+
+        Кластеризация выполняется сразу, запуски K-Means распределяются по процессам пула,
+        TSP и построение маршрута в кластере - одной задачей в процессе пула,
+        поэтому маршрут начинает строиться, как только найден порядок обхода точек его кластера
+
+        Args:
+            points: Список точек, который нужно кластеризовать
+            clusters_amt: Количество кластеров, на которые нужно разбить точки
+            ordered: Возвращать маршруты в порядке кластеров или по мере их построения
+            exact_tsp_threshold: Наибольший размер кластера, в котором TSP решается точно алгоритмом Хелда - Карпа,
+                не больше 16
+            road_distances: Решать TSP по длинам кратчайших путей в графе, а не по Евклидовым расстояниям
+            tsp_solver: Алгоритм решения TSP в кластерах больше порога точного решения
+                genetic - генетический алгоритм, or_tools - управляемый локальный поиск OR-Tools
+            assignment: Способ разделения точек на кластеры на итерациях K-Means
+                exact - min-cost flow, greedy - приближенно, быстрее для очень большого количества точек
+            restarts: Количество запусков K-Means с разными начальными центрами,
+                выбирается разбиение с наименьшей суммой расстояний от точек до центроидов
+            strategy: Способ кластеризации
+                flat - сразу на k кластеров, bisection - рекурсивным делением, части делятся в процессах пула
+
+        Returns:
+            Итератор, возвращающий кортежи из кластера и соответствующего ему маршрута по мере построения маршрутов
+        """
+
+        if not points:
+            raise ValueError("empty list of clustering points")
+        elif clusters_amt <= 0:
+            raise ValueError("wrong amount of clusters")
+        elif not 0 <= exact_tsp_threshold <= hk.MAX_GENES_AMT:  # Таблицы Хелда - Карпа растут как 2^n
+            raise ValueError(f"exact TSP threshold must be from 0 to {hk.MAX_GENES_AMT}")
+        elif tsp_solver not in _TSP_SOLVERS:
+            raise ValueError(f"unknown TSP solver: {tsp_solver}")
+
+        unreachable_points = _find_unreachable_points(points, self._graph)
+
+        if unreachable_points:
+            raise ValueError(f"unreachable points found: {unreachable_points}")
+
+        unordered_clusters = k_means.k_means(  # Кластеризовать точки
+            points, clusters_amt, assignment, restarts, self._pool, self._processes_num, strategy=strategy
+        )
+
+        solve_cluster = functools.partial(
+            _solve_cluster_in_worker, exact_tsp_threshold=exact_tsp_threshold, road_distances=road_distances,
+            tsp_solver=tsp_solver, updates=self._updates
+        )
+
+        if ordered:
+            results = self._pool.imap(solve_cluster, unordered_clusters)
+        else:
+            results = self._pool.imap_unordered(solve_cluster, unordered_clusters)
+
+        timeout = _TSP_TIMELIMIT + 1 + _ROUTING_TIMELIMIT  # Предельное время ожидания следующего маршрута
+        return (results.next(timeout) for _ in unordered_clusters)
+
+
+def _get_compact_graph(graph: Union[sp.Graph, sp.CompactGraph]) -> sp.CompactGraph:
+    """Получить граф в формате CSR, построенный 1 раз для версии графа, представленного списками смежности
+
+    Построенный граф переиспользуется, пока не изменились ни исходный граф, ни длины ребер построенного графа
+    """
 
-    with mp.Pool(processes_num) as pool:  # Построить маршруты в кластерах
-        mapping_jobs = []
+    if isinstance(graph, sp.CompactGraph):
+        return graph
 
-        for cluster in ordered_clusters:
-            mapping_jobs.append(pool.apply_async(_map_route_on_graph, (cluster, graph)))
+    version, compact_version, compact_graph = _compact_graphs.get(graph, (None, None, None))
 
-        routes = [job.get(_ROUTING_TIMELIMIT) for job in mapping_jobs]
+    if version != graph.version or compact_version != compact_graph.version:
+        compact_graph = sp.CompactGraph.from_graph(graph)
+        _compact_graphs[graph] = graph.version, compact_graph.version, compact_graph
 
-    return zip(ordered_clusters, routes)
+    return compact_graph
 
 
-def _find_unreachable_points(points: list[sp.Point], graph: sp.Graph) -> list[sp.Point]:
-    """Найти недостижимые точки
+def _get_landmarks(graph: sp.CompactGraph, landmarks_amt: int) -> lm.Landmarks:
+    """Получить ориентиры графа, выбранные 1 раз для версии графа и количества ориентиров"""
 
-    Точки должны быть в графе, т.е. у каждой точки должен быть свой список смежности
-    Точки должны быть достижимы из любой другой точки => граф сильно связный
+    graph_landmarks = _landmarks.setdefault(graph, {})
+    version, landmarks = graph_landmarks.get(landmarks_amt, (None, None))
+
+    if version != graph.version:
+        landmarks = lm.Landmarks.from_graph(graph, landmarks_amt)
+        graph_landmarks[landmarks_amt] = graph.version, landmarks
+
+    return landmarks
+
+
+def _init_worker(
+        graph: sp.CompactGraph, hierarchy: Optional[ch.ContractionHierarchy] = None,
+        landmarks: Optional[lm.Landmarks] = None
+) -> None:
+    """Загрузить граф, его иерархию сжатия и ориентиры в процесс пула
+
+    При запуске процессов через fork граф не сериализуется, а наследуется от родительского процесса
+    """
+
+    global _worker_graph, _worker_hierarchy, _worker_landmarks
+    _worker_graph = graph
+    _worker_hierarchy = hierarchy
+    _worker_landmarks = landmarks
+
+
+def _solve_cluster_in_worker(
+        cluster: sp.Cluster, exact_tsp_threshold: int, road_distances: bool, tsp_solver: str,
+        updates: tuple[tuple[int, str], ...] = ()
+) -> tuple[list[sp.Point], list[sp.Segment]]:
+    """Решить TSP в кластере и построить маршрут в графе, загруженном в процесс пула
+
+    Если TSP решается по длинам путей в графе, то найденные пути переиспользуются при построении маршрута
+    Перед решением к графу процесса применяются изменения длин ребер, которых в нем еще нет
 
     Args:
-        points: Список точек, который нужно кластеризовать
-        graph: Граф, в котором будут строиться маршруты
+        updates: Версии графа и пути к файлам изменений длин ребер после создания процесса
     """
 
-    isolated_points = []
+    _apply_updates(updates)
+    distances = trees = None
 
-    for point in points:  # Найти изолированные вершины
-        if point not in graph:
-            points.remove(point)
-            isolated_points.append(point)
+    if road_distances:
+        distances, trees = _get_road_distances(cluster, _worker_graph)
 
-    if not points:
-        return isolated_points
+    if len(cluster) <= exact_tsp_threshold:
+        ordered_cluster = hk.held_karp_for_tsp(cluster, distances)
+    else:
+        ordered_cluster = _TSP_SOLVERS[tsp_solver](cluster, _get_tsp_time_limit(len(cluster)), distances=distances)
+
+    hierarchy, landmarks = _worker_hierarchy, _worker_landmarks
+
+    if hierarchy is not None and not hierarchy.is_current:  # Длины ребер изменились, пути ищутся A*
+        hierarchy = None
+
+    if landmarks is not None and not landmarks.is_admissible(_worker_graph):  # Ребра стали короче
+        landmarks = None
+
+    return ordered_cluster, _map_route_on_graph(ordered_cluster, _worker_graph, trees, hierarchy, landmarks)
+
+
+def _apply_updates(updates: tuple[tuple[int, str], ...]) -> None:
+    """Применить к графу процесса пула изменения длин ребер с версиями больше его версии
 
-    stack = [random.choice(points)]
-    visited_points = set()
+    Изменения применяются по порядку, поэтому версия графа процесса совпадает с версией графа маршрутизатора
+    """
+
+    for version, path in updates:
+        if version > _worker_graph.version:
+            with np.load(path) as update:
+                _worker_graph.update_edge_lengths(update["edge_ids"].tolist(), update["lengths"].tolist())
+
+
+def _get_road_distances(
+        cluster: sp.Cluster, graph: sp.CompactGraph
+) -> tuple[np.ndarray, dict[sp.Point, a_star.ShortestPathTree]]:
+    """Вычислить матрицу длин кратчайших путей между точками кластера
+
+    Выполняется 1 поиск алгоритмом Дейкстры из каждой точки до всех остальных
+
+    Returns:
+        Матрица длин путей и деревья кратчайших путей из каждой точки
+    """
+
+    trees = {point: a_star.dijkstra(point, cluster, graph) for point in cluster}
+    distances = np.array([[trees[start].get_distance(finish) for finish in cluster] for start in cluster])
+    return np.round(distances, sp.get_precision()), trees
+
+
+def _get_tsp_time_limit(cluster_size: int) -> float:
+    """Получить лимит времени решения TSP, пропорциональный размеру кластера, но не более _TSP_TIMELIMIT"""
+
+    return min(_TSP_TIMELIMIT, _TSP_TIMELIMIT_PER_POINT * cluster_size)
+
+
+def _find_unreachable_points(
+        points: list[sp.Point], graph: Union[sp.Graph, sp.CompactGraph]
+) -> list[sp.Point]:
+    """Найти недостижимые точки
 
-    while stack:  # Найти вершины не посещенной компоненты связности
-        point = stack.pop()
+    Точки должны быть в графе, т.е. у каждой точки должен быть свой список смежности
+    Точки должны быть достижимы друг из друга => все точки в одной компоненте сильной связности графа
+
+    Компоненты вычисляются 1 раз для версии графа, поэтому проверка точек - O(количества точек)
+    Достижимой считается компонента, в которой больше всего точек
+
+    Args:
+        points: Список точек, который нужно кластеризовать, не изменяется
+        graph: Граф, в котором будут строиться маршруты
 
-        if point in visited_points:
-            continue
+    Returns:
+        Точки, которых нет в графе, затем точки вне основной компоненты
+    """
 
-        visited_points.add(point)
+    labels = sc.get_point_labels(points, graph)
+    isolated_points = [point for point, label in zip(points, labels) if label < 0]
+    counts = collections.Counter(label for label in labels if label >= 0)
 
-        for edge in graph.adjacency_lists[point]:
-            stack.append(edge.get_another_border(point))
+    if not counts:
+        return isolated_points
 
-    return isolated_points + list(set(points) - visited_points)
+    main_label = counts.most_common(1)[0][0]
+    return isolated_points + [point for point, label in zip(points, labels) if label >= 0 and label != main_label]
 
 
-def _map_route_on_graph(ordered_cluster: sp.Cluster, graph: sp.Graph) -> list[sp.Segment]:
+def _map_route_on_graph(
+        ordered_cluster: sp.Cluster, graph: Union[sp.Graph, sp.CompactGraph],
+        trees: Optional[dict[sp.Point, a_star.ShortestPathTree]] = None,
+        hierarchy: Optional[ch.ContractionHierarchy] = None, landmarks: Optional[lm.Landmarks] = None
+) -> list[sp.Segment]:
     """Построить маршрут в графе
 
+    Если передана иерархия сжатия, пути ищутся по ней
+    Иначе в графе в формате CSR пути ищутся одним поиском от каждой второй точки маршрута до предыдущей и следующей,
+    тк ребра графа неориентированные, и путь от предыдущей точки до текущей - развернутый путь от текущей до предыдущей
+
     Args:
         ordered_cluster: Кластер с заданным порядком обхода точек
         graph: Граф для прокладывания маршрута
+        trees: Деревья кратчайших путей из точек кластера, найденные ранее, пути из них не ищутся повторно
+        hierarchy: Иерархия сжатия графа
+        landmarks: Ориентиры графа в формате CSR для эвристики A*
 
     Returns:
         Построенный маршрут
     """
 
-    route = []  # Путь - список ребер графа
+    points_amt = len(ordered_cluster)
+    legs = [None] * points_amt  # legs[i] - путь от i-й точки маршрута до следующей
 
     for i, start in enumerate(ordered_cluster):
-        finish = ordered_cluster[i + 1 if (i + 1) < len(ordered_cluster) else (i + 1 - len(ordered_cluster))]
-        route.extend(a_star.a_star(start, finish, graph))
+        finish = ordered_cluster[(i + 1) % points_amt]
+
+        if trees and start in trees:
+            legs[i] = trees[start].get_path(finish)
+        elif hierarchy is not None:
+            legs[i] = hierarchy.find_path(start, finish)
+        elif not isinstance(graph, sp.CompactGraph):
+            legs[i] = a_star.a_star(start, finish, graph)
+
+    if isinstance(graph, sp.CompactGraph):
+        for i in range(0, points_amt, 2):
+            previous_leg, next_leg = (i - 1) % points_amt, i
+
+            if legs[previous_leg] is not None and legs[next_leg] is not None:
+                continue
+
+            previous, next_ = ordered_cluster[previous_leg], ordered_cluster[(i + 1) % points_amt]
+            paths = a_star.find_paths(ordered_cluster[i], {previous, next_}, graph, landmarks)
+
+            if legs[next_leg] is None:
+                legs[next_leg] = paths.get(next_, [])
+
+            if legs[previous_leg] is None:
+                legs[previous_leg] = paths.get(previous, [])[::-1]
 
-    return route
+    return [edge for leg in legs for edge in leg]
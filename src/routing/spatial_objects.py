@@ -3,10 +3,17 @@
 
 from __future__ import annotations
 
+import itertools
 import math
-from typing import Generic, Optional, TypeVar
+import os
+import sys
+from array import array
+from typing import Generic, Iterable, Optional, TypeVar, Union
+
+import numpy as np
 
 _PRECISION = 6  # Количество знаков после запятой в координатах, расстояниях между точками
+_EDGE_LIST_CHUNK_SIZE = 1 << 20  # Количество строк файла списка ребер, разбираемых за 1 раз
 
 
 def get_precision() -> int:
@@ -16,17 +23,46 @@ def get_precision() -> int:
 
 
 class Point:
-    """Точка на плоскости"""
+    """Точка на плоскости
+
+    Атрибуты хранятся в __slots__ без словаря экземпляра, хэш вычисляется 1 раз при создании
+
+    Attributes:
+        _x: Абсцисса
+        _y: Ордината
+        _hash: Хэш координат
+    """
+
+    __slots__ = ("_x", "_y", "_hash")
 
     def __init__(self, x: float, y: float) -> None:
         self._x = round(x, _PRECISION)
         self._y = round(y, _PRECISION)
+        self._hash = hash((self._x, self._y))
 
     def __eq__(self, other) -> bool:
-        return self._x == other.x and self._y == other.y
+        return self is other or self._x == other.x and self._y == other.y
 
     def __hash__(self) -> int:
-        return hash((self._x, self._y))
+        return self._hash
+
+    def __reduce__(self) -> tuple:
+        return self.__class__, (self._x, self._y)
+
+    @classmethod
+    def _from_rounded(cls, x: float, y: float) -> Point:
+        """Создать точку по координатам, уже округленным до _PRECISION знаков, без повторного округления"""
+
+        point = cls.__new__(cls)
+        point._x, point._y = x, y
+        point._hash = hash((x, y))
+        return point
+
+    def __setstate__(self, state: dict) -> None:
+        """Восстановить точку, сохраненную до появления __slots__, с атрибутами в словаре экземпляра"""
+
+        self._x, self._y = state["_x"], state["_y"]
+        self._hash = hash((self._x, self._y))
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}({self._x}, {self._y})"
@@ -49,6 +85,35 @@ class Point:
         return round(math.sqrt((self._x - point.x) ** 2 + (self._y - point.y) ** 2), _PRECISION)
 
 
+class PointPool:
+    """Пул точек, в котором точки с одинаковыми координатами - 1 объект
+
+    При построении графа из списка ребер каждая вершина встречается в нескольких ребрах,
+    пул позволяет хранить 1 объект на вершину вместо объекта на каждое вхождение
+
+    Attributes:
+        _points: Точки пула по самим себе
+    """
+
+    __slots__ = ("_points",)
+
+    def __init__(self) -> None:
+        self._points: dict[Point, Point] = {}
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def get(self, x: float, y: float) -> Point:
+        """Получить точку пула с заданными координатами, добавив ее, если ее нет"""
+
+        return self.intern(Point(x, y))
+
+    def intern(self, point: Point) -> Point:
+        """Получить точку пула, равную переданной, добавив переданную, если такой нет"""
+
+        return self._points.setdefault(point, point)
+
+
 T = TypeVar("T")  # Переменная типа
 
 
@@ -80,23 +145,29 @@ class Cluster(list, Generic[T]):
 class Segment:
     """Отрезок не нулевой длины, соединяющий две точки
 
+    Атрибуты хранятся в __slots__ без словаря экземпляра
+
     Attributes:
         _start: Начало отрезка
         _finish: Конец отрезка
         _length: Длина отрезка, по умолчанию Евклидово расстояние между началом и концом
     """
 
+    __slots__ = ("_start", "_finish", "_length")
+
     def __init__(self, start: Point, finish: Point, length: float = 0):
         self._start = start
         self._finish = finish
 
-        euclidian_distance = start.get_distance_to(finish)
+        if not length:
+            self._length = start.get_distance_to(finish)
+            return
 
-        if length and length < euclidian_distance:
+        self._length = round(length, _PRECISION)
+        # Длина сравнивается с Евклидовым расстоянием без извлечения корня, с точностью до округления расстояния
+        if (self._length + 0.5 * 10 ** -_PRECISION) ** 2 < (start.x - finish.x) ** 2 + (start.y - finish.y) ** 2:
             raise ValueError("edge length cannot be less than the Euclidean distance")
 
-        self._length = round(length, _PRECISION) if length else euclidian_distance
-
     def __eq__(self, other) -> bool:
         return other.start == self._start and other.finish == self._finish and other.length == self._length
 
@@ -106,6 +177,14 @@ class Segment:
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}({self._start}, {self._finish})"
 
+    def __reduce__(self) -> tuple:
+        return self.__class__, (self._start, self._finish, self._length)
+
+    def __setstate__(self, state: dict) -> None:
+        """Восстановить отрезок, сохраненный до появления __slots__, с атрибутами в словаре экземпляра"""
+
+        self._start, self._finish, self._length = state["_start"], state["_finish"], state["_length"]
+
     @property
     def start(self) -> Point:
         return self._start
@@ -128,10 +207,21 @@ class Segment:
 
 
 class Graph:
-    """Ориентированный взвешенный граф, представленный списками смежности"""
+    """Ориентированный взвешенный граф, представленный списками смежности
+
+    Attributes:
+        _adjacency_lists: Списки ребер по вершинам
+        _version: Номер версии графа, увеличивается при каждом изменении, по нему сбрасываются кэши производных данных
+        _topology_version: Номер версии множества вершин и ребер, не меняется при изменении длин ребер
+        _shortened_version: Номер последней версии, в которой расстояния могли уменьшиться - добавлено ребро
+            или длина хотя бы 1 ребра уменьшилась
+    """
 
     def __init__(self) -> None:
         self._adjacency_lists: dict[Point, list[Segment]] = {}
+        self._version = 0
+        self._topology_version = 0
+        self._shortened_version = 0
 
     def __contains__(self, item) -> bool:
         return item in self._adjacency_lists
@@ -140,9 +230,457 @@ class Graph:
     def adjacency_lists(self) -> dict[Point, list[Segment]]:
         return self._adjacency_lists
 
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @property
+    def topology_version(self) -> int:
+        return self._topology_version
+
+    @property
+    def shortened_version(self) -> int:
+        return self._shortened_version
+
     def add_edge(self, edge: Segment) -> None:
+        self._version += 1
+        self._topology_version += 1
+        self._shortened_version = self._version
+
         for node in edge.start, edge.finish:
             if node not in self._adjacency_lists:
                 self._adjacency_lists[node] = []
 
             self._adjacency_lists[node].append(edge)
+
+    def update_edge_lengths(self, edges: Iterable[Segment], lengths: Iterable[float]) -> None:
+        """Изменить длины ребер, заменив их в списках смежности обеих границ
+
+        Аргументы такие же, как у CompactGraph.update_edge_lengths, но ребра задаются объектами, а не индексами
+        Если ребро повторяется, используется его последняя длина
+        Версия графа увеличивается на 1 за вызов, множество вершин и ребер не меняется
+
+        Args:
+            edges: Ребра графа
+            lengths: Новые длины ребер, не меньше Евклидовых расстояний между их концами,
+                0 - Евклидово расстояние
+
+        Raises:
+            KeyError: Ребра нет в графе
+            ValueError: Количество длин не совпадает с количеством ребер, длина меньше Евклидова расстояния
+        """
+
+        edges, lengths = list(edges), list(lengths)
+
+        if len(edges) != len(lengths):
+            raise ValueError("number of lengths does not match number of edges")
+
+        replacements = []  # Ребра проверяются до изменения графа, чтобы при ошибке граф не менялся
+
+        for edge, length in dict(zip(edges, lengths)).items():  # Повторяющиеся ребра заменяются 1 раз
+            if edge not in self._adjacency_lists.get(edge.start, []):
+                raise KeyError(f"edge is not in the graph: {edge}")
+
+            replacements.append((edge, Segment(edge.start, edge.finish, length)))
+
+        shortened = False
+
+        for edge, new_edge in replacements:
+            shortened = shortened or new_edge.length < edge.length
+
+            for node in {edge.start, edge.finish}:
+                adjacency_list = self._adjacency_lists[node]
+                adjacency_list[adjacency_list.index(edge)] = new_edge
+
+        self._version += 1
+
+        if shortened:
+            self._shortened_version = self._version
+
+
+class CompactGraph:
+    """Граф в формате CSR (Compressed Sparse Row) с неизменяемым множеством вершин и ребер
+
+    Вершины пронумерованы плотными индексами от 0 до n - 1, ребра - от 0 до m - 1
+    Список смежности вершины i - элементы массивов _targets, _weights, _edges с индексами от _offsets[i] до
+    _offsets[i + 1] не включительно
+    Как и в Graph, каждое ребро доступно из обеих граничных вершин, поэтому в списках смежности 2m элементов
+
+    Объекты Segment не хранятся, а создаются по запросу из индексов концов и длины ребра
+    Длины ребер изменяются на месте методом update_edge_lengths, например, по данным о пробках
+
+    Attributes:
+        _ids: Индексы вершин
+        _points: Вершины по индексам
+        _xs: Абсциссы вершин
+        _ys: Ординаты вершин
+        _offsets: Смещения списков смежности вершин, n + 1 элемент
+        _targets: Индексы смежных вершин
+        _weights: Длины ребер до смежных вершин
+        _edges: Индексы ребер до смежных вершин
+        _edge_starts: Индексы начал ребер
+        _edge_finishes: Индексы концов ребер
+        _edge_lengths: Длины ребер
+        _version: Номер версии графа, увеличивается при изменении длин ребер,
+            по нему сбрасываются кэши производных данных
+        _shortened_version: Номер последней версии, в которой длина хотя бы 1 ребра уменьшилась
+    """
+
+    def __init__(
+            self, points: list[Point], offsets: array, targets: array, weights: array, edges: array,
+            edge_starts: array, edge_finishes: array, edge_lengths: array
+    ) -> None:
+        self._points = points
+        self._index_points()
+        self._offsets = offsets
+        self._targets = targets
+        self._weights = weights
+        self._edges = edges
+        self._edge_starts = edge_starts
+        self._edge_finishes = edge_finishes
+        self._edge_lengths = edge_lengths
+        self._version = 0
+        self._shortened_version = 0
+
+    def __contains__(self, item) -> bool:
+        return item in self._ids
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def __getstate__(self) -> dict:
+        """Сериализовать граф без индекса вершин и координат, тк они восстанавливаются по списку вершин"""
+
+        state = self.__dict__.copy()
+
+        for name in "_ids", "_xs", "_ys":
+            del state[name]
+
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.__dict__.setdefault("_version", 0)  # Граф сохранен до появления версий
+        self.__dict__.setdefault("_shortened_version", 0)
+        self._index_points()
+
+    @classmethod
+    def from_graph(cls, graph: Graph) -> CompactGraph:
+        """Построить компактное представление графа, заданного списками смежности
+
+        Временная сложность O(n + m)
+        """
+
+        points = list(graph.adjacency_lists)
+        ids = {point: i for i, point in enumerate(points)}
+        offsets = array("q", [0])
+        targets, edges = array("i"), array("i")
+        weights = array("d")
+        edge_starts, edge_finishes = array("i"), array("i")
+        edge_lengths = array("d")
+        edge_ids = {}  # Индексы ребер по id объектов, тк ребро встречается в списках смежности обеих границ
+
+        for i, point in enumerate(points):
+            for edge in graph.adjacency_lists[point]:
+                edge_id = edge_ids.get(id(edge))
+
+                if edge_id is None:
+                    edge_id = edge_ids[id(edge)] = len(edge_lengths)
+                    edge_starts.append(ids[edge.start])
+                    edge_finishes.append(ids[edge.finish])
+                    edge_lengths.append(edge.length)
+
+                targets.append(ids[edge.get_another_border(point)])
+                weights.append(edge.length)
+                edges.append(edge_id)
+
+            offsets.append(len(targets))
+
+        return cls(points, offsets, targets, weights, edges, edge_starts, edge_finishes, edge_lengths)
+
+    @classmethod
+    def from_arrays(
+            cls, xs: np.ndarray, ys: np.ndarray, edge_starts: np.ndarray, edge_finishes: np.ndarray,
+            edge_lengths: Optional[np.ndarray] = None
+    ) -> CompactGraph:
+        """Построить граф по массивам координат вершин и ребер без создания объектов ребер
+
+        Списки смежности строятся 1 векторизованным проходом: концы ребер сортируются по вершинам устойчиво,
+        поэтому в списке смежности вершины ребра идут по возрастанию индексов
+        Индексы ребер - их позиции в массивах, по ним можно изменять длины ребер методом update_edge_lengths
+        Объекты Point создаются только для вершин
+
+        Временная сложность O(n + m*log(m))
+
+        Args:
+            xs, ys: Координаты вершин, вершины различны
+            edge_starts, edge_finishes: Индексы начал и концов ребер
+            edge_lengths: Длины ребер, не меньше Евклидовых расстояний между их концами,
+                по умолчанию и для нулевых длин - Евклидовы расстояния
+
+        Returns:
+            Граф в формате CSR
+
+        Raises:
+            ValueError: Размеры массивов не совпадают, неверный индекс вершины, ребро из вершины в нее же,
+                совпадающие вершины, длина меньше Евклидова расстояния
+        """
+
+        xs = np.round(np.asarray(xs, dtype=np.float64).ravel(), _PRECISION)
+        ys = np.round(np.asarray(ys, dtype=np.float64).ravel(), _PRECISION)
+        edge_starts = np.asarray(edge_starts, dtype=np.int64).ravel()
+        edge_finishes = np.asarray(edge_finishes, dtype=np.int64).ravel()
+        nodes_amt, edges_amt = len(xs), len(edge_starts)
+
+        if len(ys) != nodes_amt or len(edge_finishes) != edges_amt or \
+                edge_lengths is not None and np.size(edge_lengths) != edges_amt:
+            raise ValueError("array sizes do not match")
+        elif edges_amt and (min(edge_starts.min(), edge_finishes.min()) < 0 or
+                            max(edge_starts.max(), edge_finishes.max()) >= nodes_amt):
+            raise ValueError("wrong node id")
+        elif np.any(edge_starts == edge_finishes):
+            raise ValueError("edge cannot connect a node with itself")
+
+        distances = np.round(
+            np.sqrt((xs[edge_starts] - xs[edge_finishes]) ** 2 + (ys[edge_starts] - ys[edge_finishes]) ** 2),
+            _PRECISION
+        )
+
+        if edge_lengths is None:
+            edge_lengths = distances
+        else:
+            edge_lengths = np.round(np.asarray(edge_lengths, dtype=np.float64).ravel(), _PRECISION)
+            edge_lengths = np.where(edge_lengths == 0, distances, edge_lengths)
+
+            if np.any(edge_lengths < distances):
+                raise ValueError("edge length cannot be less than the Euclidean distance")
+
+        # Каждое ребро дает 2 элемента списков смежности: из начала в конец и из конца в начало
+        borders = np.column_stack((edge_starts, edge_finishes)).ravel()
+        adjacent = np.column_stack((edge_finishes, edge_starts)).ravel()
+        order = np.argsort(borders, kind="stable")
+        edges = order // 2
+        offsets = np.zeros(nodes_amt + 1, dtype=np.int64)
+        np.cumsum(np.bincount(borders, minlength=nodes_amt), out=offsets[1:])
+
+        graph = cls(
+            [Point._from_rounded(x, y) for x, y in zip(xs.tolist(), ys.tolist())], array("q", offsets.tobytes()),
+            array("i", adjacent[order].astype(np.int32).tobytes()), array("d", edge_lengths[edges].tobytes()),
+            array("i", edges.astype(np.int32).tobytes()), array("i", edge_starts.astype(np.int32).tobytes()),
+            array("i", edge_finishes.astype(np.int32).tobytes()), array("d", edge_lengths.tobytes())
+        )
+
+        if len(graph) != len(graph._ids):  # Индекс вершин построен конструктором
+            raise ValueError("graph nodes must be different points")
+
+        return graph
+
+    @classmethod
+    def from_edge_list(
+            cls, path: Union[str, os.PathLike], delimiter: str = ",", chunk_size: int = _EDGE_LIST_CHUNK_SIZE
+    ) -> CompactGraph:
+        """Построить граф по текстовому файлу списка ребер
+
+        Строка файла - ребро: x начала, y начала, x конца, y конца и необязательная длина
+        Пустые строки и строки, начинающиеся с #, пропускаются
+        Файл читается и разбирается частями по chunk_size строк, вершины - различные концы ребер в порядке их появления,
+        индексы ребер - номера их строк без учета пропущенных
+
+        Args:
+            path: Путь к файлу
+            delimiter: Разделитель значений в строке
+            chunk_size: Количество строк, разбираемых за 1 раз
+
+        Returns:
+            Граф в формате CSR
+
+        Raises:
+            ValueError: Неверное количество значений в строке, ребро из вершины в нее же,
+                длина меньше Евклидова расстояния
+        """
+
+        chunks = []
+
+        with open(path) as file:
+            while True:
+                lines = list(itertools.islice(file, chunk_size))
+
+                if not lines:
+                    break
+
+                lines = [line for line in lines if line.strip() and not line.lstrip().startswith("#")]
+
+                if lines:
+                    chunks.append(np.loadtxt(lines, delimiter=delimiter, ndmin=2))
+
+        values = np.concatenate(chunks) if chunks else np.empty((0, 4))
+
+        if values.shape[1] not in (4, 5):
+            raise ValueError("edge list line must contain 4 coordinates and an optional length")
+
+        coordinates = np.round(values[:, :4].reshape(-1, 2), _PRECISION)  # Концы ребер по порядку: начало, конец
+        # Пара координат как 1 комплексное число сортируется по x, затем по y в разы быстрее, чем строки матрицы
+        unique_coordinates, first_indexes, inverse = np.unique(
+            coordinates.view(np.complex128).ravel(), return_index=True, return_inverse=True
+        )
+        order = np.argsort(first_indexes)  # Вершины в порядке появления, как при добавлении ребер в Graph
+        node_ids = np.empty(len(order), dtype=np.int64)
+        node_ids[order] = np.arange(len(order))
+        borders = node_ids[inverse.ravel()]
+
+        return cls.from_arrays(
+            unique_coordinates.real[order], unique_coordinates.imag[order], borders[0::2], borders[1::2],
+            values[:, 4] if values.shape[1] == 5 else None
+        )
+
+    @property
+    def edges_amt(self) -> int:
+        return len(self._edge_lengths)
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @property
+    def topology_version(self) -> int:
+        """Версия множества вершин и ребер, оно не меняется после построения графа"""
+
+        return 0
+
+    @property
+    def shortened_version(self) -> int:
+        return self._shortened_version
+
+    @property
+    def offsets(self) -> array:
+        return self._offsets
+
+    @property
+    def targets(self) -> array:
+        return self._targets
+
+    @property
+    def weights(self) -> array:
+        return self._weights
+
+    @property
+    def edges(self) -> array:
+        return self._edges
+
+    @property
+    def edge_lengths(self) -> array:
+        return self._edge_lengths
+
+    @property
+    def xs(self) -> array:
+        return self._xs
+
+    @property
+    def ys(self) -> array:
+        return self._ys
+
+    def get_node_id(self, point: Point) -> int:
+        """Получить индекс вершины
+
+        Raises:
+            KeyError: Вершины нет в графе
+        """
+
+        return self._ids[point]
+
+    def get_point(self, node_id: int) -> Point:
+        return self._points[node_id]
+
+    def get_segment(self, edge_id: int) -> Segment:
+        """Создать объект ребра по его индексу"""
+
+        return Segment(
+            self._points[self._edge_starts[edge_id]],
+            self._points[self._edge_finishes[edge_id]],
+            self._edge_lengths[edge_id]
+        )
+
+    def update_edge_lengths(self, edge_ids: Iterable[int], lengths: Iterable[float]) -> None:
+        """Изменить длины ребер на месте, не перестраивая массивы графа
+
+        Длина обновляется в массиве длин ребер и в 2 элементах списков смежности границ ребра,
+        поиск элемента - O(степени вершины), поэтому изменение k ребер - O(k * наибольшей степени)
+        Если ребро повторяется, используется его последняя длина
+        Версия графа увеличивается на 1 за вызов, множество вершин и ребер не меняется
+
+        Args:
+            edge_ids: Индексы ребер
+            lengths: Новые длины ребер, не меньше Евклидовых расстояний между их концами,
+                0 - Евклидово расстояние
+
+        Raises:
+            IndexError: Неверный индекс ребра
+            ValueError: Количество длин не совпадает с количеством ребер, длина меньше Евклидова расстояния
+        """
+
+        edge_ids, lengths = list(edge_ids), list(lengths)
+
+        if len(edge_ids) != len(lengths):
+            raise ValueError("number of lengths does not match number of edges")
+
+        updates = []  # Ребра проверяются до изменения графа, чтобы при ошибке граф не менялся
+
+        for edge_id, length in dict(zip(edge_ids, lengths)).items():  # Повторяющиеся ребра изменяются 1 раз
+            if not 0 <= edge_id < len(self._edge_lengths):
+                raise IndexError(f"wrong edge id: {edge_id}")
+
+            start, finish = self._edge_starts[edge_id], self._edge_finishes[edge_id]
+            distance = self._points[start].get_distance_to(self._points[finish])
+            length = round(length, _PRECISION) or distance  # Как в Segment, нулевая длина - Евклидово расстояние
+
+            if length < distance:
+                raise ValueError("edge length cannot be less than the Euclidean distance")
+
+            updates.append((edge_id, start, finish, length))
+
+        shortened = False
+
+        for edge_id, start, finish, length in updates:
+            shortened = shortened or length < self._edge_lengths[edge_id]
+            self._edge_lengths[edge_id] = length
+
+            for node in {start, finish}:
+                for slot in range(self._offsets[node], self._offsets[node + 1]):
+                    if self._edges[slot] == edge_id:
+                        self._weights[slot] = length
+
+        self._version += 1
+
+        if shortened:
+            self._shortened_version = self._version
+
+    def copy(self) -> CompactGraph:
+        """Получить копию графа, длины ребер которой изменяются независимо от исходного графа
+
+        Копируются только массивы длин, вершины и остальные массивы не меняются после построения графа и общие
+        """
+
+        graph = CompactGraph.__new__(CompactGraph)
+        graph.__dict__.update(self.__dict__)
+        graph._weights, graph._edge_lengths = array("d", self._weights), array("d", self._edge_lengths)
+        return graph
+
+    def _index_points(self) -> None:
+        """Построить индекс вершин и массивы координат по списку вершин"""
+
+        self._ids = {point: i for i, point in enumerate(self._points)}
+        self._xs = array("d", (point.x for point in self._points))
+        self._ys = array("d", (point.y for point in self._points))
+
+    def get_memory_usage(self) -> int:
+        """Получить объем памяти в байтах, занимаемый массивами графа и индексом вершин
+
+        Сами объекты Point не учитываются, тк они разделяются с исходным графом
+        """
+
+        buffers = (
+            self._xs, self._ys, self._offsets, self._targets, self._weights, self._edges,
+            self._edge_starts, self._edge_finishes, self._edge_lengths
+        )
+
+        return sys.getsizeof(self._ids) + sys.getsizeof(self._points) + sum(sys.getsizeof(buffer) for buffer in buffers)
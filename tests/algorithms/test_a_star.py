@@ -1,8 +1,13 @@
 """Тесты А*"""
 
+import math
+import random
+
+import pytest
 
 from routing import spatial_objects as sp
 from routing.algorithms import a_star
+from routing.algorithms import landmarks as lm
 
 
 def test_a_star() -> None:
@@ -33,3 +38,113 @@ def test_a_star() -> None:
 
     result = a_star.a_star(points[6], points[0], square_graph)
     assert result == [edges[0], edges[2], edges[7], edges[8]]
+
+    compact_graph = sp.CompactGraph.from_graph(square_graph)
+    assert a_star.a_star(points[6], points[0], compact_graph) == result
+
+
+def test_relaxation() -> None:
+    """Тест поиска пути, когда первый найденный путь до вершины не кратчайший
+
+    Прямое ребро от старта до вершины a длиннее обхода через вершину b, который находится позже"""
+
+    start, a, b, finish = sp.Point(0, 0), sp.Point(1, 0), sp.Point(0, 1), sp.Point(2, 0)
+    edges = [sp.Segment(start, a, 10), sp.Segment(start, b, 1), sp.Segment(b, a, 1.5), sp.Segment(a, finish, 1)]
+    graph = sp.Graph()
+
+    for edge in edges:
+        graph.add_edge(edge)
+
+    compact_graph = sp.CompactGraph.from_graph(graph)
+    expected = [edges[1], edges[2], edges[3]]
+
+    assert a_star.a_star(start, finish, graph) == expected
+
+    for _ in range(2):  # Повторный поиск на тех же буферах
+        assert a_star.a_star(start, finish, compact_graph) == expected
+        assert a_star.a_star(finish, b, compact_graph) == [edges[3], edges[2]]
+
+
+def test_find_paths() -> None:
+    """Тест поиска путей от одной вершины до нескольких поиском А*
+
+    Граф - цепочка из 5 вершин и изолированное ребро"""
+
+    points = [sp.Point(i, 0) for i in range(5)]
+    graph = sp.Graph()
+
+    for first, second in zip(points, points[1:]):
+        graph.add_edge(sp.Segment(first, second, 2))
+
+    isolated = sp.Point(0, 5)
+    graph.add_edge(sp.Segment(isolated, sp.Point(1, 5)))
+    compact_graph = sp.CompactGraph.from_graph(graph)
+    paths = a_star.find_paths(points[2], [points[0], points[2], points[4], isolated], compact_graph)
+
+    assert isolated not in paths  # Недостижимая вершина
+    assert paths[points[2]] == []
+
+    for finish in points[0], points[4]:
+        assert paths[finish] == a_star.a_star(points[2], finish, graph)
+
+
+def test_dijkstra() -> None:
+    """Тест поиска путей от одной вершины до нескольких
+
+    Граф - цепочка из 5 вершин, поиск останавливается после извлечения из очереди искомых вершин"""
+
+    points = [sp.Point(i, 0) for i in range(5)]
+    graph = sp.Graph()
+
+    for first, second in zip(points, points[1:]):
+        graph.add_edge(sp.Segment(first, second, 2))
+
+    compact_graph = sp.CompactGraph.from_graph(graph)
+    tree = a_star.dijkstra(points[1], [points[0], points[2]], compact_graph)
+
+    assert tree.get_distance(points[0]) == tree.get_distance(points[2]) == 2
+    assert tree.get_path(points[0]) == [sp.Segment(points[0], points[1], 2)]
+    assert tree.get_path(points[1]) == []
+    assert points[4] not in tree  # Дальняя вершина не извлекалась из очереди
+
+    tree = a_star.dijkstra(points[0], points, compact_graph)
+    assert tree.get_distance(points[4]) == 8 and tree.get_path(points[4]) == a_star.a_star(points[0], points[4], graph)
+
+
+def test_bidirectional_a_star() -> None:
+    """Тест двунаправленного поиска А* на решетке со случайными длинами ребер
+
+    Длины путей должны совпадать с найденными однонаправленным поиском, в том числе с ориентирами"""
+
+    rng = random.Random(0)
+    size = 12
+    points = [[sp.Point(x, y) for y in range(size)] for x in range(size)]
+    graph = sp.Graph()
+
+    for x in range(size):
+        for y in range(size):
+            if x + 1 < size:
+                graph.add_edge(sp.Segment(points[x][y], points[x + 1][y], rng.uniform(1, 5)))
+            if y + 1 < size:
+                graph.add_edge(sp.Segment(points[x][y], points[x][y + 1], rng.uniform(1, 5)))
+
+    isolated = sp.Point(size, size)
+    graph.add_edge(sp.Segment(isolated, sp.Point(size + 1, size)))
+    compact_graph = sp.CompactGraph.from_graph(graph)
+    landmarks = lm.Landmarks.from_graph(compact_graph, 4, seed=0)
+    nodes = [point for column in points for point in column]
+
+    for _ in range(20):
+        start, finish = rng.sample(nodes, 2)
+        expected = sum(edge.length for edge in a_star.a_star(start, finish, compact_graph))
+
+        for current_landmarks in None, landmarks:
+            path = a_star.a_star(start, finish, compact_graph, current_landmarks, bidirectional=True)
+            assert math.isclose(sum(edge.length for edge in path), expected)
+            assert {path[0].start, path[0].finish} & {start} and {path[-1].start, path[-1].finish} & {finish}
+
+    assert a_star.a_star(nodes[0], nodes[0], compact_graph, bidirectional=True) == []
+    assert a_star.a_star(nodes[0], isolated, compact_graph, bidirectional=True) == []
+
+    with pytest.raises(ValueError):
+        a_star.a_star(nodes[0], nodes[1], graph, bidirectional=True)
@@ -0,0 +1,61 @@
+"""Тесты иерархий сжатия"""
+
+
+import random
+
+import pytest
+
+from routing import spatial_objects as sp
+from routing.algorithms import a_star
+from routing.algorithms import contraction_hierarchies as ch
+
+
+def test_contraction_hierarchy(tmp_path) -> None:
+    """Тест поиска путей по иерархии сжатия
+
+    Граф - решетка 12 x 12 со случайными длинами ребер и изолированное ребро
+    Длины путей сравниваются с путями, найденными A*"""
+
+    generator = random.Random(0)
+    points = [[sp.Point(i, j) for j in range(12)] for i in range(12)]
+    graph = sp.Graph()
+
+    for i in range(12):
+        for j in range(12):
+            if i < 11:
+                graph.add_edge(sp.Segment(points[i][j], points[i + 1][j], generator.uniform(1, 3)))
+            if j < 11:
+                graph.add_edge(sp.Segment(points[i][j], points[i][j + 1], generator.uniform(1, 3)))
+
+    isolated = sp.Point(20, 20)
+    graph.add_edge(sp.Segment(isolated, sp.Point(21, 20)))
+    compact_graph = sp.CompactGraph.from_graph(graph)
+    hierarchy = ch.ContractionHierarchy.from_graph(compact_graph)
+    nodes = [point for row in points for point in row]
+
+    for _ in range(50):
+        start, finish = generator.choice(nodes), generator.choice(nodes)
+        path = hierarchy.find_path(start, finish)
+        expected_length = sum(edge.length for edge in a_star.a_star(start, finish, compact_graph))
+
+        assert round(sum(edge.length for edge in path), 6) == round(expected_length, 6)
+        assert round(hierarchy.get_distance(start, finish), 6) == round(expected_length, 6)
+
+        for edge in path:  # Ребра пути идут подряд от начальной вершины к искомой
+            start = edge.get_another_border(start)
+
+        assert start == finish
+
+    assert hierarchy.find_path(nodes[0], nodes[0]) == []
+    assert hierarchy.find_path(nodes[0], isolated) == []
+
+    hierarchy.save(tmp_path / "hierarchy.pickle")
+    loaded = ch.ContractionHierarchy.load(tmp_path / "hierarchy.pickle")
+    assert loaded.find_path(nodes[0], nodes[-1]) == hierarchy.find_path(nodes[0], nodes[-1])
+
+    compact_graph.update_edge_lengths([0], [5])  # После изменения длин ребер иерархия устарела
+
+    assert loaded.is_current and not hierarchy.is_current
+
+    with pytest.raises(ValueError):
+        hierarchy.find_path(nodes[0], nodes[-1])
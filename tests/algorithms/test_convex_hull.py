@@ -0,0 +1,63 @@
+"""Тесты выпуклой оболочки монотонной цепью и диаметра вращающимися калиперами"""
+
+
+from __future__ import annotations
+
+import itertools
+import math
+import random
+
+import numpy as np
+
+from routing import spatial_objects as sp
+from routing.algorithms import convex_hull as cvh
+from routing.algorithms import graham_scan as gs
+
+
+def test_monotone_chain() -> None:
+    """Тест нахождения выпуклой оболочки, вершины те же, что у сканирования Грэхема"""
+
+    test_case = [
+        sp.Point(2, 0), sp.Point(2, -2), sp.Point(1, -1), sp.Point(0, -2),
+        sp.Point(-2, -1), sp.Point(-2, 2), sp.Point(-1, -1.5), sp.Point(0, 0), sp.Point(2, -1)
+    ]
+
+    assert cvh.monotone_chain(test_case) == [
+        sp.Point(-2, -1), sp.Point(0, -2), sp.Point(2, -2), sp.Point(2, 0), sp.Point(-2, 2)
+    ]
+
+    generator = random.Random(0)
+    points = [sp.Point(generator.random(), generator.random()) for _ in range(2000)]
+    assert set(cvh.monotone_chain(points)) == set(gs.graham_scan(points))
+
+
+def test_degenerate_hulls() -> None:
+    """Тест оболочки и диаметра 1 точки, совпадающих точек и точек на 1 прямой"""
+
+    assert cvh.monotone_chain([sp.Point(1, 1)] * 3) == [sp.Point(1, 1)]
+    assert len(set(cvh.get_diameter(np.ones((3, 2))))) == 1
+
+    line = [sp.Point(i, 2 * i) for i in (3, 0, 5, 1, 4)]
+    assert cvh.monotone_chain(line) == [sp.Point(0, 0), sp.Point(5, 10)]
+    assert set(cvh.get_diameter(np.array([(point.x, point.y) for point in line]))) == {1, 2}
+
+
+def test_diameter() -> None:
+    """Тест поиска пары наиболее удаленных точек, сравнение с перебором пар, в том числе для точек на окружности"""
+
+    generator = random.Random(1)
+
+    for points_amt, on_circle in (50, False), (2000, False), (300, True):
+        if on_circle:
+            angles = [generator.random() * 2 * math.pi for _ in range(points_amt)]
+            coordinates = np.array([(math.cos(angle), math.sin(angle)) for angle in angles])
+        else:
+            coordinates = np.array([(generator.random(), generator.random()) for _ in range(points_amt)])
+
+        hull = cvh.get_hull_indexes(coordinates).tolist()
+        expected = max(
+            math.dist(coordinates[first], coordinates[second]) for first, second in itertools.combinations(hull, 2)
+        )
+        first, second = cvh.get_diameter(coordinates)
+
+        assert math.dist(coordinates[first], coordinates[second]) == expected
@@ -2,6 +2,9 @@
 
 
 import random
+from timeit import default_timer as timer
+
+import numpy as np
 
 from routing import spatial_objects as sp
 from routing.algorithms import genetic_algorithm as ga
@@ -30,3 +33,26 @@ def test_genetic_algorithm() -> None:
         assert point_from_result == points[point_idx]
 
         point_idx += 1 if forward_direction else -1
+
+
+def test_early_stopping() -> None:
+    """Тест остановки поиска решения до истечения лимита времени"""
+
+    points = [sp.Point(0, 0), sp.Point(0, 1), sp.Point(1, 1), sp.Point(1, 0)]
+
+    start = timer()
+    result = ga.genetic_algorithm_for_tsp(points, 30, stale_generations_limit=100)
+    assert timer() - start < 1  # Решение не улучшается => поиск остановлен после 100 поколений
+    assert set(result) == set(points)
+
+    generator = random.Random(0)
+    cluster = [sp.Point(generator.uniform(0, 100), generator.uniform(0, 100)) for _ in range(20)]
+    start = timer()
+    result = ga.genetic_algorithm_for_tsp(cluster, 30)
+    assert timer() - start < 10  # Лимит поколений без улучшения по умолчанию зависит от количества генов
+    assert set(result) == set(cluster)
+
+    start = timer()
+    result = ga.genetic_algorithm_for_tsp(points, 30, stale_generations_limit=10 ** 9, target_gap=0)
+    assert timer() - start < 1  # Длина квадрата == нижней оценке => поиск остановлен после нахождения обхода по контуру
+    assert ga._estimation(np.array([[points.index(point) for point in result]]), ga.get_distance_matrix(points)) == 4
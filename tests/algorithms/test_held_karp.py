@@ -0,0 +1,35 @@
+"""Тесты алгоритма Хелда - Карпа, точно решающего TSP"""
+
+
+import itertools
+import random
+
+import pytest
+
+from routing import spatial_objects as sp
+from routing.algorithms import held_karp as hk
+
+
+def test_held_karp() -> None:
+    """Тест решения TSP, результат сравнивается с полным перебором"""
+
+    points = [sp.Point(random.randint(0, 20), random.randint(0, 20)) for _ in range(8)]
+
+    while len(set(points)) != len(points):  # Точки не должны повторяться
+        points = [sp.Point(random.randint(0, 20), random.randint(0, 20)) for _ in range(8)]
+
+    result = hk.held_karp_for_tsp(points)
+
+    assert result[0] == points[0] and len(result) == len(points) and set(result) == set(points)
+
+    best_length = min(
+        _get_route_length([points[0], *permutation]) for permutation in itertools.permutations(points[1:])
+    )
+    assert round(_get_route_length(result), sp.get_precision()) == round(best_length, sp.get_precision())
+
+    with pytest.raises(ValueError):  # Таблицы для большего количества генов не помещаются в память
+        hk.held_karp_for_tsp([sp.Point(i, 0) for i in range(hk.MAX_GENES_AMT + 1)])
+
+
+def _get_route_length(route: list[sp.Point]) -> float:
+    return sum(route[i - 1].get_distance_to(route[i]) for i in range(len(route)))
@@ -4,8 +4,11 @@
 from __future__ import annotations
 
 import itertools
+import multiprocessing
 import random
 
+import pytest
+
 from routing import spatial_objects as sp
 from routing.algorithms import k_means as km
 
@@ -64,6 +67,113 @@ def test_clustering_with_remainder() -> None:
     assert len(result_points) == len(points) and set(result_points) == set(points)  # Все точки кластеризованы
 
 
+def test_sparse_network_fallback(monkeypatch) -> None:
+    """Тест разделения точек, когда в сети с ближайшими центроидами не существует потока
+
+    Все точки ближе всего к 1 центроиду, поэтому центроиды-кандидаты добавляются, пока поток не найдется"""
+
+    points = [sp.Point(random.random(), random.random()) for _ in range(40)]
+    centroids = [sp.Point(0.5, 0.5), sp.Point(10, 0), sp.Point(0, 10), sp.Point(10, 10)]
+    expected = km._divide_points_into_clusters(points, len(centroids), centroids)
+    monkeypatch.setattr(km, "_CANDIDATE_CENTROIDS_AMT", 1)
+    result = km._divide_points_into_clusters(points, len(centroids), centroids)
+
+    assert [len(cluster) for cluster in result] == [10] * len(centroids)
+
+    def get_cost(clusters: list[sp.Cluster]) -> float:
+        return sum(point.get_distance_to(centroids[i]) for i, cluster in enumerate(clusters) for point in cluster)
+
+    assert get_cost(result) == pytest.approx(get_cost(expected))
+
+
+def test_greedy_assignment() -> None:
+    """Тест приближенного разделения точек на кластеры
+
+    Размеры кластеров такие же, как при точном разделении, сумма расстояний до центроидов больше не более чем на 5%"""
+
+    generator = random.Random(0)
+    points = [sp.Point(value // 1000, value % 1000) for value in generator.sample(range(1000 * 1000), 1003)]
+    centroids = km._get_initial_clusters_centers(points, 20)
+    network = km._FlowNetwork(points, len(centroids))
+    expected = km._divide_points_into_clusters(points, len(centroids), centroids, network)
+    result = km._divide_points_greedily(points, len(centroids), centroids, network.coordinates)
+
+    def get_cost(clusters: list[sp.Cluster]) -> float:
+        return sum(point.get_distance_to(centroids[i]) for i, cluster in enumerate(clusters) for point in cluster)
+
+    assert [len(cluster) for cluster in result] == [len(cluster) for cluster in expected]
+    assert sorted(itertools.chain(*result), key=lambda point: (point.x, point.y)) == \
+        sorted(points, key=lambda point: (point.x, point.y))
+    assert get_cost(expected) <= get_cost(result) + 1e-6 and get_cost(result) <= get_cost(expected) * 1.05
+
+    clusters = km.k_means(points, 20, assignment="greedy")
+    assert sorted(map(len, clusters)) == [50] * 17 + [51] * 3
+
+    with pytest.raises(ValueError):
+        km.k_means(points, 20, assignment="unknown")
+
+
+def test_restarts() -> None:
+    """Тест нескольких запусков K-Means с выбором разбиения с наименьшей суммой расстояний
+
+    Запуски в пуле процессов и в текущем процессе дают одинаковый результат, он не хуже 1 запуска"""
+
+    generator = random.Random(1)
+    points = [sp.Point(generator.random() * 100, generator.random() * 100) for _ in range(600)]
+
+    def get_cost(clusters: list[sp.Cluster]) -> float:
+        return sum(point.get_distance_to(cluster.get_geometric_center()) for cluster in clusters for point in cluster)
+
+    single = km.k_means(points, 12)
+    sequential = km.k_means(points, 12, restarts=4, seed=0)
+
+    with multiprocessing.Pool(2) as pool:
+        parallel = km.k_means(points, 12, restarts=4, pool=pool, processes_num=2, seed=0)
+
+    assert sorted(map(len, sequential)) == [50] * 12
+    assert get_cost(sequential) <= get_cost(single) + 1e-6
+    assert get_cost(parallel) == pytest.approx(get_cost(sequential))
+
+    with pytest.raises(ValueError):
+        km.k_means(points, 12, restarts=0)
+
+
+@pytest.mark.parametrize("assignment", ["exact", "greedy"])
+def test_bisection(assignment: str) -> None:
+    """Тест кластеризации рекурсивным делением
+
+    Размеры кластеров такие же, как при кластеризации сразу на k кластеров, в пуле процессов результат тот же"""
+
+    generator = random.Random(2)
+    points = [sp.Point(generator.random() * 100, generator.random() * 100) for _ in range(1003)]
+
+    for clusters_amt in 7, 20, 501:
+        result = km.k_means(points, clusters_amt, assignment, strategy="bisection", seed=0)
+        sizes = km._get_cluster_sizes(len(points), clusters_amt)
+
+        assert sorted(map(len, result)) == sorted(sizes)
+        assert sorted(itertools.chain(*result), key=lambda point: (point.x, point.y)) == \
+            sorted(points, key=lambda point: (point.x, point.y))
+
+    centroids = [sp.Point(30, 50), sp.Point(60, 40)]
+    network = km._FlowNetwork(points, 2, [400, 603])
+    expected = km._divide_points_into_clusters(points, 2, centroids, network)
+    halves = km._divide_points_in_two(points, centroids, network.coordinates, [400, 603])
+
+    def get_cost(clusters: list[sp.Cluster]) -> float:
+        return sum(point.get_distance_to(centroids[i]) for i, cluster in enumerate(clusters) for point in cluster)
+
+    assert list(map(len, halves)) == [400, 603] and get_cost(halves) == pytest.approx(get_cost(expected))
+
+    with multiprocessing.Pool(2) as pool:
+        parallel = km.k_means(points, 20, assignment, pool=pool, processes_num=2, seed=0, strategy="bisection")
+
+    assert parallel == km.k_means(points, 20, assignment, strategy="bisection", seed=0)
+
+    with pytest.raises(ValueError):
+        km.k_means(points, 20, strategy="unknown")
+
+
 def _get_test_case(use_remainder=True) -> tuple[list[sp.Point], int]:
     """Сгенерировать список точек для кластеризации
 
@@ -0,0 +1,99 @@
+"""Тесты ориентиров для эвристики ALT"""
+
+
+import random
+
+from routing import spatial_objects as sp
+from routing.algorithms import a_star
+from routing.algorithms import landmarks as lm
+
+
+def _get_grid(generator: random.Random) -> sp.CompactGraph:
+    """Построить решетку 10 x 10, длины ребер которой намного больше расстояний между их концами"""
+
+    points = [[sp.Point(i, j) for j in range(10)] for i in range(10)]
+    graph = sp.Graph()
+
+    for i in range(10):
+        for j in range(10):
+            if i < 9:
+                graph.add_edge(sp.Segment(points[i][j], points[i + 1][j], generator.uniform(1, 10)))
+            if j < 9:
+                graph.add_edge(sp.Segment(points[i][j], points[i][j + 1], generator.uniform(1, 10)))
+
+    return sp.CompactGraph.from_graph(graph)
+
+
+def test_landmarks() -> None:
+    """Тест оценок по ориентирам и поиска пути с ними
+
+    Оценки не должны превышать длины кратчайших путей, в том числе после пересчета для графа с другими длинами ребер"""
+
+    generator = random.Random(0)
+    graph = _get_grid(generator)
+    landmarks = lm.Landmarks.from_graph(graph, 4, seed=0)
+
+    assert len(set(landmarks.get_nodes(graph))) == 4
+
+    for _ in range(2):
+        for _ in range(30):
+            start, finish = generator.randrange(len(graph)), generator.randrange(len(graph))
+            start_point, finish_point = graph.get_point(start), graph.get_point(finish)
+            path = a_star.a_star(start_point, finish_point, graph)
+            length = sum(edge.length for edge in path)
+
+            assert landmarks.get_lower_bound(start, finish) <= length + 1e-9
+            distance = start_point.get_distance_to(finish_point)
+            heuristic = landmarks.get_heuristic(graph, finish)(start)  # Наибольшая из оценок по ориентирам и по прямой
+            assert abs(heuristic - max(distance, landmarks.get_lower_bound(start, finish))) < 1e-6
+            assert round(sum(edge.length for edge in a_star.a_star(
+                start_point, finish_point, graph, landmarks
+            )), 6) == round(length, 6)
+            assert round(sum(edge.length for edge in a_star.find_paths(
+                start_point, [finish_point], graph, landmarks
+            )[finish_point]), 6) == round(length, 6)
+
+        graph = _get_grid(generator)  # Та же решетка с другими длинами ребер
+        landmarks.update(graph)
+
+
+def test_admissibility_after_updates() -> None:
+    """Тест допустимости оценок по ориентирам после изменения длин ребер
+
+    После удлинения ребер оценки остаются допустимыми, после укорачивания - до пересчета расстояний"""
+
+    graph = _get_grid(random.Random(0))
+    landmarks = lm.Landmarks.from_graph(graph, 2, seed=0)
+    lengths = list(graph.edge_lengths)
+
+    graph.update_edge_lengths(range(graph.edges_amt), [length + 1 for length in lengths])
+    assert landmarks.is_admissible(graph)
+
+    for start in range(0, len(graph), 7):
+        for finish in range(0, len(graph), 11):
+            length = sum(edge.length for edge in a_star.a_star(graph.get_point(start), graph.get_point(finish), graph))
+            assert landmarks.get_lower_bound(start, finish) <= length + 1e-9
+
+    graph.update_edge_lengths(range(graph.edges_amt), lengths)
+    assert not landmarks.is_admissible(graph)
+
+    landmarks.update(graph)
+    assert landmarks.is_admissible(graph)
+
+
+def test_disconnected_graph() -> None:
+    """Тест выбора ориентиров в графе из нескольких компонент связности: в каждой компоненте по ориентиру"""
+
+    graph = sp.Graph()
+
+    for shift in 0, 100:
+        points = [sp.Point(shift, 0), sp.Point(shift + 1, 0), sp.Point(shift, 1), sp.Point(shift + 5, 5)]
+
+        for first, second in zip(points, points[1:]):
+            graph.add_edge(sp.Segment(first, second))
+
+    graph = sp.CompactGraph.from_graph(graph)
+
+    for seed in range(5):
+        landmarks = lm.Landmarks.from_graph(graph, 2, seed=seed)
+        assert {point.x < 50 for point in landmarks.get_nodes(graph)} == {True, False}
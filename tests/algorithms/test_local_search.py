@@ -0,0 +1,43 @@
+"""Тесты локального поиска, улучшающего решение TSP"""
+
+
+import random
+
+from routing import spatial_objects as sp
+from routing.algorithms import genetic_algorithm as ga
+from routing.algorithms import local_search as ls
+
+
+def test_local_search() -> None:
+    """Тест улучшения маршрута
+
+    Точки - выпуклый многоугольник, поэтому маршрут без самопересечений, полученный после 2-opt, - обход по контуру"""
+
+    points = [
+        sp.Point(1, 3), sp.Point(2, 2), sp.Point(3, 1), sp.Point(5, 1),
+        sp.Point(6, 2), sp.Point(7, 3), sp.Point(7, 5), sp.Point(6, 6),
+        sp.Point(5, 7), sp.Point(3, 7), sp.Point(2, 6), sp.Point(1, 5),
+    ]  # Вершины идут в порядке обхода
+
+    distances = ga.get_distance_matrix(points)
+    tour = random.sample(range(len(points)), len(points))
+    result = ls.improve_tour(tour, distances.tolist(), ls.get_neighbour_lists(distances, 4))
+
+    assert sorted(result) == list(range(len(points)))
+
+    shift = result.index(0)
+    result = result[shift:] + result[:shift]
+    assert result in (list(range(len(points))), [0] + list(range(len(points) - 1, 0, -1)))
+
+
+def test_or_opt() -> None:
+    """Тест переноса участка маршрута, который не выполняется разворотом участка"""
+
+    points = [sp.Point(i, 0) for i in range(6)] + [sp.Point(i, 1) for i in range(5, -1, -1)]
+    tour = [0, 1, 2, 8, 3, 4, 5, 6, 7, 9, 10, 11]  # Ген 8 перенесен из верхнего ряда в нижний
+    distances = ga.get_distance_matrix(points)
+
+    assert ls._or_opt(tour, distances.tolist(), ls.get_neighbour_lists(distances))
+
+    shift = tour.index(0)
+    assert tour[shift:] + tour[:shift] == list(range(len(points)))
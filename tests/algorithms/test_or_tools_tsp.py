@@ -0,0 +1,27 @@
+"""Тесты решения TSP библиотекой OR-Tools"""
+
+
+import random
+
+from routing import spatial_objects as sp
+from routing.algorithms import or_tools_tsp as ort
+
+
+def test_or_tools_for_tsp() -> None:
+    """Тест решения TSP"""
+
+    points = [  # Выпуклая оболочка
+        sp.Point(1, 3), sp.Point(2, 2), sp.Point(3, 1), sp.Point(5, 1),
+        sp.Point(6, 2), sp.Point(7, 3), sp.Point(7, 5), sp.Point(6, 6),
+        sp.Point(5, 7), sp.Point(3, 7), sp.Point(2, 6), sp.Point(1, 5),
+    ]  # Вершины идут в порядке обхода
+
+    genes = random.sample(points, len(points))
+    result = ort.or_tools_for_tsp(genes, 1)
+
+    assert result[0] == genes[0] and len(result) == len(points)
+
+    shift = points.index(result[0])
+    forward_route = points[shift:] + points[:shift]
+    backward_route = [forward_route[0]] + forward_route[:0:-1]
+    assert result in (forward_route, backward_route)
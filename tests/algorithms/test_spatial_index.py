@@ -0,0 +1,70 @@
+"""Тесты пространственного индекса точек"""
+
+
+from __future__ import annotations
+
+import random
+
+import numpy as np
+import pytest
+
+from routing import spatial_objects as sp
+from routing.algorithms import spatial_index as si
+
+
+@pytest.mark.parametrize("points_per_cell", [1, 8, 64])
+def test_nearest_points(points_per_cell: int) -> None:
+    """Тест поиска k ближайших точек, в том числе для точек запроса вне сетки, сравнение с полным перебором"""
+
+    generator = np.random.default_rng(0)
+    coordinates = generator.random((500, 2)) * [100, 10]
+    queries = generator.random((300, 2)) * [140, 30] - [20, 10]
+    index = si.GridIndex(coordinates, points_per_cell)
+
+    for k in 1, 5, len(coordinates):
+        distances, indexes = index.query(queries, k)
+        expected = np.sort(np.hypot(*(queries[:, None, :] - coordinates[None, :, :]).transpose(2, 0, 1)), axis=1)
+
+        assert np.allclose(distances, expected[:, :k])
+        assert np.allclose(np.hypot(*(queries[:, None, :] - coordinates[indexes]).transpose(2, 0, 1)), distances)
+
+    with pytest.raises(ValueError):
+        index.query(queries, len(coordinates) + 1)
+
+
+def test_points_in_radius() -> None:
+    """Тест поиска точек в круге"""
+
+    coordinates = np.random.default_rng(1).random((1000, 2))
+    index = si.GridIndex(coordinates)
+    expected = np.flatnonzero(np.hypot(coordinates[:, 0] - 0.3, coordinates[:, 1] - 0.6) <= 0.2)
+
+    assert sorted(index.query_radius(0.3, 0.6, 0.2).tolist()) == expected.tolist()
+    assert sorted(index.query_radius(0.3, 0.6, np.inf).tolist()) == list(range(len(coordinates)))
+
+    coordinates = np.random.default_rng(2).random((200, 2)) * 5
+    index = si.GridIndex(coordinates)
+
+    for x, y, radius in (30.7, 13.2, 29.4), (-4, 2, 5), (2, -100, 103), (10, 10, 1):  # Точка запроса вне сетки
+        expected = np.flatnonzero(np.hypot(coordinates[:, 0] - x, coordinates[:, 1] - y) <= radius)
+        assert sorted(index.query_radius(x, y, radius).tolist()) == expected.tolist()
+
+
+def test_farthest_sequence() -> None:
+    """Тест выбора наиболее удаленных точек, сравнение с перебором, в том числе для точек на 1 прямой"""
+
+    generator = random.Random(2)
+
+    for points in (
+        [sp.Point(generator.random(), generator.random()) for _ in range(700)],
+        [sp.Point(i, 0) for i in generator.sample(range(10 ** 6), 300)]
+    ):
+        coordinates = np.array([(point.x, point.y) for point in points])
+        expected = [0]
+        distances = np.full(len(points), np.inf)
+
+        for _ in range(29):
+            distances = np.minimum(distances, np.hypot(*(coordinates - coordinates[expected[-1]]).T))
+            expected.append(int(np.argmax(distances)))
+
+        assert si.GridIndex.from_points(points).get_farthest_sequence([0], 30) == expected
@@ -0,0 +1,45 @@
+"""Тесты поиска компонент сильной связности"""
+
+
+from array import array
+
+from routing import spatial_objects as sp
+from routing.algorithms import strong_components as sc
+
+
+def test_directed_components() -> None:
+    """Тест алгоритма Тарьяна в ориентированном графе
+
+    Цикл 0 -> 1 -> 2 -> 0, дуга 2 -> 3, цикл 3 -> 4 -> 3, вершина 5 без дуг"""
+
+    offsets = array("q", [0, 1, 2, 4, 5, 6, 6])
+    targets = array("i", [1, 2, 0, 3, 4, 3])
+    labels = sc._find_components(offsets, targets).tolist()
+
+    assert labels[0] == labels[1] == labels[2] and labels[3] == labels[4]
+    assert len({labels[0], labels[3], labels[5]}) == 3
+
+
+def test_cached_labels() -> None:
+    """Тест кэширования меток компонент и их пересчета после изменения графа"""
+
+    graph = sp.Graph()
+    graph.add_edge(sp.Segment(sp.Point(0, 0), sp.Point(1, 0)))
+    graph.add_edge(sp.Segment(sp.Point(5, 5), sp.Point(6, 5)))
+    points = [sp.Point(0, 0), sp.Point(6, 5), sp.Point(9, 9)]
+
+    first, second, missing = sc.get_point_labels(points, graph)
+    assert first != second and missing == -1
+
+    compact_graph = sp.CompactGraph.from_graph(graph)
+    assert sc.get_point_labels(points, compact_graph)[2] == -1
+    assert sc._labels[compact_graph][0] == compact_graph.topology_version
+
+    labels = sc._labels[compact_graph][1]
+    compact_graph.update_edge_lengths([0], [2])  # Изменение длин ребер не сбрасывает метки
+    sc.get_point_labels(points, compact_graph)
+    assert sc._labels[compact_graph][1] is labels
+
+    graph.add_edge(sp.Segment(sp.Point(1, 0), sp.Point(5, 5)))  # Новая версия графа, метки вычисляются заново
+    first, second, _ = sc.get_point_labels(points, graph)
+    assert first == second
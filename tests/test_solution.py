@@ -1,12 +1,15 @@
 """Тесты отдельных функций, используемых при решении MTSP, и всего решения в целом"""
 
 
+import functools
+import gc
 import itertools
 import pytest
 from timeit import default_timer as timer
 
 from routing import solution as sl
 from routing import spatial_objects as sp
+from routing.algorithms import contraction_hierarchies as ch
 
 
 def test_points_and_graph_validation() -> None:
@@ -36,11 +39,20 @@ def test_points_and_graph_validation() -> None:
 
     assert sl._find_unreachable_points([sp.Point(0, 0)], graph) == [sp.Point(0, 0)]
 
+    checked_points = points + [sp.Point(0, 0), sp.Point(0, 1)]
+    assert sl._find_unreachable_points(checked_points, graph)[:2] == [sp.Point(0, 0), sp.Point(0, 1)]
+    assert len(checked_points) == len(points) + 2  # Список точек не изменяется
+
     unreachable_points = set(sl._find_unreachable_points(points, graph))
     assert unreachable_points == set(points[:4]) or unreachable_points == set(points[4:])  # Одна компонента недоступна
 
+    compact_graph = sp.CompactGraph.from_graph(graph)
+    unreachable_points = set(sl._find_unreachable_points(points, compact_graph))
+    assert unreachable_points == set(points[:4]) or unreachable_points == set(points[4:])
+
     graph.add_edge(sp.Segment(sp.Point(2, 3), sp.Point(4, 3)))  # Добавить мост, соединяющий компоненты связности
     assert not sl._find_unreachable_points(points, graph)
+    assert not sl._find_unreachable_points(points, sp.CompactGraph.from_graph(graph))
 
 
 def test_route_mapping() -> None:
@@ -87,6 +99,18 @@ def test_route_mapping() -> None:
 
     assert calculated_route == answer
 
+    compact_graph = sp.CompactGraph.from_graph(graph)
+
+    assert sl._map_route_on_graph(route, compact_graph) == answer
+
+    hierarchy = ch.ContractionHierarchy.from_graph(compact_graph)
+    assert sl._map_route_on_graph(route, compact_graph, hierarchy=hierarchy) == answer
+
+    distances, trees = sl._get_road_distances(route, compact_graph)  # Пути, найденные при вычислении расстояний
+
+    assert distances[0][1] == distances[1][0] == round(sum(edge.length for edge in answer[:3]), sp.get_precision())
+    assert sl._map_route_on_graph(route, compact_graph, trees) == answer
+
 
 def test_solution() -> None:
     """Тест всего решения
@@ -155,11 +179,168 @@ def test_solution() -> None:
     assert set(results[1][1]) == set(edges[14:20])  # Маршрут обхода совпадает с контуром
 
 
+def test_router(monkeypatch) -> None:
+    """Тест многократного построения маршрутов в одном пуле процессов
+
+    Граф - два треугольника, соединенные 1 ребром, в кластерах по 3 точки, поэтому TSP решается мгновенно"""
+
+    points = (sp.Point(0, 0), sp.Point(1, 0), sp.Point(0, 1), sp.Point(10, 10), sp.Point(11, 10), sp.Point(10, 11))
+
+    graph = sp.Graph()
+
+    for i in range(0, 6, 3):
+        for first, second in itertools.combinations(points[i:i + 3], 2):
+            graph.add_edge(sp.Segment(first, second))
+
+    graph.add_edge(sp.Segment(points[0], points[3]))
+
+    with sl.Router(graph, 1, landmarks_amt=2) as router:
+        for ordered, road_distances in (True, False), (False, True):  # Процессы и граф переиспользуются
+            results = list(router.build_routes(list(points), 2, ordered, road_distances=road_distances))
+
+            assert {frozenset(cluster) for cluster, _ in results} == {frozenset(points[:3]), frozenset(points[3:])}
+
+            for cluster, route in results:
+                assert len(route) == 3
+                assert {edge.start for edge in route} | {edge.finish for edge in route} == set(cluster)
+
+        for kwargs in {"assignment": "greedy"}, {"restarts": 3}:
+            results = list(router.build_routes(list(points), 2, **kwargs))
+            assert {frozenset(cluster) for cluster, _ in results} == {frozenset(points[:3]), frozenset(points[3:])}
+
+        edge_id = next(  # Ребро между 2 и 3 точками 1 треугольника
+            edge_id for edge_id in range(router.graph.edges_amt)
+            if {router.graph.get_segment(edge_id).start, router.graph.get_segment(edge_id).finish} == set(points[1:3])
+        )
+        length = router.graph.edge_lengths[edge_id]
+        monkeypatch.setattr(sl, "_MAX_PENDING_UPDATE_SHARE", 1)
+        router.update_edge_lengths([edge_id], [100])  # Процесс применяет изменение перед задачей, путь идет в обход
+
+        for cluster, route in router.build_routes(list(points), 2):
+            assert len(route) == (4 if points[1] in cluster else 3)
+            assert all(edge.length < 100 for edge in route)
+
+        monkeypatch.setattr(sl, "_MAX_PENDING_UPDATE_SHARE", 0)
+        router.update_edge_lengths([edge_id], [length])  # Процессы пересоздаются, ориентиры пересчитываются
+
+        assert not router._updates and router._landmarks.is_admissible(router.graph)
+        assert all(len(route) == 3 for _, route in router.build_routes(list(points), 2))
+
+        for exact_tsp_threshold in -1, 17:  # Порог точного решения TSP вне допустимого диапазона
+            with pytest.raises(ValueError):
+                router.build_routes(list(points), 2, exact_tsp_threshold=exact_tsp_threshold)
+
+        with pytest.raises(ValueError):  # Неизвестный алгоритм решения TSP
+            router.build_routes(list(points), 2, tsp_solver="unknown")
+
+        with pytest.raises(ValueError):  # Неизвестный способ разделения точек на кластеры
+            router.build_routes(list(points), 2, assignment="unknown")
+
+    with pytest.raises(ValueError):  # Пул завершен
+        router.build_routes(list(points), 2)
+
+    hierarchy = ch.ContractionHierarchy.from_graph(sp.CompactGraph.from_graph(graph))
+
+    with sl.Router(hierarchy.graph, 1, hierarchy) as router:
+        for cluster, route in router.build_routes(list(points), 2):
+            assert len(route) == 3
+
+        router.update_edge_lengths([0], [router.graph.edge_lengths[0] + 1])  # Иерархия устарела, пути ищутся A*
+
+        for cluster, route in router.build_routes(list(points), 2):
+            assert len(route) == 3
+
+    with pytest.raises(ValueError):  # Иерархия устарела
+        sl.Router(hierarchy.graph, 1, hierarchy)
+
+    triangle = sp.Graph()
+
+    for first, second in itertools.combinations(points[:3], 2):
+        triangle.add_edge(sp.Segment(first, second))
+
+    with pytest.raises(ValueError):  # Иерархия построена для другого графа
+        sl.Router(triangle, 1, hierarchy)
+
+
+def test_graph_cache() -> None:
+    """Тест переиспользования графа в формате CSR и ориентиров между вызовами построения маршрутов"""
+
+    graph = sp.Graph()
+
+    for first, second in itertools.combinations((sp.Point(0, 0), sp.Point(1, 0), sp.Point(0, 1)), 2):
+        graph.add_edge(sp.Segment(first, second))
+
+    compact_graph = sl._get_compact_graph(graph)
+    landmarks = sl._get_landmarks(compact_graph, 2)
+
+    assert sl._get_compact_graph(compact_graph) is compact_graph
+    assert sl._get_compact_graph(graph) is compact_graph and sl._get_landmarks(compact_graph, 2) is landmarks
+    assert sl._get_landmarks(compact_graph, 1) is not landmarks
+
+    compact_graph.update_edge_lengths([0], [compact_graph.edge_lengths[0] + 1])  # Граф изменен через Router
+
+    assert sl._get_compact_graph(graph) is not compact_graph
+    assert sl._get_landmarks(compact_graph, 2) is not landmarks
+
+    compact_graph = sl._get_compact_graph(graph)
+    graph.add_edge(sp.Segment(sp.Point(1, 0), sp.Point(1, 1)))  # Исходный граф изменен
+
+    assert sl._get_compact_graph(graph) is not compact_graph
+
+    compact_graph = sl._get_compact_graph(graph)
+    landmarks = sl._get_landmarks(compact_graph, 2)
+    lengths = list(compact_graph.edge_lengths)
+
+    with sl.Router(graph, 1, landmarks_amt=2) as router, sl.Router(graph, 1, landmarks_amt=2) as other_router:
+        assert router.graph is other_router.graph is compact_graph
+
+        router.update_edge_lengths([0], [lengths[0] + 1])  # Граф из кэша копируется, другие Router его не видят
+        router.update_edge_lengths([0], [lengths[0]])  # Ребро укорочено, ориентиры копии пересчитываются
+
+        assert router.graph is not compact_graph and router.graph.edge_lengths[0] == lengths[0]
+        assert router._landmarks is not landmarks and router._landmarks.is_admissible(router.graph)
+        assert other_router.graph is compact_graph and list(compact_graph.edge_lengths) == lengths
+        assert sl._get_compact_graph(graph) is compact_graph and sl._get_landmarks(compact_graph, 2) is landmarks
+
+
+def test_unfinished_iteration(monkeypatch) -> None:
+    """Тест завершения пула процессов build_routes, если маршруты получены не все"""
+
+    points = [sp.Point(0, 0), sp.Point(1, 0), sp.Point(0, 1), sp.Point(10, 10), sp.Point(11, 10), sp.Point(10, 11)]
+    graph = sp.Graph()
+
+    for first, second in itertools.combinations(points, 2):
+        graph.add_edge(sp.Segment(first, second))
+
+    calls = []
+
+    for method in "close", "terminate":
+        monkeypatch.setattr(sl.Router, method, functools.partialmethod(
+            lambda router, original, name: calls.append(name) or original(router), getattr(sl.Router, method), method
+        ))
+
+    results = sl.build_routes(list(points), 2, graph, 1)
+    del results  # Перебор не начат
+    gc.collect()
+    assert calls == ["terminate"]
+
+    calls.clear()
+    results = sl.build_routes(list(points), 2, graph, 1)
+    next(results)
+    del results  # Перебор остановлен после 1 маршрута, пул завершается без ожидания задач
+    assert calls and set(calls) == {"terminate"}
+
+    calls.clear()
+    assert len(list(sl.build_routes(list(points), 2, graph, 1))) == 2  # Все маршруты получены
+    assert calls[0] == "close"  # Пул завершен после выполнения всех задач
+
+
 @pytest.mark.parametrize("processes_num", [1, 2, 4])  # Маркировка теста для многократного выполнения
 def test_execution_time(processes_num: int) -> None:
     """Тест времени выполнения маршрутизации
 
     Чтобы тест работал корректно, количество логических процессоров должно быть не менее 4
+    Решение TSP в кластере останавливается после сходимости, не дожидаясь лимита времени
 
     Args:
         processes_num: Количество доступных процессов
@@ -193,8 +374,8 @@ def test_execution_time(processes_num: int) -> None:
         graph.add_edge(edge)
 
     start = timer()
-    sl.build_routes(list(points), clusters_amt, graph, processes_num)
+    list(sl.build_routes(list(points), clusters_amt, graph, processes_num))
     execution_time = timer() - start
 
-    assert execution_time > sl._TSP_TIMELIMIT * clusters_amt / processes_num
-    assert execution_time <= (sl._TSP_TIMELIMIT + sl._ROUTING_TIMELIMIT) * clusters_amt / processes_num
+    tsp_time_limit = sl._get_tsp_time_limit(len(points) // clusters_amt)
+    assert execution_time <= (tsp_time_limit + sl._ROUTING_TIMELIMIT) * clusters_amt / processes_num
@@ -1,6 +1,9 @@
 """Тесты пространственных объектов"""
 
 
+import collections
+import pickle
+
 import pytest
 
 from routing import spatial_objects as sp
@@ -31,3 +34,198 @@ def test_getting_geometric_center_of_cluster(cluster: sp.Cluster, center: sp.Poi
     """Тест вычисления геометрического центра кластера"""
 
     assert cluster.get_geometric_center() == center
+
+
+def test_compact_graph() -> None:
+    """Тест построения графа в формате CSR из графа, представленного списками смежности"""
+
+    edges = [
+        sp.Segment(sp.Point(0, 0), sp.Point(1, 0)),
+        sp.Segment(sp.Point(1, 0), sp.Point(1, 1), 1.5),
+        sp.Segment(sp.Point(1, 1), sp.Point(0, 0)),
+    ]
+
+    graph = sp.Graph()
+
+    for edge in edges:
+        graph.add_edge(edge)
+
+    compact_graph = sp.CompactGraph.from_graph(graph)
+
+    assert len(compact_graph) == 3 and compact_graph.edges_amt == 3
+    assert sp.Point(1, 1) in compact_graph and sp.Point(2, 2) not in compact_graph
+
+    for point, adjacency_list in graph.adjacency_lists.items():  # Списки смежности совпадают
+        node_id = compact_graph.get_node_id(point)
+        slots = range(compact_graph.offsets[node_id], compact_graph.offsets[node_id + 1])
+
+        assert compact_graph.get_point(node_id) == point
+        assert [compact_graph.get_segment(compact_graph.edges[slot]) for slot in slots] == adjacency_list
+        assert [compact_graph.weights[slot] for slot in slots] == [edge.length for edge in adjacency_list]
+        assert [compact_graph.get_point(compact_graph.targets[slot]) for slot in slots] == [
+            edge.get_another_border(point) for edge in adjacency_list
+        ]
+
+    restored_graph = pickle.loads(pickle.dumps(compact_graph))  # Индекс вершин восстанавливается после сериализации
+
+    assert restored_graph.get_node_id(sp.Point(1, 1)) == compact_graph.get_node_id(sp.Point(1, 1))
+    assert list(restored_graph.xs) == list(compact_graph.xs) and list(restored_graph.ys) == list(compact_graph.ys)
+
+
+def test_updating_edge_lengths() -> None:
+    """Тест изменения длин ребер в графах обоих представлений"""
+
+    edges = [
+        sp.Segment(sp.Point(0, 0), sp.Point(1, 0)),
+        sp.Segment(sp.Point(1, 0), sp.Point(1, 1), 1.5),
+        sp.Segment(sp.Point(1, 1), sp.Point(0, 0)),
+    ]
+
+    graph = sp.Graph()
+
+    for edge in edges:
+        graph.add_edge(edge)
+
+    compact_graph = sp.CompactGraph.from_graph(graph)
+    lengths = list(compact_graph.edge_lengths)
+    compact_graph.update_edge_lengths([0, 1], [3, 2])  # Ребра только удлиняются
+
+    assert compact_graph.version == 1 and compact_graph.shortened_version == 0
+    assert list(compact_graph.edge_lengths) == [3, 2, lengths[2]]
+
+    for node_id in range(len(compact_graph)):  # Длины в списках смежности обеих границ совпадают с длинами ребер
+        for slot in range(compact_graph.offsets[node_id], compact_graph.offsets[node_id + 1]):
+            assert compact_graph.weights[slot] == compact_graph.edge_lengths[compact_graph.edges[slot]]
+
+    compact_graph.update_edge_lengths([2], [lengths[2] - 0.25])
+    assert compact_graph.version == compact_graph.shortened_version == 2
+
+    with pytest.raises(ValueError):  # Длина меньше Евклидова расстояния, граф не меняется
+        compact_graph.update_edge_lengths([0, 1], [5, 1])
+
+    with pytest.raises(IndexError):
+        compact_graph.update_edge_lengths([3], [5])
+
+    assert compact_graph.version == 2 and compact_graph.edge_lengths[0] == 3
+
+    compact_graph.update_edge_lengths([0, 0], [2, 4])  # Для повторяющегося ребра используется последняя длина
+    assert compact_graph.version == 3 and compact_graph.shortened_version == 2 and compact_graph.edge_lengths[0] == 4
+
+    compact_graph.update_edge_lengths([0], [0])  # Нулевая длина - Евклидово расстояние, как в Segment
+    assert compact_graph.version == compact_graph.shortened_version == 4 and compact_graph.edge_lengths[0] == 1
+
+    topology_version = graph.topology_version
+    assert graph.shortened_version == graph.version == topology_version  # Добавление ребра сокращает расстояния
+
+    graph.update_edge_lengths([edges[1]], [2])  # Ребро удлиняется
+    updated_edge = sp.Segment(edges[1].start, edges[1].finish, 2)
+
+    assert graph.topology_version == topology_version and graph.version == topology_version + 1
+    assert graph.shortened_version == topology_version
+    assert all(updated_edge in graph.adjacency_lists[node] for node in (edges[1].start, edges[1].finish))
+
+    graph.update_edge_lengths([updated_edge], [1.75])
+    assert graph.version == graph.shortened_version == topology_version + 2
+
+    with pytest.raises(KeyError):  # Ребра с такой длиной больше нет в графе
+        graph.update_edge_lengths([updated_edge], [3])
+
+    with pytest.raises(ValueError):
+        graph.update_edge_lengths([edges[0]], [])
+
+    assert graph.version == topology_version + 2
+
+    graph.update_edge_lengths([edges[0], edges[0]], [1, 2])  # Повторяющееся ребро заменяется 1 раз
+    updated_edge = sp.Segment(edges[0].start, edges[0].finish, 2)
+
+    assert graph.version == topology_version + 3 and graph.shortened_version == topology_version + 2
+    assert all(updated_edge in graph.adjacency_lists[node] for node in (edges[0].start, edges[0].finish))
+
+    graph.update_edge_lengths([updated_edge], [0])  # Нулевая длина - Евклидово расстояние
+    assert all(edges[0] in graph.adjacency_lists[node] for node in (edges[0].start, edges[0].finish))
+
+
+def test_slotted_objects() -> None:
+    """Тест точек и отрезков без словаря экземпляра: сериализация, пул точек, проверка длины без извлечения корня"""
+
+    point = sp.Point(1.0000001, 2)
+    assert not hasattr(point, "__dict__") and not hasattr(sp.Segment(point, sp.Point(0, 0)), "__dict__")
+
+    restored_point = pickle.loads(pickle.dumps(point))
+    assert restored_point == point and hash(restored_point) == hash(point)
+
+    pool = sp.PointPool()
+    assert pool.get(1, 2) is pool.get(1.0000001, 2) is pool.intern(sp.Point(1, 2)) and len(pool) == 1
+
+    start, finish = sp.Point(0, 0), sp.Point(1, 2)  # Евклидово расстояние sqrt(5) округляется вниз
+    assert sp.Segment(start, finish, start.get_distance_to(finish)) == sp.Segment(start, finish)
+
+    with pytest.raises(ValueError):  # Длина меньше Евклидова расстояния
+        sp.Segment(start, finish, 2.236)
+
+    segment = sp.Segment(start, finish, 3)
+    restored_segment = pickle.loads(pickle.dumps(segment))
+    assert restored_segment == segment and restored_segment.length == 3
+
+
+def test_bulk_loading(tmp_path) -> None:
+    """Тест построения графа в формате CSR по массивам и по файлу списка ребер
+
+    Граф сравнивается с графом, построенным добавлением тех же ребер по порядку"""
+
+    xs, ys = [0, 1, 1, 0, 5], [0, 0, 1, 1, 5]
+    edge_starts, edge_finishes, edge_lengths = [0, 1, 2, 3, 0], [1, 2, 3, 0, 2], [0, 1.5, 1, 2, 3]
+    points = [sp.Point(x, y) for x, y in zip(xs, ys)]
+    edges = [
+        sp.Segment(points[start], points[finish], length)
+        for start, finish, length in zip(edge_starts, edge_finishes, edge_lengths)
+    ]
+
+    graph = sp.Graph()
+
+    for edge in edges:
+        graph.add_edge(edge)
+
+    def get_adjacency(compact_graph: sp.CompactGraph) -> dict[sp.Point, collections.Counter]:
+        return {
+            compact_graph.get_point(node_id): collections.Counter(
+                compact_graph.get_segment(compact_graph.edges[slot])
+                for slot in range(compact_graph.offsets[node_id], compact_graph.offsets[node_id + 1])
+            ) for node_id in range(len(compact_graph))
+        }
+
+    expected_adjacency = get_adjacency(sp.CompactGraph.from_graph(graph))
+    compact_graph = sp.CompactGraph.from_arrays(xs, ys, edge_starts, edge_finishes, edge_lengths)
+
+    assert len(compact_graph) == 5 and sp.Point(5, 5) in compact_graph  # Вершина без ребер
+    assert [compact_graph.get_segment(edge_id) for edge_id in range(5)] == edges  # Индексы ребер - позиции в массивах
+    assert get_adjacency(compact_graph) == {**expected_adjacency, sp.Point(5, 5): collections.Counter()}
+
+    for arguments in (
+            (xs, ys[:4], edge_starts, edge_finishes),  # Размеры массивов не совпадают
+            (xs, ys, edge_starts, [1, 2, 3, 0, 5]),  # Неверный индекс вершины
+            (xs, ys, edge_starts, [1, 2, 3, 0, 0]),  # Ребро из вершины в нее же
+            ([0, 1, 1, 0, 0], [0, 0, 1, 1, 0], edge_starts, edge_finishes),  # Совпадающие вершины
+            (xs, ys, edge_starts, edge_finishes, [1, 1, 1, 1, 1]),  # Длина меньше Евклидова расстояния
+    ):
+        with pytest.raises(ValueError):
+            sp.CompactGraph.from_arrays(*arguments)
+
+    path = tmp_path / "edges.csv"
+    lines = [f"{edge.start.x},{edge.start.y},{edge.finish.x},{edge.finish.y},{edge.length}" for edge in edges[:4]]
+    path.write_text("# x1,y1,x2,y2,length\n" + "\n".join(lines[:2]) + "\n\n" + "\n".join(lines[2:]) + "\n")
+    loaded_graph = sp.CompactGraph.from_edge_list(path, chunk_size=2)  # Файл разбирается по 2 строки
+
+    assert [loaded_graph.get_point(node_id) for node_id in range(len(loaded_graph))] == points[:4]
+    assert [loaded_graph.get_segment(edge_id) for edge_id in range(4)] == edges[:4]
+
+    path.write_text("0 0 3 4\n")  # Длина по умолчанию - Евклидово расстояние
+    assert sp.CompactGraph.from_edge_list(path, delimiter=" ").get_segment(0).length == 5
+
+    path.write_text("0,0,3\n")
+    with pytest.raises(ValueError):  # Неверное количество значений в строке
+        sp.CompactGraph.from_edge_list(path)
+
+    path.write_text("1,1,1,1\n")
+    with pytest.raises(ValueError):  # Ребро из вершины в нее же
+        sp.CompactGraph.from_edge_list(path)